@@ -2,6 +2,12 @@
 """
 开发环境静态资源服务器
 支持多产品架构，通过子域名或路径识别产品
+
+用法：
+python3 dev_server.py                 # 单进程
+python3 dev_server.py --workers 4     # pre-fork 多进程（SO_REUSEPORT，见 tools/filelist-generator/prefork_server.py）
+python3 dev_server.py --blobstore     # 通过 blob-index.json 从内容寻址存储 objects/ 提供图片
+                                      # （先运行 generate-filelist.py --blobstore，见 tools/filelist-generator/blobstore.py）
 """
 
 import http.server
@@ -14,6 +20,14 @@ import mimetypes
 # 配置
 PORT = 8080
 STORE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+FILELIST_GENERATOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools', 'filelist-generator')
+
+# --blobstore 时为 blobstore.BlobResolver，按产品的路径索引解析请求
+BLOB_RESOLVER = None
+
+# 预压缩文件（tools/precompress-static 生成），按优先级排列
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+COMPRESSIBLE_EXTENSIONS = {'.html', '.htm', '.css', '.js', '.mjs', '.json', '.txt', '.svg', '.xml'}
 
 # 产品配置（子域名到产品slug的映射）
 PRODUCT_MAPPING = {
@@ -47,6 +61,13 @@ class MultiProductHandler(http.server.SimpleHTTPRequestHandler):
             # 移除路径中的产品slug（如果存在）
             path = self._remove_product_from_path(path, product_slug)
             file_path = os.path.join(STORE_ROOT, product_slug, path.lstrip('/'))
+            
+            # 内容寻址存储：索引中有该路径时直接提供对象，否则回退到原文件
+            if BLOB_RESOLVER is not None:
+                resolved = BLOB_RESOLVER.resolve(product_slug, path.lstrip('/'))
+                if resolved:
+                    self._serve_blob(resolved[0], resolved[1], path)
+                    return
         else:
             # 直接访问路径
             file_path = os.path.join(STORE_ROOT, path.lstrip('/'))
@@ -88,6 +109,37 @@ class MultiProductHandler(http.server.SimpleHTTPRequestHandler):
             return '/' + '/'.join(parts[1:])
         return path
     
+    def _accepted_encodings(self):
+        """解析 Accept-Encoding，返回可接受的编码集合（忽略 q=0）"""
+        accepted = set()
+        for item in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = item.strip().partition(';')
+            params = params.replace(' ', '')
+            if name and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                accepted.add(name.lower())
+        return accepted
+    
+    def _find_precompressed(self, file_path):
+        """
+        查找与原文件同步的预压缩文件
+        
+        Returns:
+            (压缩文件路径, Content-Encoding)，没有可用的压缩文件时返回 (None, None)
+        """
+        accepted = self._accepted_encodings()
+        source_mtime = os.stat(file_path).st_mtime_ns
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            candidate = file_path + suffix
+            try:
+                # 比原文件旧的压缩文件已过期
+                if os.stat(candidate).st_mtime_ns >= source_mtime:
+                    return candidate, encoding
+            except OSError:
+                continue
+        return None, None
+    
     def _serve_file(self, file_path):
         """提供文件服务"""
         try:
@@ -96,6 +148,14 @@ class MultiProductHandler(http.server.SimpleHTTPRequestHandler):
             if mime_type is None:
                 mime_type = 'application/octet-stream'
             
+            # 文本类文件优先返回预压缩版本
+            compressible = os.path.splitext(file_path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+            encoding = None
+            if compressible:
+                compressed_path, encoding = self._find_precompressed(file_path)
+                if compressed_path:
+                    file_path = compressed_path
+            
             # 读取文件
             with open(file_path, 'rb') as f:
                 content = f.read()
@@ -104,6 +164,37 @@ class MultiProductHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-Type', mime_type)
             self.send_header('Content-Length', len(content))
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if compressible:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Cache-Control', 'public, max-age=3600')
+            self.end_headers()
+            self.wfile.write(content)
+            
+        except Exception as e:
+            self.send_error(500, f"Error serving file: {str(e)}")
+    
+    def _serve_blob(self, blob_path, file_hash, url_path):
+        """提供存储中的对象（MIME 类型按请求路径判断，内容哈希作为 ETag）"""
+        etag = f'"{file_hash}"'
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            return
+        
+        try:
+            mime_type, _ = mimetypes.guess_type(url_path)
+            with open(blob_path, 'rb') as f:
+                content = f.read()
+            
+            self.send_response(200)
+            self.send_header('Content-Type', mime_type or 'application/octet-stream')
+            self.send_header('Content-Length', len(content))
+            self.send_header('ETag', etag)
             self.send_header('Access-Control-Allow-Origin', '*')
             self.send_header('Cache-Control', 'public, max-age=3600')
             self.end_headers()
@@ -167,13 +258,71 @@ class MultiProductHandler(http.server.SimpleHTTPRequestHandler):
         sys.stdout.write(f"[{self.log_date_time_string()}] {format % args}\n")
 
 
+def parse_workers(argv):
+    """解析 --workers / -w 参数"""
+    for i, arg in enumerate(argv):
+        if arg in ('-w', '--workers') and i + 1 < len(argv):
+            return max(1, int(argv[i + 1]))
+        if arg.startswith('--workers='):
+            return max(1, int(arg.split('=', 1)[1]))
+    return 1
+
+
+def enable_blobstore():
+    """启用内容寻址存储（--blobstore）"""
+    global BLOB_RESOLVER
+    sys.path.insert(0, FILELIST_GENERATOR_DIR)
+    from blobstore import BlobResolver
+    BLOB_RESOLVER = BlobResolver()
+
+
+def run_workers(workers):
+    """
+    以 pre-fork 模式运行多个 worker 进程
+    
+    fork 前在主进程中加载 MIME 类型表和所有产品的 blob 索引，worker 共享这些内存页；
+    索引变化时由主进程重新加载并替换 worker，worker 不各自重新加载
+    """
+    sys.path.insert(0, FILELIST_GENERATOR_DIR)
+    from prefork_server import make_counting_handler, make_server_class, run_prefork
+    
+    mimetypes.init()
+    reload = None
+    changed = None
+    if BLOB_RESOLVER is not None:
+        count = BLOB_RESOLVER.preload()
+        BLOB_RESOLVER.auto_reload = False
+        reload = BLOB_RESOLVER.preload
+        changed = BLOB_RESOLVER.is_stale
+        print(f"📇 已加载 {count} 个产品的 blob 索引")
+    
+    def make_server(reuse_port, counter, index):
+        handler_class = MultiProductHandler
+        if index is not None:
+            handler_class = make_counting_handler(handler_class, counter, index, quiet=False)
+        server_class = make_server_class(socketserver.TCPServer, reuse_port)
+        return server_class(("", PORT), handler_class)
+    
+    print(f"✅ 服务器已启动: http://localhost:{PORT}（{workers} 个 worker）")
+    print()
+    run_prefork(make_server, workers, reload, changed=changed)
+
+
 def main():
     """启动服务器"""
+    workers = parse_workers(sys.argv[1:])
+    if '--blobstore' in sys.argv[1:]:
+        enable_blobstore()
+    
     print("=" * 60)
     print("🚀 开发环境静态资源服务器")
     print("=" * 60)
     print(f"📁 根目录: {STORE_ROOT}")
     print(f"🌐 端口: {PORT}")
+    if workers > 1:
+        print(f"👷 Worker: {workers}")
+    if BLOB_RESOLVER is not None:
+        print(f"🗄️  内容寻址存储: {BLOB_RESOLVER.root}")
     print()
     print("📦 支持的产品:")
     for subdomain, slug in PRODUCT_MAPPING.items():
@@ -190,6 +339,10 @@ def main():
     print("=" * 60)
     print()
     
+    if workers > 1:
+        run_workers(workers)
+        return
+    
     try:
         with socketserver.TCPServer(("", PORT), MultiProductHandler) as httpd:
             print(f"✅ 服务器已启动: http://localhost:{PORT}")
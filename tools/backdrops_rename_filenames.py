@@ -3,6 +3,9 @@
 2. 遍历其下第一级子文件夹。
   - 遍历再下一级子文件夹，将名字中"@"及后面的字符串删除。
 
+重命名由 rename_engine.py 执行：一次遍历完成规划，执行前检测冲突（有冲突时不做任何修改），
+失败时回滚，并同步更新 .versions.json 等索引中的路径。
+
 用法：
 python backdrops_rename_filenames.py
 python backdrops_rename_filenames.py ./custom/path
@@ -10,6 +13,15 @@ python backdrops_rename_filenames.py ./custom/path
 import sys
 from pathlib import Path
 
+from rename_engine import execute_plan, plan_renames
+
+
+def strip_at_suffix(name, rel_path, is_dir):
+    """第二级子文件夹：删除 @ 及后面的字符串"""
+    if is_dir and rel_path.count('/') == 1 and "@" in name:
+        return name.split("@")[0]
+    return name
+
 
 def rename_folders(base_path="static/business-headshot-ai/images/options/backdrops"):
     """重命名文件夹，删除 @ 及后面的字符串"""
@@ -24,39 +36,21 @@ def rename_folders(base_path="static/business-headshot-ai/images/options/backdro
         return
     
     print(f"开始处理目录: {base_dir}")
-    renamed_count = 0
     
-    # 遍历第一级子文件夹
-    for first_level in base_dir.iterdir():
-        if not first_level.is_dir():
-            continue
-        
-        print(f"\n处理第一级文件夹: {first_level.name}")
-        
-        # 遍历第二级子文件夹
-        for second_level in first_level.iterdir():
-            if not second_level.is_dir():
-                continue
-            
-            # 检查文件夹名是否包含 @
-            if "@" in second_level.name:
-                # 删除 @ 及后面的字符串
-                new_name = second_level.name.split("@")[0]
-                new_path = second_level.parent / new_name
-                
-                # 检查新名称是否已存在
-                if new_path.exists():
-                    print(f"  跳过: {second_level.name} -> {new_name} (目标已存在)")
-                    continue
-                
-                # 重命名
-                second_level.rename(new_path)
-                print(f"  重命名: {second_level.name} -> {new_name}")
-                renamed_count += 1
-            else:
-                print(f"  跳过: {second_level.name} (无需重命名)")
+    plan = plan_renames(base_dir, strip_at_suffix)
+    for item in sorted(plan['renames'], key=lambda item: item['path']):
+        print(f"  重命名: {item['path']} -> {item['name']}")
+    
+    result = execute_plan(plan)
+    for error in result['errors']:
+        print(f"  错误: {error}")
+    if result['errors']:
+        print("\n未重命名任何文件夹。")
+        return
     
-    print(f"\n处理完成！共重命名 {renamed_count} 个文件夹。")
+    if result['indexes']:
+        print(f"已更新 {result['indexes']} 个索引文件中的路径。")
+    print(f"\n处理完成！共重命名 {result['dirs']} 个文件夹。")
 
 
 if __name__ == "__main__":
@@ -3,6 +3,9 @@
 - 将 "03@studio-blue" 重命名为 "02@studio-blue"
 - 将 "02@studio-gray" 重命名为 "03@studio-gray"
 
+两个名称互换，由 rename_engine.py 的两阶段重命名（先改为临时名称）处理，
+失败时回滚，并同步更新 .versions.json 等索引中的路径。
+
 用法：
 python backdrops_rename_typenames.py
 python backdrops_rename_typenames.py ./custom/path
@@ -10,6 +13,15 @@ python backdrops_rename_typenames.py ./custom/path
 import sys
 from pathlib import Path
 
+from rename_engine import execute_plan, plan_renames
+
+
+# 定义重命名映射
+RENAME_MAP = {
+    "03@studio-blue": "02@studio-blue",
+    "02@studio-gray": "03@studio-gray"
+}
+
 
 def rename_type_folders(base_path="static/business-headshot-ai/images/options/backdrops"):
     """重命名特定的类型文件夹"""
@@ -25,55 +37,28 @@ def rename_type_folders(base_path="static/business-headshot-ai/images/options/ba
     
     print(f"开始处理目录: {base_dir}")
     
-    # 定义重命名映射
-    rename_map = {
-        "03@studio-blue": "02@studio-blue",
-        "02@studio-gray": "03@studio-gray"
-    }
-    
-    # 为了避免冲突，需要使用临时名称
-    # 步骤：03@studio-blue -> temp -> 02@studio-blue
-    #       02@studio-gray -> 03@studio-gray
-    
-    temp_name = "_temp_rename_"
-    renamed_count = 0
+    for source in RENAME_MAP:
+        if not (base_dir / source).is_dir():
+            print(f"警告: {source} 不存在")
     
-    # 第一步：将 03@studio-blue 重命名为临时名称
-    source_1 = base_dir / "03@studio-blue"
-    temp_path = base_dir / temp_name
+    # 只处理第一级文件夹
+    plan = plan_renames(
+        base_dir,
+        lambda name, rel_path, is_dir: RENAME_MAP.get(name) if is_dir and '/' not in rel_path else None
+    )
+    for item in plan['renames']:
+        print(f"重命名: {item['path']} -> {item['name']}")
     
-    if source_1.exists():
-        source_1.rename(temp_path)
-        print(f"临时重命名: 03@studio-blue -> {temp_name}")
-    else:
-        print(f"警告: 03@studio-blue 不存在")
-        temp_path = None
-    
-    # 第二步：将 02@studio-gray 重命名为 03@studio-gray
-    source_2 = base_dir / "02@studio-gray"
-    target_2 = base_dir / "03@studio-gray"
-    
-    if source_2.exists():
-        if target_2.exists():
-            print(f"错误: 目标 03@studio-gray 已存在，无法重命名")
-        else:
-            source_2.rename(target_2)
-            print(f"重命名: 02@studio-gray -> 03@studio-gray")
-            renamed_count += 1
-    else:
-        print(f"警告: 02@studio-gray 不存在")
-    
-    # 第三步：将临时名称重命名为 02@studio-blue
-    if temp_path and temp_path.exists():
-        target_1 = base_dir / "02@studio-blue"
-        if target_1.exists():
-            print(f"错误: 目标 02@studio-blue 已存在，无法重命名")
-        else:
-            temp_path.rename(target_1)
-            print(f"重命名: 03@studio-blue -> 02@studio-blue")
-            renamed_count += 1
+    result = execute_plan(plan)
+    for error in result['errors']:
+        print(f"错误: {error}")
+    if result['errors']:
+        print("\n未重命名任何文件夹。")
+        return
     
-    print(f"\n处理完成！共重命名 {renamed_count} 个文件夹。")
+    if result['indexes']:
+        print(f"已更新 {result['indexes']} 个索引文件中的路径。")
+    print(f"\n处理完成！共重命名 {result['dirs']} 个文件夹。")
 
 
 if __name__ == "__main__":
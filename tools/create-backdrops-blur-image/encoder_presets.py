@@ -0,0 +1,149 @@
+"""
+WebP 编码预设和画质评估
+
+按输出类型命名的编码参数（quality / method / lossless），
+以及编码耗时、输出字节数、PSNR / SSIM 的评估工具，用于挑选体积更小的编码参数。
+
+用法：
+from encoder_presets import get_preset, evaluate_presets
+
+preset = get_preset('blurred', {'quality': 60})
+results = evaluate_presets(img, ['legacy', 'blurred'])
+"""
+
+import io
+import math
+import time
+
+from PIL import Image, ImageChops, ImageStat
+
+
+# 编码预设
+# - quality: 有损压缩质量（0-100），lossless=True 时表示压缩力度
+# - method: 编码速度/压缩率权衡（0 最快，6 最慢但体积最小）
+ENCODER_PRESETS = {
+    # 历史默认参数（体积大、编码慢）
+    'legacy': {'quality': 95, 'method': 6},
+    # 虚化背景：本身没有高频细节，低质量也看不出差别
+    'blurred': {'quality': 70, 'method': 4},
+    # 缩略图
+    'thumbnail': {'quality': 75, 'method': 4},
+    # 首屏大图
+    'hero': {'quality': 88, 'method': 5},
+    # 无损
+    'lossless': {'quality': 100, 'method': 4, 'lossless': True},
+}
+
+# 虚化图片默认使用的预设（保持与历史输出一致）
+DEFAULT_BLUR_PRESET = 'legacy'
+
+# SSIM 估算时的最大边长（缩小后计算，避免逐像素计算过慢）
+SSIM_MAX_SIDE = 256
+
+# SSIM 窗口大小
+SSIM_BLOCK = 8
+
+
+def get_preset(name: str, overrides: dict = None) -> dict:
+    """
+    获取编码参数
+    
+    Args:
+        name: 预设名称
+        overrides: 覆盖参数，如 {'quality': 60}
+    
+    Returns:
+        可直接传给 Image.save(..., 'WEBP', **params) 的参数；lossless 仅在为 True 时出现
+    """
+    if name not in ENCODER_PRESETS:
+        raise ValueError(f"未知的编码预设: {name}（可用: {', '.join(ENCODER_PRESETS)}）")
+    
+    params = dict(ENCODER_PRESETS[name])
+    params.update(overrides or {})
+    if not params.get('lossless'):
+        params.pop('lossless', None)
+    return params
+
+
+def encode_webp(img, params: dict) -> bytes:
+    """按参数编码为 WebP，返回字节"""
+    buffer = io.BytesIO()
+    img.save(buffer, 'WEBP', **params)
+    return buffer.getvalue()
+
+
+def psnr(reference, candidate) -> float:
+    """峰值信噪比（dB），完全相同时返回 inf"""
+    diff = ImageChops.difference(reference.convert('RGB'), candidate.convert('RGB'))
+    stat = ImageStat.Stat(diff)
+    pixel_count = reference.size[0] * reference.size[1]
+    mse = sum(stat.sum2) / (pixel_count * len(stat.sum2))
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255 ** 2 / mse)
+
+
+def ssim_estimate(reference, candidate) -> float:
+    """
+    SSIM 估算：灰度图缩小到 SSIM_MAX_SIDE 以内，按 SSIM_BLOCK×SSIM_BLOCK 不重叠窗口计算后取平均
+    """
+    scale = min(1.0, SSIM_MAX_SIDE / max(reference.size))
+    size = (max(SSIM_BLOCK, round(reference.size[0] * scale)), max(SSIM_BLOCK, round(reference.size[1] * scale)))
+    ref_pixels = list(reference.convert('L').resize(size, Image.BOX).tobytes())
+    cand_pixels = list(candidate.convert('L').resize(size, Image.BOX).tobytes())
+    
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    width, height = size
+    n = SSIM_BLOCK * SSIM_BLOCK
+    scores = []
+    
+    for top in range(0, height - SSIM_BLOCK + 1, SSIM_BLOCK):
+        for left in range(0, width - SSIM_BLOCK + 1, SSIM_BLOCK):
+            xs = []
+            ys = []
+            for row in range(top, top + SSIM_BLOCK):
+                offset = row * width + left
+                xs.extend(ref_pixels[offset:offset + SSIM_BLOCK])
+                ys.extend(cand_pixels[offset:offset + SSIM_BLOCK])
+            
+            mu_x = sum(xs) / n
+            mu_y = sum(ys) / n
+            var_x = sum((x - mu_x) ** 2 for x in xs) / n
+            var_y = sum((y - mu_y) ** 2 for y in ys) / n
+            cov = sum((x - mu_x) * (y - mu_y) for x, y in zip(xs, ys)) / n
+            
+            scores.append(
+                ((2 * mu_x * mu_y + c1) * (2 * cov + c2))
+                / ((mu_x ** 2 + mu_y ** 2 + c1) * (var_x + var_y + c2))
+            )
+    
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+def evaluate_presets(img, preset_names: list) -> list:
+    """
+    用各预设编码同一张图片并评估
+    
+    Returns:
+        [{'preset', 'bytes', 'seconds', 'psnr', 'ssim'}, ...]
+    """
+    results = []
+    for name in preset_names:
+        params = get_preset(name)
+        
+        start = time.perf_counter()
+        data = encode_webp(img, params)
+        seconds = time.perf_counter() - start
+        
+        with Image.open(io.BytesIO(data)) as decoded:
+            decoded.load()
+            results.append({
+                'preset': name,
+                'bytes': len(data),
+                'seconds': seconds,
+                'psnr': psnr(img, decoded),
+                'ssim': ssim_estimate(img, decoded),
+            })
+    
+    return results
@@ -3,57 +3,233 @@
 1. 遍历 input 目录下的所有文件和子目录。
 2. 为每个图片创建同名的子文件夹，并将该图片移动到对应的子文件夹中，改名为"blur-0.webp"
   - 在该子文件夹下，复制 "blur-0.webp" 为 "blur-1.webp"、"blur-2.webp"、"blur-3.webp"。
+3. 每张原图只解码一次，所有虚化级别都从内存中的图片生成；多张图片分发到进程池并行处理。
+4. 增量构建：input 目录下的 .blur-build.json 记录每个子文件夹的 blur-0.webp 内容哈希
+   和各级别的生成参数，只重新生成缺失或过期（原图或参数变化）的级别；
+   输出先写临时文件再原子替换，中断不会留下半个文件。
+5. 金字塔模式（--pyramid）：大半径级别先降采样再模糊，并在上一级结果的基础上
+   叠加模糊（高斯模糊可叠加：sqrt(r2² - r1²)），避免全分辨率大半径模糊；
+   --store-scale=0.5 时大半径级别按较小尺寸保存（不小于降采样后的尺寸）；
+   --compare 时统计与全尺寸 quality=95 输出相比节省的字节数。
+6. 编码预设（见 encoder_presets.py）：--preset=blurred 选择预设，
+   --quality= / --method= / --lossless 覆盖预设参数；
+   --report[=legacy,blurred,...] 只评估各预设的编码耗时、字节数和 PSNR/SSIM，不写任何文件。
 
 用法：
 python main.py # 使用 "./input"
 python main.py ./xxx
+python main.py ./xxx -j 8    # 指定并行进程数（默认 CPU 核数）
+python main.py ./xxx --force # 忽略构建记录，全部重新生成
+python main.py ./xxx --pyramid --store-scale=0.5 --compare
+python main.py ./xxx --preset=blurred --quality=60
+python main.py ./xxx --report
 """
+import hashlib
+import io
+import json
+import math
 import os
 import sys
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from PIL import Image, ImageFilter
 
-def process_images(input_path="input"):
-    # 定义输入目录
-    input_dir = Path(input_path)
-    
-    if not input_dir.exists():
-        print(f"目录 {input_dir} 不存在！")
-        return
-    
-    # 支持的图片格式
-    image_extensions = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff'}
+from encoder_presets import DEFAULT_BLUR_PRESET, ENCODER_PRESETS, evaluate_presets, get_preset
+
+# 支持的图片格式
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff'}
+
+# 虚化级别 -> 虚化程度（高斯模糊半径）
+# blur_level=1，虚化程度：2
+# blur_level=2，虚化程度：5
+# blur_level=3，虚化程度：10
+BLUR_MAPPING = {1: 2, 2: 5, 3: 10}
+
+# 构建记录文件名（位于 input 目录下）
+BUILD_MANIFEST_NAME = '.blur-build.json'
+
+# 金字塔模式：模糊半径达到该值才降采样
+PYRAMID_MIN_RADIUS = 4
+
+# 金字塔模式：降采样后在低分辨率图上的目标模糊半径（决定降采样倍数）
+PYRAMID_WORK_RADIUS = 2.5
+
+
+def collect_images(input_dir: Path) -> list:
+    """
+    收集所有需要处理的图片文件（避免在遍历时修改目录结构）
     
-    # 先收集所有需要处理的图片文件（避免在遍历时修改目录结构）
-    images_to_process = []
-    for item in input_dir.rglob('*'):
+    包括尚未整理的原图，以及已整理好的 <name>/blur-0.webp（用于检查是否需要重新生成）。
+    每个子文件夹只保留一个任务：foo.png 和已有的 foo/blur-0.webp 对应同一个子文件夹，
+    并行处理时会同时写入相同的虚化图片，因此优先使用未整理的原图（它会替换 blur-0.webp），
+    其余的跳过并提示。
+    """
+    targets = {}
+    for item in sorted(input_dir.rglob('*')):
         # 只处理文件，跳过目录
         if not item.is_file():
             continue
-            
+        
         # 检查是否是图片文件
-        if item.suffix.lower() not in image_extensions:
+        if item.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        
+        # 跳过已经生成的虚化图片（blur-1.webp, blur-5.webp等），blur-0.webp 是原图
+        if item.stem.startswith('blur-') and item.name != 'blur-0.webp':
             continue
         
-        # 跳过已经处理过的文件（blur-0.webp, blur-5.webp等）
-        if item.stem.startswith('blur-'):
+        target_folder = get_target_folder(item)
+        existing = targets.get(target_folder)
+        if existing is None:
+            targets[target_folder] = item
             continue
         
-        images_to_process.append(item)
+        # 未整理的原图优先于已有的 blur-0.webp
+        if existing.name == 'blur-0.webp' and item.name != 'blur-0.webp':
+            targets[target_folder], item = item, existing
+        print(f"⚠️  跳过 {item}：与 {targets[target_folder]} 对应同一个子文件夹 {target_folder}")
     
-    print(f"找到 {len(images_to_process)} 个图片需要处理")
+    return list(targets.values())
+
+
+def get_target_folder(item: Path) -> Path:
+    """图片对应的子文件夹：blur-0.webp 为所在目录，原图为同名子文件夹"""
+    return item.parent if item.name == 'blur-0.webp' else item.parent / item.stem
+
+
+def get_file_hash(file_path: Path) -> str:
+    """获取文件的 MD5 哈希值"""
+    hash_md5 = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
+
+def pyramid_factor(blur_radius) -> int:
+    """金字塔模式下的降采样倍数，半径较小时不降采样"""
+    if blur_radius < PYRAMID_MIN_RADIUS:
+        return 1
+    return max(1, int(blur_radius / PYRAMID_WORK_RADIUS))
+
+
+def level_params(blur_radius, options: dict) -> dict:
+    """虚化级别的生成参数，任何一项变化都会触发该级别重新生成"""
+    params = {'radius': blur_radius}
+    params.update(get_preset(options.get('preset', DEFAULT_BLUR_PRESET), options.get('encoder')))
+    # 不降采样的级别与普通模式完全相同，切换模式时无需重新生成
+    factor = pyramid_factor(blur_radius) if options.get('pyramid') else 1
+    if factor > 1:
+        params['pyramid'] = factor
+        params['store_scale'] = max(options.get('store_scale', 1), 1 / factor)
+    return params
+
+
+def render_blur_levels(img, levels: list):
+    """
+    按半径从小到大生成虚化图片
     
-    # 处理收集到的图片
-    for item in images_to_process:
-        # 获取图片所在的目录（可能是 input 或其子目录）
-        parent_dir = item.parent
+    普通级别直接在全分辨率原图上模糊；金字塔级别在上一级结果上降采样，
+    再叠加剩余的模糊量 sqrt(r² - r_prev²)（按降采样倍数换算）
+    
+    Args:
+        img: 已解码的原图
+        levels: [(文件名, 生成参数), ...]
+    
+    Yields:
+        (文件名, 生成参数, 待保存的图片)
+    """
+    full_width, full_height = img.size
+    prev_img, prev_radius = img, 0
+    
+    for file_name, params in sorted(levels, key=lambda level: level[1]['radius']):
+        blur_radius = params['radius']
+        factor = params.get('pyramid', 1)
+        
+        if factor == 1:
+            blurred_img = img.filter(ImageFilter.GaussianBlur(radius=blur_radius))
+        else:
+            work_size = (max(1, round(full_width / factor)), max(1, round(full_height / factor)))
+            base_img = prev_img if prev_img.size == work_size else prev_img.resize(work_size, Image.BOX)
+            extra_radius = math.sqrt(max(blur_radius ** 2 - prev_radius ** 2, 0)) / factor
+            blurred_img = base_img.filter(ImageFilter.GaussianBlur(radius=extra_radius)) if extra_radius else base_img
         
-        # 获取图片的文件名（不含扩展名）
-        image_name = item.stem
+        prev_img, prev_radius = blurred_img, blur_radius
         
+        # 输出尺寸：store_scale < 1 时按缩小后的尺寸保存，否则恢复为原图尺寸
+        store_scale = params.get('store_scale', 1)
+        out_size = (max(1, round(full_width * store_scale)), max(1, round(full_height * store_scale)))
+        out_img = blurred_img if blurred_img.size == out_size else blurred_img.resize(out_size, Image.BILINEAR)
+        
+        yield file_name, params, out_img
+
+
+def baseline_bytes(img, blur_radius) -> int:
+    """对照组：全分辨率高斯模糊 + quality=95, method=6 编码后的字节数"""
+    buffer = io.BytesIO()
+    img.filter(ImageFilter.GaussianBlur(radius=blur_radius)).save(buffer, 'WEBP', quality=95, method=6)
+    return buffer.tell()
+
+
+def load_build_manifest(input_dir: Path) -> dict:
+    """加载构建记录：{子文件夹相对路径: {'source_hash', 'levels': {文件名: 参数}}}"""
+    manifest_file = input_dir / BUILD_MANIFEST_NAME
+    if manifest_file.exists():
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_build_manifest(input_dir: Path, manifest: dict):
+    """保存构建记录（先写临时文件再替换）"""
+    manifest_file = input_dir / BUILD_MANIFEST_NAME
+    tmp_file = manifest_file.with_name(manifest_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def save_webp_atomic(img, target_file: Path, **params):
+    """先写同目录临时文件，再原子替换目标文件"""
+    tmp_file = target_file.with_name(f".{target_file.name}.tmp")
+    try:
+        img.save(tmp_file, 'WEBP', **params)
+        os.replace(tmp_file, target_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+
+def encoder_params(params: dict) -> dict:
+    """从级别生成参数中取出编码参数"""
+    return {key: params[key] for key in ('quality', 'method', 'lossless') if key in params}
+
+
+def process_image(task: tuple) -> tuple:
+    """
+    处理单张图片（子进程中执行时由主进程统一输出日志）
+    
+    Args:
+        task: (图片路径, 上次构建记录或 None, 选项 {'force', 'pyramid', 'store_scale', 'compare', 'preset', 'encoder'})
+    
+    Returns:
+        (子文件夹路径, 新构建记录, 日志行, 字节对比 {'baseline', 'actual'} 或 None)
+    """
+    item, previous, options = task
+    logs = []
+    report = None
+    
+    if item.name == 'blur-0.webp':
+        # 已整理过的原图
+        target_folder = item.parent
+        blur_0_path = item
+    else:
         # 在图片所在目录下创建同名子文件夹
-        target_folder = parent_dir / image_name
+        target_folder = item.parent / item.stem
         target_folder.mkdir(exist_ok=True)
         
         # 目标文件路径：blur-0.webp
@@ -61,32 +237,255 @@ def process_images(input_path="input"):
         
         # 移动并重命名图片为 blur-0.webp
         shutil.move(str(item), str(blur_0_path))
-        print(f"处理: {item} -> {blur_0_path}")
-        
-        # 创建虚化版本的图片
-        # blur_level=1，虚化程度：2
-        # blur_level=2，虚化程度：5
-        # blur_level=3，虚化程度：10
-        blur_mapping = {1: 2, 2: 5, 3: 10}
-        
-        for blur_level, blur_radius in blur_mapping.items():
-            target_file = target_folder / f"blur-{blur_level}.webp"
-            
-            # 打开原图并应用高斯模糊
-            with Image.open(blur_0_path) as img:
-                blurred_img = img.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-                blurred_img.save(target_file, 'WEBP', quality=95, method=6)
+        logs.append(f"处理: {item} -> {blur_0_path}")
+    
+    source_hash = get_file_hash(blur_0_path)
+    previous_levels = {}
+    if previous and previous.get('source_hash') == source_hash and not options.get('force'):
+        previous_levels = previous.get('levels', {})
+    
+    # 找出缺失或过期的级别
+    levels = {}
+    stale = []
+    for blur_level, blur_radius in BLUR_MAPPING.items():
+        file_name = f"blur-{blur_level}.webp"
+        params = level_params(blur_radius, options)
+        levels[file_name] = params
+        if previous_levels.get(file_name) != params or not (target_folder / file_name).exists():
+            stale.append((file_name, params))
+    
+    # 删除已不在 BLUR_MAPPING 中的旧级别
+    if previous:
+        for file_name in previous.get('levels', {}):
+            if file_name not in levels and (target_folder / file_name).exists():
+                (target_folder / file_name).unlink()
+                logs.append(f"  删除过期虚化图片: {target_folder / file_name}")
+    
+    if stale:
+        # 原图只解码一次，各虚化级别都基于内存中的图片生成
+        with Image.open(blur_0_path) as img:
+            img.load()
             
-            print(f"  创建虚化图片: {target_file} (虚化程度: {blur_radius})")
+            # 金字塔模式下高级别依赖低级别结果，需要按顺序生成全部级别
+            if options.get('pyramid'):
+                to_render = list(levels.items())
+            else:
+                to_render = stale
+            stale_names = {file_name for file_name, _ in stale}
             
+            for file_name, params, blurred_img in render_blur_levels(img, to_render):
+                if file_name not in stale_names:
+                    continue
+                
+                target_file = target_folder / file_name
+                save_webp_atomic(blurred_img, target_file, **encoder_params(params))
+                
+                size_note = ''
+                if blurred_img.size != img.size:
+                    size_note = f", 尺寸: {blurred_img.size[0]}x{blurred_img.size[1]}"
+                logs.append(f"  创建虚化图片: {target_file} (虚化程度: {params['radius']}{size_note})")
+                
+                if options.get('compare'):
+                    report = report or {'baseline': 0, 'actual': 0}
+                    report['baseline'] += baseline_bytes(img, params['radius'])
+                    report['actual'] += target_file.stat().st_size
+    
+    return target_folder, {'source_hash': source_hash, 'levels': levels}, logs, report
+
+
+def evaluate_image(task: tuple) -> list:
+    """评估单张图片：对每个虚化级别用各预设编码，返回 evaluate_presets 的结果"""
+    item, preset_names = task
+    results = []
+    with Image.open(item) as img:
+        img.load()
+        for blur_radius in BLUR_MAPPING.values():
+            blurred_img = img.filter(ImageFilter.GaussianBlur(radius=blur_radius))
+            results.extend(evaluate_presets(blurred_img, preset_names))
+    return results
+
+
+def report_presets(input_path="input", workers=None, preset_names=None):
+    """
+    评估各编码预设（不移动、不生成任何文件）
+    
+    对每张原图的每个虚化级别分别用各预设编码，汇总编码耗时、字节数和画质
+    """
+    input_dir = Path(input_path)
+    
+    if not input_dir.exists():
+        print(f"目录 {input_dir} 不存在！")
+        return
+    
+    preset_names = preset_names or list(ENCODER_PRESETS)
+    try:
+        for name in preset_names:
+            get_preset(name)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    images = collect_images(input_dir)
+    print(f"找到 {len(images)} 个图片，评估预设: {', '.join(preset_names)}")
+    if not images:
+        return
+    
+    tasks = [(item, preset_names) for item in images]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    
+    if workers <= 1:
+        all_results = [evaluate_image(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            all_results = list(executor.map(evaluate_image, tasks))
+    
+    summary = {name: {'bytes': 0, 'seconds': 0.0, 'psnr': [], 'ssim': []} for name in preset_names}
+    for results in all_results:
+        for result in results:
+            stats = summary[result['preset']]
+            stats['bytes'] += result['bytes']
+            stats['seconds'] += result['seconds']
+            stats['psnr'].append(result['psnr'])
+            stats['ssim'].append(result['ssim'])
+    
+    print()
+    print(f"{'预设':<12}{'参数':<34}{'字节数':>12}{'编码耗时':>10}{'PSNR':>9}{'SSIM':>8}")
+    print("-" * 85)
+    for name in preset_names:
+        stats = summary[name]
+        finite_psnr = [value for value in stats['psnr'] if value != math.inf]
+        mean_psnr = sum(finite_psnr) / len(finite_psnr) if finite_psnr else math.inf
+        mean_ssim = sum(stats['ssim']) / len(stats['ssim'])
+        params = ', '.join(f"{key}={value}" for key, value in get_preset(name).items())
+        print(
+            f"{name:<12}{params:<34}{stats['bytes'] / 1024:>10.1f}KB"
+            f"{stats['seconds']:>9.2f}s{mean_psnr:>9.2f}{mean_ssim:>8.4f}"
+        )
+
+
+def process_images(input_path="input", workers=None, force=False, pyramid=False, store_scale=1.0, compare=False,
+                   preset=DEFAULT_BLUR_PRESET, encoder=None):
+    # 定义输入目录
+    input_dir = Path(input_path)
+    
+    if not input_dir.exists():
+        print(f"目录 {input_dir} 不存在！")
+        return
+    
+    # 提前校验预设名称
+    try:
+        get_preset(preset, encoder)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    images_to_process = collect_images(input_dir)
+    
+    print(f"找到 {len(images_to_process)} 个图片需要处理")
+    
+    options = {
+        'force': force,
+        'pyramid': pyramid,
+        'store_scale': store_scale,
+        'compare': compare,
+        'preset': preset,
+        'encoder': encoder or {},
+    }
+    
+    manifest = load_build_manifest(input_dir)
+    tasks = []
+    for item in images_to_process:
+        folder_key = get_target_folder(item).relative_to(input_dir).as_posix()
+        tasks.append((item, manifest.get(folder_key), options))
+    
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    
+    new_manifest = {}
+    totals = {'baseline': 0, 'actual': 0}
+    
+    def collect(result):
+        target_folder, entry, logs, report = result
+        new_manifest[target_folder.relative_to(input_dir).as_posix()] = entry
+        for line in logs:
+            print(line)
+        if report:
+            totals['baseline'] += report['baseline']
+            totals['actual'] += report['actual']
+    
+    # 单张图片或单进程时直接处理，避免进程池开销
+    if workers <= 1:
+        for task in tasks:
+            collect(process_image(task))
+    else:
+        print(f"使用 {workers} 个进程并行处理")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(process_image, tasks):
+                collect(result)
+    
+    save_build_manifest(input_dir, new_manifest)
+    
+    if compare and totals['baseline']:
+        saved = totals['baseline'] - totals['actual']
+        print()
+        print(f"📊 全尺寸 quality=95 输出: {totals['baseline'] / 1024:.2f} KB")
+        print(f"📊 本次输出: {totals['actual'] / 1024:.2f} KB")
+        print(f"💾 节省: {saved / 1024:.2f} KB ({saved / totals['baseline'] * 100:.1f}%)")
+
+
+def parse_args(argv):
+    """
+    解析命令行参数：
+    [输入文件夹] [-j 进程数] [--force] [--pyramid] [--store-scale=S] [--compare]
+    [--preset=名称] [--quality=Q] [--method=M] [--lossless] [--report[=预设,...]]
+    """
+    input_folder = None
+    workers = None
+    options = {}
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-j', '--workers') and i + 1 < len(argv):
+            workers = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg in ('--force', '--pyramid', '--compare'):
+            options[arg[2:]] = True
+        elif arg.startswith('--store-scale='):
+            options['store_scale'] = min(1.0, max(0.01, float(arg.split('=', 1)[1])))
+        elif arg.startswith('--preset='):
+            options['preset'] = arg.split('=', 1)[1]
+        elif arg.startswith('--quality='):
+            options.setdefault('encoder', {})['quality'] = int(arg.split('=', 1)[1])
+        elif arg.startswith('--method='):
+            options.setdefault('encoder', {})['method'] = int(arg.split('=', 1)[1])
+        elif arg == '--lossless':
+            options.setdefault('encoder', {})['lossless'] = True
+        elif arg == '--report':
+            options['report'] = []
+        elif arg.startswith('--report='):
+            options['report'] = [name for name in arg.split('=', 1)[1].split(',') if name]
+        elif input_folder is None:
+            input_folder = arg
+        i += 1
+    
+    return input_folder, workers, options
+
 
 if __name__ == "__main__":
     # 检查命令行参数
-    if len(sys.argv) > 1:
-        input_folder = sys.argv[1]
+    input_folder, workers, options = parse_args(sys.argv[1:])
+    if 'report' in options:
+        report_presets(input_folder or "input", workers, options['report'])
+        sys.exit(0)
+    if input_folder:
         print(f"使用指定的输入文件夹: {input_folder}")
-        process_images(input_folder)
+        process_images(input_folder, workers, **options)
     else:
         print("使用默认输入文件夹: input")
-        process_images()
-    print("处理完成！")
\ No newline at end of file
+        process_images(workers=workers, **options)
+    print("处理完成！")
@@ -0,0 +1,346 @@
+"""
+为 static 目录下的图片生成多档宽度的响应式变体
+
+功能：
+1. 用 generate-filelist.py 的遍历规则找出产品下的所有图片
+2. 为每张图片生成宽度小于原图的各档变体，与原图放在同一目录：
+   demo-1.webp -> demo-1@320w.webp、demo-1@640w.webp ...
+3. 增量处理：tools/filelist-generator/{产品}/.derivatives-manifest.json 记录每张原图的
+   大小、修改时间、宽高，以及生成变体时的编码参数和宽度档位。
+   原图未变化时直接按记录的宽度筛选档位，不打开原图；编码参数或档位变化时重新生成。
+   没有记录的原图（旧版本生成的变体）沿用修改时间判断，比原图新的变体视为最新
+   --prune 删除原图已不存在的变体，以及不在当前宽度档位中的变体
+   同一目录下主干相同的原图（demo.jpg 和 demo.png）变体会重名，跳过不处理
+4. 多张图片分发到进程池并行处理
+5. 生成后重新生成该产品的 files.txt / .versions.json，变体随之登记，
+   供 FileListParser.pick_variant() 和 HTML 更新工具（--enhance 生成 srcset）使用
+
+用法：
+python tools/create-image-derivatives/main.py                              # 处理所有产品
+python tools/create-image-derivatives/main.py business-headshot-ai         # 只处理指定产品
+python tools/create-image-derivatives/main.py business-headshot-ai --widths=480,960
+python tools/create-image-derivatives/main.py business-headshot-ai --preset=thumbnail -j 8
+python tools/create-image-derivatives/main.py business-headshot-ai --prune
+"""
+
+import importlib.util
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+TOOLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TOOLS_DIR / 'create-backdrops-blur-image'))
+
+from encoder_presets import get_preset
+
+
+# 默认宽度档位（只生成小于原图宽度的档位）
+DEFAULT_WIDTHS = [320, 640, 960]
+
+# 变体默认编码预设
+DEFAULT_PRESET = 'thumbnail'
+
+# 变体命名：demo-1@480w.webp 是 demo-1.webp 宽 480px 的版本
+VARIANT_PATTERN = re.compile(r'^(?P<base>.+)@(?P<width>\d+)w(?P<ext>\.[A-Za-z0-9]+)$')
+
+# 生成记录文件名（位于 tools/filelist-generator/{产品}/）
+DERIVATIVES_MANIFEST_NAME = '.derivatives-manifest.json'
+
+
+def load_filelist_generator():
+    """加载 tools/filelist-generator/generate-filelist.py（文件名含 - 无法直接 import）"""
+    module_path = TOOLS_DIR / 'filelist-generator' / 'generate-filelist.py'
+    spec = importlib.util.spec_from_file_location('generate_filelist', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_derivatives_manifest(manifest_file: Path) -> dict:
+    """加载生成记录 {原图相对路径: {'size', 'mtime_ns', 'width', 'height', 'encoder', 'widths'}}"""
+    if manifest_file.exists():
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_derivatives_manifest(manifest_file: Path, manifest: dict):
+    """保存生成记录（先写临时文件再替换）"""
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = manifest_file.with_name(manifest_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def variant_path(source: Path, width: int) -> Path:
+    """变体路径：与原图同目录，统一保存为 webp"""
+    return source.with_name(f"{source.stem}@{width}w.webp")
+
+
+def collect_sources(product_dir: Path, generator) -> tuple:
+    """
+    收集原图和已有变体
+    
+    变体只按主干命名（demo@640w.webp），同一目录下主干相同的原图（demo.jpg、demo.png）
+    会写入同一个变体文件并互相覆盖，这些原图全部跳过并提示；
+    FileListParser.get_variants 和 HTML 更新工具同样不为它们返回变体
+    
+    Returns:
+        ([(原图路径, 相对路径), ...], 已有变体列表)
+    """
+    by_stem = {}
+    variants = []
+    for file_path, posix_path in generator.iter_image_files(product_dir):
+        if VARIANT_PATTERN.match(file_path.name):
+            variants.append(file_path)
+        else:
+            by_stem.setdefault((file_path.parent, file_path.stem), []).append((file_path, posix_path))
+    
+    sources = []
+    for (parent, stem), items in by_stem.items():
+        if len(items) > 1:
+            names = ', '.join(sorted(file_path.name for file_path, _ in items))
+            print(f"⚠️  跳过 {parent.relative_to(product_dir) / stem}：{names} 的变体会重名")
+            continue
+        sources.extend(items)
+    return sources, variants
+
+
+def create_derivatives(task: tuple) -> tuple:
+    """
+    为单张图片生成变体（子进程中执行）
+    
+    Args:
+        task: (原图路径, 宽度档位, 编码参数, 生成记录条目或 None)
+    
+    Returns:
+        (生成数, 跳过数, 日志行, 新的生成记录条目)
+    """
+    source, widths, encoder, entry = task
+    created = 0
+    skipped = 0
+    logs = []
+    
+    stat = source.stat()
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        # 原图未变化：按记录的宽度筛选档位，编码参数相同且变体存在时跳过，不打开原图
+        new_entry = dict(entry, encoder=encoder, widths=[w for w in widths if w < entry['width']])
+        pending = []
+        for width in new_entry['widths']:
+            target = variant_path(source, width)
+            if entry['encoder'] == encoder and width in entry['widths'] and target.exists():
+                skipped += 1
+            else:
+                pending.append((width, target))
+        if not pending:
+            return created, skipped, logs, new_entry
+    else:
+        # 原图变化时全部重新生成；没有记录时沿用修改时间判断（旧版本生成的变体）
+        pending = []
+        for width in widths:
+            target = variant_path(source, width)
+            if entry is None and target.exists() and target.stat().st_mtime_ns >= stat.st_mtime_ns:
+                skipped += 1
+            else:
+                pending.append((width, target))
+    
+    # 只读取文件头获取尺寸，第一次 resize 时才解码像素
+    with Image.open(source) as img:
+        source_width, source_height = img.size
+        new_entry = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'width': source_width,
+            'height': source_height,
+            'encoder': encoder,
+            'widths': [w for w in widths if w < source_width],
+        }
+        
+        for width, target in pending:
+            # 不放大：宽度不小于原图的档位没有意义
+            if width >= source_width:
+                if target.exists():
+                    target.unlink()
+                continue
+            
+            height = max(1, round(source_height * width / source_width))
+            resized = img.resize((width, height), Image.LANCZOS)
+            
+            # 先写临时文件再替换，避免中断留下半个文件
+            tmp_file = target.with_name(f".{target.name}.tmp")
+            try:
+                resized.save(tmp_file, 'WEBP', **encoder)
+                os.replace(tmp_file, target)
+            finally:
+                if tmp_file.exists():
+                    tmp_file.unlink()
+            
+            created += 1
+            logs.append(f"  ✅ {target.name} ({width}x{height})")
+    
+    return created, skipped, logs, new_entry
+
+
+def process_product(product_name: str, base_dir: Path, widths: list, encoder: dict,
+                    workers: int = 1, prune: bool = False) -> dict:
+    """处理单个产品"""
+    result = {
+        'product': product_name,
+        'sources': 0,
+        'created': 0,
+        'skipped': 0,
+        'pruned': 0,
+        'error': None,
+    }
+    
+    product_dir = base_dir / 'static' / product_name
+    if not product_dir.exists():
+        result['error'] = "产品目录不存在"
+        return result
+    
+    generator = load_filelist_generator()
+    sources, variants = collect_sources(product_dir, generator)
+    result['sources'] = len(sources)
+    
+    manifest_file = base_dir / 'tools' / 'filelist-generator' / product_name / DERIVATIVES_MANIFEST_NAME
+    manifest = load_derivatives_manifest(manifest_file)
+    
+    tasks = [(source, widths, encoder, manifest.get(posix_path)) for source, posix_path in sources]
+    workers = min(workers, len(tasks))
+    
+    if workers <= 1:
+        outcomes = [create_derivatives(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(create_derivatives, tasks, chunksize=chunksize))
+    
+    new_manifest = {}
+    for (source, posix_path), (created, skipped, logs, entry) in zip(sources, outcomes):
+        new_manifest[posix_path] = entry
+        result['created'] += created
+        result['skipped'] += skipped
+        if logs:
+            print(f"📷 {source.relative_to(product_dir)}")
+            for line in logs:
+                print(line)
+    
+    # 删除原图已不存在、或宽度不在当前档位中的变体
+    if prune:
+        source_widths = {
+            (source.parent, source.stem): set(new_manifest[posix_path]['widths'])
+            for source, posix_path in sources
+        }
+        for file_path in variants:
+            match = VARIANT_PATTERN.match(file_path.name)
+            if not file_path.exists():
+                continue
+            if int(match['width']) not in source_widths.get((file_path.parent, match['base']), ()):
+                file_path.unlink()
+                result['pruned'] += 1
+                print(f"  🗑️  {file_path.relative_to(product_dir)}")
+    
+    if new_manifest != manifest:
+        save_derivatives_manifest(manifest_file, new_manifest)
+    
+    # 有变化时重新生成文件列表，登记新变体
+    if result['created'] or result['pruned']:
+        print()
+        generator.generate_filelist(product_name)
+    
+    return result
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'product': None,
+        'widths': DEFAULT_WIDTHS,
+        'preset': DEFAULT_PRESET,
+        'workers': os.cpu_count() or 1,
+        'prune': False,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-j', '--workers') and i + 1 < len(argv):
+            options['workers'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg.startswith('--widths='):
+            options['widths'] = sorted({int(width) for width in arg.split('=', 1)[1].split(',') if width})
+        elif arg.startswith('--preset='):
+            options['preset'] = arg.split('=', 1)[1]
+        elif arg == '--prune':
+            options['prune'] = True
+        elif options['product'] is None:
+            options['product'] = arg
+        i += 1
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    
+    print("=" * 60)
+    print("🖼️  生成响应式图片变体")
+    print("=" * 60)
+    print()
+    
+    try:
+        encoder = get_preset(options['preset'])
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    
+    base_dir = TOOLS_DIR.parent
+    static_dir = base_dir / 'static'
+    
+    if options['product']:
+        products = [options['product']]
+    else:
+        products = [
+            item.name for item in static_dir.iterdir()
+            if item.is_dir() and not item.name.startswith('.')
+        ]
+    
+    print(f"📐 宽度档位: {', '.join(str(width) for width in options['widths'])}")
+    print(f"🎛️  编码预设: {options['preset']}")
+    print()
+    
+    for product_name in products:
+        print(f"{'='*60}")
+        print(f"📁 处理产品: {product_name}")
+        print(f"{'='*60}")
+        
+        result = process_product(
+            product_name, base_dir, options['widths'], encoder,
+            options['workers'], options['prune']
+        )
+        
+        if result['error']:
+            print(f"⚠️  {result['error']}")
+        else:
+            print()
+            print(f"✅ 原图: {result['sources']} 个")
+            print(f"   生成: {result['created']} 个")
+            print(f"   已是最新: {result['skipped']} 个")
+            if result['pruned']:
+                print(f"   删除: {result['pruned']} 个")
+        print()
+
+
+if __name__ == '__main__':
+    main()
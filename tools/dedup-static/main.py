@@ -0,0 +1,232 @@
+"""
+查找并合并 static 目录下内容完全相同的图片
+
+各人物目录（female-white-middle-standard、female-white-young-standard 等）下的
+home/、home-large/、first-popup/、persons/ 有大量逐字节相同的图片。
+
+功能：
+1. 先用 generate-filelist.py 增量更新 .versions.json，按其中的 (哈希, 大小) 分组
+2. 同组文件逐字节比较确认（filecmp），以路径排序最小的文件为规范文件
+3. 输出重复组数、重复文件数、可节省的空间（已是硬链接的文件不重复计算）
+4. --apply：把重复文件替换为指向规范文件的硬链接（原子替换，路径不变，HTML 无需修改）；
+   rsync -H 同步时硬链接只传一次
+5. --aliases：不改动文件，写出 tools/filelist-generator/{产品}/aliases.json
+   {重复路径: 规范路径}，FileListParser 加载后 API 返回规范文件的 URL，
+   同一内容在浏览器和 CDN 中只缓存一份
+
+默认为预览模式，不修改任何文件。
+
+用法：
+python tools/dedup-static/main.py                                   # 分析所有产品
+python tools/dedup-static/main.py business-headshot-ai --apply      # 合并为硬链接
+python tools/dedup-static/main.py business-headshot-ai --aliases    # 写出别名表
+"""
+
+import filecmp
+import importlib.util
+import json
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from atomic_io import atomic_write
+
+
+ALIASES_NAME = 'aliases.json'
+
+# 报告中列出的最大重复组数
+TOP_GROUPS = 10
+
+
+def load_filelist_generator():
+    """加载 tools/filelist-generator/generate-filelist.py（文件名含 - 无法直接 import）"""
+    module_path = TOOLS_DIR / 'filelist-generator' / 'generate-filelist.py'
+    spec = importlib.util.spec_from_file_location('generate_filelist', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def find_duplicates(product_dir: Path, versions: dict) -> list:
+    """
+    查找内容相同的文件组
+    
+    Returns:
+        [(规范路径, [重复路径, ...], 文件大小), ...]，路径均相对产品目录
+    """
+    groups = defaultdict(list)
+    for posix_path, entry in versions.items():
+        if 'size' in entry:
+            groups[(entry['hash'], entry['size'])].append(posix_path)
+    
+    duplicates = []
+    for (file_hash, size), paths in groups.items():
+        if len(paths) < 2:
+            continue
+        paths.sort()
+        canonical = paths[0]
+        canonical_file = product_dir / canonical
+        if not canonical_file.exists():
+            continue
+        
+        # 哈希相同仍逐字节确认，避免碰撞或 .versions.json 过期
+        same = [
+            path for path in paths[1:]
+            if (product_dir / path).exists()
+            and filecmp.cmp(canonical_file, product_dir / path, shallow=False)
+        ]
+        if same:
+            duplicates.append((canonical, same, size))
+    
+    duplicates.sort(key=lambda group: group[2] * len(group[1]), reverse=True)
+    return duplicates
+
+
+def is_linked(a: Path, b: Path) -> bool:
+    """两个路径是否已是同一个文件（硬链接）"""
+    sa = a.stat()
+    sb = b.stat()
+    return sa.st_ino == sb.st_ino and sa.st_dev == sb.st_dev
+
+
+def hardlink_duplicate(canonical_file: Path, duplicate_file: Path):
+    """把重复文件原子替换为指向规范文件的硬链接"""
+    tmp_file = duplicate_file.with_name(f".{duplicate_file.name}.{os.getpid()}.tmp")
+    try:
+        os.link(canonical_file, tmp_file)
+        os.replace(tmp_file, duplicate_file)
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+
+def save_aliases(aliases_file: Path, aliases: dict):
+    """保存别名表 {重复路径: 规范路径}"""
+    with atomic_write(aliases_file) as f:
+        json.dump(dict(sorted(aliases.items())), f, ensure_ascii=False, indent=2)
+
+
+def dedup_product(product_name: str, static_dir: Path, generator, apply: bool = False,
+                  write_aliases: bool = False) -> dict:
+    """
+    分析 / 合并单个产品
+    
+    Returns:
+        {'files', 'groups', 'duplicates', 'reclaimable', 'linked', 'top'}
+    """
+    product_dir = static_dir / product_name
+    output_dir = TOOLS_DIR / 'filelist-generator' / product_name
+    
+    generator.generate_filelist(product_name)
+    versions = generator.read_versions(output_dir)
+    duplicates = find_duplicates(product_dir, versions)
+    
+    result = {
+        'files': len(versions),
+        'groups': len(duplicates),
+        'duplicates': sum(len(paths) for _, paths, _ in duplicates),
+        'reclaimable': 0,
+        'linked': 0,
+        'top': duplicates[:TOP_GROUPS],
+    }
+    
+    aliases = {}
+    for canonical, paths, size in duplicates:
+        canonical_file = product_dir / canonical
+        for path in paths:
+            aliases[path] = canonical
+            duplicate_file = product_dir / path
+            if is_linked(canonical_file, duplicate_file):
+                continue
+            result['reclaimable'] += size
+            if apply:
+                hardlink_duplicate(canonical_file, duplicate_file)
+                result['linked'] += 1
+    
+    if write_aliases:
+        save_aliases(output_dir / ALIASES_NAME, aliases)
+    
+    if apply and result['linked']:
+        # 硬链接后文件的修改时间变为规范文件的时间，重新生成以刷新记录（哈希不变，版本号不变）
+        generator.generate_filelist(product_name)
+    
+    return result
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'product': None,
+        'apply': False,
+        'aliases': False,
+    }
+    
+    for arg in argv:
+        if arg == '--apply':
+            options['apply'] = True
+        elif arg == '--aliases':
+            options['aliases'] = True
+        elif options['product'] is None:
+            options['product'] = arg
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    dry_run = not options['apply'] and not options['aliases']
+    
+    print("=" * 60)
+    print(f"🧬 重复图片合并工具 {'[预览模式]' if dry_run else '[执行模式]'}")
+    print("=" * 60)
+    print()
+    
+    static_dir = TOOLS_DIR.parent / 'static'
+    if options['product']:
+        products = [options['product']]
+    else:
+        products = sorted(
+            item.name for item in static_dir.iterdir()
+            if item.is_dir() and not item.name.startswith('.')
+        )
+    
+    generator = load_filelist_generator()
+    reports = []
+    for product_name in products:
+        if not (static_dir / product_name).exists():
+            print(f"⚠️  产品目录不存在: {product_name}")
+            continue
+        reports.append((product_name, dedup_product(
+            product_name, static_dir, generator, options['apply'], options['aliases']
+        )))
+    
+    print()
+    print("=" * 60)
+    print("📊 统计信息")
+    print("=" * 60)
+    for product_name, result in reports:
+        print(f"📁 {product_name}")
+        print(f"   图片: {result['files']} 个")
+        print(f"   重复组: {result['groups']} 个，重复文件: {result['duplicates']} 个")
+        print(f"   💾 {'可节省' if not options['apply'] else '已节省'}: "
+              f"{result['reclaimable'] / 1024 / 1024:.2f} MB（已是硬链接的不计）")
+        if options['apply']:
+            print(f"   🔗 新建硬链接: {result['linked']} 个")
+        if options['aliases']:
+            print(f"   📝 别名表: tools/filelist-generator/{product_name}/{ALIASES_NAME}")
+        for canonical, paths, size in result['top']:
+            print(f"   • {canonical} ({size / 1024:.1f} KB) × {len(paths) + 1}")
+        print()
+    print("=" * 60)
+    
+    if dry_run:
+        print("\n💡 提示: --apply 合并为硬链接，--aliases 写出别名表")
+
+
+if __name__ == '__main__':
+    main()
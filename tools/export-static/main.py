@@ -0,0 +1,325 @@
+"""
+导出带内容哈希文件名的静态站点
+
+功能：
+1. 先用 generate-filelist.py 更新产品的 .versions.json（增量，只对变化的文件计算哈希）
+2. 把 static/{产品}/ 导出到构建目录 build/{产品}/：
+   - 图片和 SVG（HASHED_EXTENSIONS）重命名为 name.{哈希前 8 位}.ext（如 city-1.1a2b3c4d.webp），
+     内容变化时文件名随之变化，可以用 Cache-Control: immutable 永久缓存，不再依赖 ?v= 查询参数
+   - 图片的哈希取自 .versions.json，SVG 导出时计算（同样是 MD5）
+   - 其他文件（CSS、JS、字体、文本数据等）和 UNHASHED_NAMES 中的固定文件名按原名导出：
+     CSS/JS 内部的相对引用不做改写，脚本按固定 URL 加载的数据文件（如 first-popup/introSteps.txt）也不会找不到
+   - HTML 中的资源引用（src、href、srcset、内联 CSS url()）改写为带哈希的文件名
+     （复用 update-html-img-src-with-version 的 rewrite_asset_refs，已有的 ?v= 会被去掉）；
+     脚本中按名称加载的图片请通过 manifest.json 查找带哈希的路径
+3. 写出 build/{产品}/manifest.json：{原路径: 带哈希的路径}，供服务端 / 前端查找
+4. 增量导出：带哈希的文件名已存在即内容相同，直接跳过；固定文件名的文件大小和修改时间不变时跳过；
+   HTML 内容不变时不重写
+5. 默认复制导出；--link 改用硬链接（不占额外空间，跨文件系统时自动改为复制）。
+   硬链接与 static/ 下的原文件是同一个 inode：原地修改原文件（编辑器直接覆盖写入等）会同时改变
+   构建目录中"不可变"的带哈希文件，已缓存的客户端与服务器内容不一致。只在确认原文件总是被整体替换
+   （写临时文件再 rename）时使用
+6. 清理构建目录中不再需要的文件（旧哈希的文件等），--no-prune 保留
+   （部署期间旧 HTML 仍可能引用旧文件名时使用）
+
+用法：
+python tools/export-static/main.py                               # 导出所有产品到 build/
+python tools/export-static/main.py business-headshot-ai
+python tools/export-static/main.py --out /tmp/site --link
+python tools/export-static/main.py business-headshot-ai --no-prune
+"""
+
+import importlib.util
+import json
+import os
+import posixpath
+import shutil
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from atomic_io import atomic_write, atomic_write_bytes
+
+
+# 文件名中保留的哈希位数
+HASH_LENGTH = 8
+
+# 需要改写资源引用的文件（按原名导出）
+HTML_EXTENSIONS = {'.html', '.htm'}
+
+# 导出为带哈希文件名的类型（图片和 SVG），其他文件按原名导出
+HASHED_EXTENSIONS = {'.webp', '.avif', '.jpg', '.jpeg', '.png', '.gif', '.svg'}
+
+# 必须保持固定 URL 的文件名（按原名导出，不加哈希）
+UNHASHED_NAMES = {'robots.txt', 'favicon.ico', 'sitemap.xml', 'site.webmanifest'}
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 1
+
+
+def load_tool_module(name: str, module_path: Path):
+    """加载文件名含 - 的工具脚本"""
+    spec = importlib.util.spec_from_file_location(name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def hashed_name(posix_path: str, file_hash: str) -> str:
+    """images/home/city-1.webp -> images/home/city-1.1a2b3c4d.webp"""
+    stem, ext = posixpath.splitext(posix_path)
+    return f"{stem}.{file_hash[:HASH_LENGTH]}{ext}"
+
+
+def iter_product_files(product_dir: Path):
+    """
+    遍历产品目录下的所有文件（跳过隐藏文件和目录、预压缩文件）
+    
+    Yields:
+        (文件路径, 相对产品目录的 POSIX 路径)
+    """
+    for root, dirs, filenames in os.walk(product_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith('.') or filename.endswith(('.gz', '.br')):
+                continue
+            file_path = Path(root) / filename
+            yield file_path, file_path.relative_to(product_dir).as_posix()
+
+
+def link_or_copy(source: Path, target: Path, link: bool = False) -> str:
+    """
+    导出单个文件（先写同目录临时文件，再原子替换）
+    
+    Returns:
+        'link' 或 'copy'
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    method = 'copy'
+    try:
+        if link:
+            try:
+                os.link(source, tmp_target)
+                method = 'link'
+            except OSError:
+                # 跨文件系统或不支持硬链接
+                pass
+        if method == 'copy':
+            shutil.copy2(source, tmp_target)
+        os.replace(tmp_target, target)
+    finally:
+        if tmp_target.exists():
+            tmp_target.unlink()
+    return method
+
+
+def is_same_file(source: Path, target: Path) -> bool:
+    """目标已存在且大小、修改时间与源文件一致（硬链接时为同一个 inode）"""
+    try:
+        src = source.stat()
+        dst = target.stat()
+    except FileNotFoundError:
+        return False
+    return (src.st_ino == dst.st_ino and src.st_dev == dst.st_dev) or (
+        src.st_size == dst.st_size and src.st_mtime_ns == dst.st_mtime_ns
+    )
+
+
+def make_hashed_resolver(asset_map: dict, html_relative_dir: str):
+    """
+    构建把 ./相对路径 改写为带哈希文件名的 resolve 回调
+    
+    Args:
+        asset_map: {原路径: 带哈希的路径}（相对产品目录）
+        html_relative_dir: HTML 所在目录（相对产品目录），根目录为 '.'
+    """
+    def resolve(ref: str):
+        clean_path = ref[2:].split('?v=')[0]
+        full_path = clean_path if html_relative_dir == '.' else f"{html_relative_dir}/{clean_path}"
+        hashed = asset_map.get(posixpath.normpath(full_path))
+        if hashed is None:
+            return None
+        return f"./{posixpath.join(posixpath.dirname(clean_path), posixpath.basename(hashed))}"
+    
+    return resolve
+
+
+def export_product(product_name: str, base_dir: Path, out_dir: Path, generator, html_updater,
+                   link: bool = False, prune: bool = True) -> dict:
+    """
+    导出单个产品
+    
+    Returns:
+        {'assets', 'exported', 'skipped', 'html', 'html_updated', 'pruned', 'method'}
+    """
+    product_dir = base_dir / 'static' / product_name
+    build_dir = out_dir / product_name
+    stats = {'assets': 0, 'exported': 0, 'skipped': 0, 'html': 0, 'html_updated': 0, 'pruned': 0,
+             'method': set()}
+    
+    # 更新 .versions.json（增量），取得每个图片的内容哈希
+    generator.generate_filelist(product_name)
+    versions = generator.read_versions(TOOLS_DIR / 'filelist-generator' / product_name)
+    
+    asset_map = {}
+    html_files = []
+    expected = {MANIFEST_NAME}
+    
+    for file_path, posix_path in iter_product_files(product_dir):
+        if Path(posix_path).suffix.lower() in HTML_EXTENSIONS:
+            html_files.append((file_path, posix_path))
+            expected.add(posix_path)
+            continue
+        
+        if Path(posix_path).suffix.lower() in HASHED_EXTENSIONS and file_path.name not in UNHASHED_NAMES:
+            # 图片的哈希已在 .versions.json 中，SVG 在这里计算
+            entry = versions.get(posix_path)
+            file_hash = entry['hash'] if entry is not None else generator.get_file_hash(file_path)
+            # 带哈希的文件名存在即内容相同
+            target_path = hashed_name(posix_path, file_hash)
+            asset_map[posix_path] = target_path
+            stats['assets'] += 1
+            if (build_dir / target_path).exists():
+                stats['skipped'] += 1
+                expected.add(target_path)
+                continue
+        else:
+            target_path = posix_path
+            if is_same_file(file_path, build_dir / target_path):
+                stats['skipped'] += 1
+                expected.add(target_path)
+                continue
+        
+        stats['method'].add(link_or_copy(file_path, build_dir / target_path, link))
+        stats['exported'] += 1
+        expected.add(target_path)
+    
+    # HTML：改写资源引用为带哈希的文件名，内容不变时不重写
+    for file_path, posix_path in html_files:
+        stats['html'] += 1
+        content = file_path.read_text(encoding='utf-8')
+        resolve = make_hashed_resolver(asset_map, posixpath.dirname(posix_path) or '.')
+        new_content = html_updater.rewrite_asset_refs(content, resolve).encode('utf-8')
+        
+        target = build_dir / posix_path
+        if target.exists() and target.read_bytes() == new_content:
+            continue
+        target.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(target, new_content)
+        stats['html_updated'] += 1
+    
+    build_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'product': product_name,
+        'assets': dict(sorted(asset_map.items())),
+    }
+    manifest_file = build_dir / MANIFEST_NAME
+    new_manifest = json.dumps(manifest, ensure_ascii=False, indent=2)
+    if not manifest_file.exists() or manifest_file.read_text(encoding='utf-8') != new_manifest:
+        with atomic_write(manifest_file) as f:
+            f.write(new_manifest)
+    
+    if prune:
+        stats['pruned'] = prune_build_dir(build_dir, expected)
+    
+    return stats
+
+
+def prune_build_dir(build_dir: Path, expected: set) -> int:
+    """删除构建目录中不在 expected 里的文件和空目录"""
+    removed = 0
+    for root, dirs, filenames in os.walk(build_dir, topdown=False):
+        for filename in filenames:
+            file_path = Path(root) / filename
+            if file_path.relative_to(build_dir).as_posix() not in expected:
+                file_path.unlink()
+                removed += 1
+        if Path(root) != build_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'product': None,
+        'out': None,
+        'link': False,
+        'prune': True,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == '--out' and i + 1 < len(argv):
+            options['out'] = Path(argv[i + 1])
+            i += 2
+            continue
+        if arg.startswith('--out='):
+            options['out'] = Path(arg.split('=', 1)[1])
+        elif arg == '--link':
+            options['link'] = True
+        elif arg == '--copy':
+            # 复制已是默认行为，保留参数兼容旧命令
+            options['link'] = False
+        elif arg == '--no-prune':
+            options['prune'] = False
+        elif options['product'] is None:
+            options['product'] = arg
+        i += 1
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    base_dir = TOOLS_DIR.parent
+    out_dir = (options['out'] or base_dir / 'build').resolve()
+    static_dir = base_dir / 'static'
+    
+    print("=" * 60)
+    print("📦 导出带哈希文件名的静态站点")
+    print("=" * 60)
+    print(f"📁 输出目录: {out_dir}")
+    print()
+    
+    if options['product']:
+        products = [options['product']]
+    else:
+        products = sorted(
+            item.name for item in static_dir.iterdir()
+            if item.is_dir() and not item.name.startswith('.')
+        )
+    
+    generator = load_tool_module('generate_filelist', TOOLS_DIR / 'filelist-generator' / 'generate-filelist.py')
+    html_updater = load_tool_module('update_html', TOOLS_DIR / 'update-html-img-src-with-version' / 'main.py')
+    
+    for product_name in products:
+        if not (static_dir / product_name).exists():
+            print(f"⚠️  产品目录不存在: {product_name}")
+            continue
+        
+        stats = export_product(product_name, base_dir, out_dir, generator, html_updater,
+                               options['link'], options['prune'])
+        method = '硬链接' if stats['method'] == {'link'} else '复制' if stats['method'] else '-'
+        print()
+        print(f"✅ {product_name}: {stats['assets']} 个带哈希的文件，导出 {stats['exported']} 个文件（{method}），"
+              f"未变化跳过 {stats['skipped']} 个")
+        print(f"   HTML: {stats['html']} 个，重写 {stats['html_updated']} 个")
+        if stats['pruned']:
+            print(f"   🗑️  清理 {stats['pruned']} 个过期文件")
+        print()
+    
+    print("=" * 60)
+    print("💡 带哈希的文件可以永久缓存：Cache-Control: public, max-age=31536000, immutable")
+    print("   HTML 和 manifest.json 请使用 no-cache")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""
+Server 端 API 集成示例（ASGI 版本）
+与 api_example.py 提供相同的端点，但基于 asyncio：
+
+- 静态文件分块异步发送，读文件放到线程池，传输大图时不占用工作线程，
+  单进程可同时保持上千个连接
+- 直接实现 ASGI 接口，不依赖 Web 框架；用 uvicorn 等 ASGI 服务器运行
+- 与 Flask 版本共用 api_handlers.py 中的端点处理函数、FileListParser 和 ResponseCache，
+  这里只负责 ASGI 路由、响应缓存和发送
+- 端点处理（过滤、构建 JSON、gzip 压缩）和 files.txt 变化检查都在单独的解析器线程中执行，
+  慢请求（如大批量的 /api/batch）不会阻塞事件循环上的其他连接；
+  只用一个线程，重新加载和查询不会并发访问解析器。变化检查每 RELOAD_CHECK_INTERVAL 秒最多一次
+
+用法：
+pip install uvicorn
+python tools/filelist-generator/api_asgi.py                  # 监听 5001 端口
+uvicorn api_asgi:app --app-dir tools/filelist-generator --port 5001 --workers 4
+
+吞吐量对比见 bench_api.py
+"""
+
+import asyncio
+import gzip
+import json
+import mimetypes
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from urllib.parse import parse_qsl
+
+from api_handlers import (
+    PRODUCT_SLUG, STORE_ROOT, APIError, api_batch, api_categories, api_category_files, api_directory,
+    api_files, api_health, api_search, api_stats, api_variants, load_parser, parse_query
+)
+from response_cache import ResponseCache
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+# 静态文件每次读取 / 发送的块大小
+CHUNK_SIZE = 256 * 1024
+
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+
+# files.txt 变化检查的最小间隔（秒）
+RELOAD_CHECK_INTERVAL = 1.0
+
+# 初始化解析器
+parser = load_parser()
+
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES)
+
+# 解析器只在这一个线程中访问：重新加载和端点处理不阻塞事件循环，也不会并发执行
+parser_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='parser')
+last_reload_check = 0.0
+
+
+# ==================== 路由 ====================
+
+def health(parser, query, body, base_url):
+    """健康检查，附带响应缓存统计"""
+    data = api_health(parser, query, body, base_url)
+    data['response_cache'] = response_cache.get_info()
+    return data
+
+
+# (方法, 路径) -> (处理函数, 是否缓存)
+ROUTES = {
+    ('GET', '/api/health'): (health, False),
+    ('GET', '/api/files'): (api_files, True),
+    ('GET', '/api/categories'): (api_categories, True),
+    ('GET', '/api/search'): (api_search, True),
+    ('GET', '/api/directory'): (api_directory, True),
+    ('GET', '/api/variants'): (api_variants, True),
+    ('POST', '/api/batch'): (api_batch, True),
+    ('GET', '/api/stats'): (api_stats, True),
+}
+
+CATEGORY_ROUTE = re.compile(r'^/api/categories/([^/]+)$')
+
+
+# ==================== ASGI ====================
+
+def header_value(scope, name: bytes) -> str:
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def accepts_gzip(scope) -> bool:
+    """Accept-Encoding 中包含 gzip 且 q 不为 0"""
+    for part in header_value(scope, b'accept-encoding').split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            return params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def send_response(send, status: int, headers: list, body: bytes = b''):
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def send_json(send, status: int, data):
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    await send_response(send, status, [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode()),
+    ], body)
+
+
+def reload_filelist():
+    """files.txt 有变化时重新加载，并使响应缓存失效（在 parser_executor 中执行）"""
+    if parser.reload():
+        response_cache.clear()
+
+
+def run_handler(handler, cacheable: bool, path: str, query: dict, body: bytes, base_url: str, args: tuple):
+    """
+    调用端点处理函数并写入响应缓存（在 parser_executor 中执行）
+    
+    Returns:
+        可缓存时为 (压缩后的 JSON, etag)，否则为 dict；APIError 原样抛出
+    """
+    data = handler(parser, query, body, base_url, *args)
+    if not cacheable:
+        return data
+    key = (path, tuple(sorted(query.items())), body, base_url, parser.version)
+    return response_cache.put(key, data)
+
+
+async def handle_api(scope, receive, send, handler, cacheable: bool, args: tuple):
+    global last_reload_check
+    
+    if not parser:
+        await send_json(send, 500, {'error': 'File list not loaded'})
+        return
+    
+    loop = asyncio.get_running_loop()
+    now = time.monotonic()
+    if now - last_reload_check >= RELOAD_CHECK_INTERVAL:
+        last_reload_check = now
+        await loop.run_in_executor(parser_executor, reload_filelist)
+    
+    query = parse_query(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+    body = await read_body(receive) if scope['method'] == 'POST' else b''
+    host = header_value(scope, b'host') or 'localhost'
+    base_url = f"{scope.get('scheme', 'http')}://{host}"
+    
+    # 命中缓存时直接在事件循环中返回，未命中时交给解析器线程
+    key = (scope['path'], tuple(sorted(query.items())), body, base_url, parser.version)
+    entry = response_cache.get(key) if cacheable else None
+    if entry is None:
+        try:
+            entry = await loop.run_in_executor(
+                parser_executor, run_handler, handler, cacheable, scope['path'], query, body, base_url, args
+            )
+        except APIError as e:
+            await send_json(send, e.status, {'error': e.message})
+            return
+        if not cacheable:
+            await send_json(send, 200, entry)
+            return
+    
+    payload, etag = entry
+    headers = [
+        (b'etag', f'"{etag}"'.encode()),
+        (b'vary', b'Accept-Encoding'),
+        (b'cache-control', b'no-cache'),
+    ]
+    if f'"{etag}"' in header_value(scope, b'if-none-match'):
+        await send_response(send, 304, headers)
+        return
+    
+    if accepts_gzip(scope):
+        headers.append((b'content-encoding', b'gzip'))
+    else:
+        payload = gzip.decompress(payload)
+    headers += [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(payload)).encode()),
+    ]
+    await send_response(send, 200, headers, payload)
+
+
+async def serve_file(scope, send, product: str, file_path: str):
+    """分块异步发送静态文件"""
+    if product != PRODUCT_SLUG:
+        await send_json(send, 404, {'error': 'Product not found'})
+        return
+    
+    product_root = (STORE_ROOT / product).resolve()
+    full_path = (product_root / file_path).resolve()
+    if product_root not in full_path.parents or not full_path.is_file():
+        await send_json(send, 404, {'error': 'File not found'})
+        return
+    
+    loop = asyncio.get_running_loop()
+    f = await loop.run_in_executor(None, open, full_path, 'rb')
+    try:
+        stat = await loop.run_in_executor(None, lambda: full_path.stat())
+        content_type = mimetypes.guess_type(full_path.name)[0] or 'application/octet-stream'
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', content_type.encode()),
+                (b'content-length', str(stat.st_size).encode()),
+                (b'last-modified', formatdate(stat.st_mtime, usegmt=True).encode()),
+            ],
+        })
+        
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        
+        while True:
+            chunk = await loop.run_in_executor(None, f.read, CHUNK_SIZE)
+            more = len(chunk) == CHUNK_SIZE
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more})
+            if not more:
+                break
+    finally:
+        await loop.run_in_executor(None, f.close)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI 入口"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+    
+    method = scope['method']
+    path = scope['path']
+    
+    route = ROUTES.get((method, path))
+    if route:
+        await handle_api(scope, receive, send, route[0], route[1], ())
+        return
+    
+    match = CATEGORY_ROUTE.match(path)
+    if match and method == 'GET':
+        await handle_api(scope, receive, send, api_category_files, True, (match.group(1),))
+        return
+    
+    if method in ('GET', 'HEAD') and not path.startswith('/api/'):
+        product, _, file_path = path.lstrip('/').partition('/')
+        if file_path:
+            await serve_file(scope, send, product, file_path)
+            return
+    
+    await send_json(send, 404, {'error': 'Not found'})
+
+
+# ==================== 主函数 ====================
+
+def main():
+    """启动服务器"""
+    print("=" * 60)
+    print("🚀 Static Resource API Server (ASGI)")
+    print("=" * 60)
+    print(f"Product: {PRODUCT_SLUG}")
+    print(f"Store Root: {STORE_ROOT}")
+    print(f"Total Files: {parser.get_total_count() if parser else 0}")
+    print()
+    print("端点与 api_example.py 相同，监听 http://0.0.0.0:5001")
+    print("=" * 60)
+    print()
+    
+    if uvicorn is None:
+        print("❌ 未安装 uvicorn: pip install uvicorn")
+        return
+    
+    uvicorn.run(app, host='0.0.0.0', port=5001, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
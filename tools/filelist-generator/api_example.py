@@ -1,28 +1,98 @@
 """
 Server 端 API 集成示例
 展示如何使用 FileListParser 构建 RESTful API
+
+端点的处理逻辑在 api_handlers.py 中（与 api_asgi.py 共用），这里只负责 Flask 路由和响应缓存
 """
 
-from flask import Flask, jsonify, request, send_file
-from pathlib import Path
-from filelist_parser import FileListParser
-import os
+from flask import Flask, Response, jsonify, request, send_file
+from api_handlers import (
+    PRODUCT_SLUG, STORE_ROOT, APIError, api_batch, api_categories, api_category_files, api_directory,
+    api_files, api_health, api_search, api_stats, api_variants, load_parser, parse_query
+)
+from response_cache import ResponseCache
+import functools
+import gzip
 
 app = Flask(__name__)
 
-# 配置
-STORE_ROOT = Path(__file__).parent.parent.parent / 'static'
-PRODUCT_SLUG = 'business-headshot-ai'
-FILELIST_PATH = Path(__file__).parent / PRODUCT_SLUG / 'files.txt'
-
 # 初始化解析器
-try:
-    parser = FileListParser(str(FILELIST_PATH))
-    print(f"✅ 文件列表加载成功: {parser.get_total_count()} 个文件")
-except FileNotFoundError:
-    print(f"❌ 文件列表不存在: {FILELIST_PATH}")
-    print("请先运行: ./generate-filelist.sh business-headshot-ai")
-    parser = None
+parser = load_parser()
+
+# 每个请求前检查 files.txt 是否变化；prefork_server.py 设为 False，由主进程检查并替换 worker
+AUTO_RELOAD = True
+
+# 响应缓存：文件列表版本不变时直接返回序列化、压缩好的 JSON
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES)
+
+
+@app.before_request
+def reload_filelist():
+    """files.txt 有变化时重新加载，并使响应缓存失效"""
+    if AUTO_RELOAD and parser and parser.reload():
+        response_cache.clear()
+
+
+def cached_json(view):
+    """
+    缓存 JSON 响应
+    
+    被装饰的视图返回 dict；缓存键为 (端点, 路径参数, 排序后的查询参数, 请求体, Host, 文件列表版本号)，
+    Host 参与是因为响应中的 URL 带有 host_url。视图返回 Response / 元组（如错误响应）时不缓存。
+    支持 ETag / If-None-Match，客户端接受 gzip 时直接返回压缩后的字节。
+    """
+    @functools.wraps(view)
+    def wrapper(**kwargs):
+        if not parser:
+            return jsonify({'error': 'File list not loaded'}), 500
+        
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request_query().items())),
+            request.get_data(),
+            request.host_url,
+            parser.version,
+        )
+        entry = response_cache.get(key)
+        if entry is None:
+            data = view(**kwargs)
+            if not isinstance(data, dict):
+                return data
+            entry = response_cache.put(key, data)
+        
+        body, etag = entry
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        elif request.accept_encodings['gzip'] > 0:
+            response = Response(body, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(gzip.decompress(body), mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    return wrapper
+
+
+def request_query() -> dict:
+    """查询参数（同名参数取第一个值，与 api_asgi.py 一致）"""
+    return parse_query(request.args.items(multi=True))
+
+
+def call_handler(handler, *args):
+    """
+    调用 api_handlers 中的处理函数
+    
+    APIError 转为 JSON 错误响应（不缓存）
+    """
+    try:
+        return handler(parser, request_query(), request.get_data(), request.host_url.rstrip('/'), *args)
+    except APIError as e:
+        return jsonify({'error': e.message}), e.status
 
 
 # ==================== API 端点 ====================
@@ -30,14 +100,13 @@ except FileNotFoundError:
 @app.route('/api/health')
 def health():
     """健康检查"""
-    return jsonify({
-        'status': 'ok',
-        'product': PRODUCT_SLUG,
-        'total_files': parser.get_total_count() if parser else 0
-    })
+    data = call_handler(api_health)
+    data['response_cache'] = response_cache.get_info()
+    return jsonify(data)
 
 
 @app.route('/api/files')
+@cached_json
 def get_files():
     """
     获取文件列表（分页）
@@ -45,35 +114,18 @@ def get_files():
     Query Parameters:
         page: 页码（默认 1）
         page_size: 每页数量（默认 20，最大 100）
+        cursor: 游标分页，第一页传空值，之后传上一页返回的 next_cursor（传了 cursor 时忽略 page）
     
     Example:
         GET /api/files?page=1&page_size=20
+        GET /api/files?cursor=&page_size=20
+        GET /api/files?cursor=aW1hZ2VzL2hvbWUv...&page_size=20
     """
-    if not parser:
-        return jsonify({'error': 'File list not loaded'}), 500
-    
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    
-    # 限制 page_size
-    page_size = min(page_size, 100)
-    
-    data = parser.get_page(page, page_size)
-    
-    # 添加完整 URL
-    base_url = request.host_url.rstrip('/')
-    data['items'] = [
-        {
-            'path': item,
-            'url': f"{base_url}/{PRODUCT_SLUG}/{item}"
-        }
-        for item in data['items']
-    ]
-    
-    return jsonify(data)
+    return call_handler(api_files)
 
 
 @app.route('/api/categories')
+@cached_json
 def get_categories():
     """
     获取所有分类
@@ -81,37 +133,11 @@ def get_categories():
     Example:
         GET /api/categories
     """
-    if not parser:
-        return jsonify({'error': 'File list not loaded'}), 500
-    
-    categories = {
-        'home': '首页图片',
-        'faces': '人脸图片',
-        'backdrops': '背景图片',
-        'poses': '姿势图片',
-        'outfits': '服装图片',
-        'hairstyles': '发型图片',
-        'expressions': '表情图片',
-        'glasses': '眼镜图片',
-    }
-    
-    result = []
-    for key, name in categories.items():
-        files = parser.get_files_by_category(key)
-        if files:
-            result.append({
-                'key': key,
-                'name': name,
-                'count': len(files)
-            })
-    
-    return jsonify({
-        'total': len(result),
-        'categories': result
-    })
+    return call_handler(api_categories)
 
 
 @app.route('/api/categories/<category>')
+@cached_json
 def get_category_files(category):
     """
     获取分类文件（分页）
@@ -122,35 +148,17 @@ def get_category_files(category):
     Query Parameters:
         page: 页码（默认 1）
         page_size: 每页数量（默认 20，最大 100）
+        cursor: 游标分页，同 /api/files
     
     Example:
         GET /api/categories/home?page=1&page_size=20
+        GET /api/categories/home?cursor=&page_size=20
     """
-    if not parser:
-        return jsonify({'error': 'File list not loaded'}), 500
-    
-    page = request.args.get('page', 1, type=int)
-    page_size = request.args.get('page_size', 20, type=int)
-    
-    # 限制 page_size
-    page_size = min(page_size, 100)
-    
-    data = parser.get_paginated_category(category, page, page_size)
-    
-    # 添加完整 URL
-    base_url = request.host_url.rstrip('/')
-    data['items'] = [
-        {
-            'path': item,
-            'url': f"{base_url}/{PRODUCT_SLUG}/{item}"
-        }
-        for item in data['items']
-    ]
-    
-    return jsonify(data)
+    return call_handler(api_category_files, category)
 
 
 @app.route('/api/search')
+@cached_json
 def search_files():
     """
     搜索文件
@@ -163,36 +171,11 @@ def search_files():
         GET /api/search?q=blur
         GET /api/search?q=City&case_sensitive=true
     """
-    if not parser:
-        return jsonify({'error': 'File list not loaded'}), 500
-    
-    keyword = request.args.get('q', '').strip()
-    if not keyword:
-        return jsonify({'error': 'Missing keyword'}), 400
-    
-    case_sensitive = request.args.get('case_sensitive', 'false').lower() == 'true'
-    
-    files = parser.search(keyword, case_sensitive)
-    
-    # 添加完整 URL
-    base_url = request.host_url.rstrip('/')
-    items = [
-        {
-            'path': item,
-            'url': f"{base_url}/{PRODUCT_SLUG}/{item}"
-        }
-        for item in files
-    ]
-    
-    return jsonify({
-        'keyword': keyword,
-        'case_sensitive': case_sensitive,
-        'total': len(items),
-        'items': items
-    })
+    return call_handler(api_search)
 
 
 @app.route('/api/directory')
+@cached_json
 def get_directory():
     """
     获取目录结构
@@ -204,53 +187,59 @@ def get_directory():
         GET /api/directory?path=images/
         GET /api/directory?path=images/home/
     """
-    if not parser:
-        return jsonify({'error': 'File list not loaded'}), 500
+    return call_handler(api_directory)
+
+
+@app.route('/api/variants')
+@cached_json
+def get_variants():
+    """
+    获取图片的响应式变体，并选出宽度足够的最小版本
+    
+    Query Parameters:
+        path: 原图路径（必需）
+        width: 需要的最小宽度（可选）
+    
+    Example:
+        GET /api/variants?path=images/home/city/23.webp
+        GET /api/variants?path=images/home/city/23.webp&width=600
+    """
+    return call_handler(api_variants)
+
+
+@app.route('/api/batch', methods=['POST'])
+@cached_json
+def batch_lookup():
+    """
+    批量查找文件：一次请求返回多个路径 / 前缀对应的带版本号 URL 和元数据
     
-    path = request.args.get('path', '').strip()
+    Request Body (JSON):
+        paths: 文件路径列表（可选）
+        prefixes: 路径前缀列表（可选），返回前缀下的所有文件
     
-    structure = parser.get_directory_structure(path)
+    Response:
+        按列返回：columns 中每个字段一个数组，第 i 个文件的数据为各数组的第 i 项
     
-    return jsonify({
-        'path': path or '/',
-        'directories': structure['directories'],
-        'files': structure['files'],
-        'total_directories': len(structure['directories']),
-        'total_files': len(structure['files'])
-    })
+    Example:
+        POST /api/batch
+        {"paths": ["images/home/city/23.webp"],
+         "prefixes": ["images/options/poses/female-white-middle-standard/"]}
+    """
+    return call_handler(api_batch)
 
 
 @app.route('/api/stats')
+@cached_json
 def get_stats():
     """
-    获取统计信息
+    获取统计信息（文件数、总字节数、各分类 / 格式 / 人物的文件数）
+    
+    统计在解析器加载时预先计算，文件列表变化时增量更新
     
     Example:
         GET /api/stats
     """
-    if not parser:
-        return jsonify({'error': 'File list not loaded'}), 500
-    
-    # 统计各分类的文件数
-    categories = ['home', 'faces', 'backdrops', 'poses', 'outfits', 'hairstyles']
-    category_stats = {}
-    
-    for category in categories:
-        files = parser.get_files_by_category(category)
-        category_stats[category] = len(files)
-    
-    # 统计文件格式
-    all_files = parser.get_all_files()
-    format_stats = {}
-    for file_path in all_files:
-        ext = Path(file_path).suffix.lower()
-        format_stats[ext] = format_stats.get(ext, 0) + 1
-    
-    return jsonify({
-        'total_files': parser.get_total_count(),
-        'categories': category_stats,
-        'formats': format_stats
-    })
+    return call_handler(api_stats)
 
 
 # ==================== 静态文件服务 ====================
@@ -299,11 +288,13 @@ def main():
     print()
     print("API Endpoints:")
     print("  GET  /api/health              - 健康检查")
-    print("  GET  /api/files               - 获取文件列表（分页）")
+    print("  GET  /api/files               - 获取文件列表（分页，支持 cursor 游标）")
     print("  GET  /api/categories          - 获取所有分类")
     print("  GET  /api/categories/<name>   - 获取分类文件（分页）")
     print("  GET  /api/search?q=<keyword>  - 搜索文件")
     print("  GET  /api/directory?path=<p>  - 获取目录结构")
+    print("  GET  /api/variants?path=<p>   - 获取图片响应式变体")
+    print("  POST /api/batch               - 批量查找路径 / 前缀")
     print("  GET  /api/stats               - 获取统计信息")
     print()
     print("Static Files:")
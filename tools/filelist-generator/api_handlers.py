@@ -0,0 +1,232 @@
+"""
+API 端点的处理逻辑（api_example.py 和 api_asgi.py 共用）
+
+每个处理函数接收 (parser, query, body, base_url, *路径参数)，返回可序列化为 JSON 的 dict：
+- query: 查询参数 {名称: 值}，由 parse_query 生成（同名参数取第一个值）
+- body: 请求体字节（GET 请求为 b''）
+- base_url: 'http://host:port'，不带末尾的 /
+
+参数错误时抛出 APIError(状态码, 消息)。Web 层只负责解析请求、响应缓存和发送响应，
+两个版本的端点行为因此保持一致。
+"""
+
+import json
+from pathlib import Path
+
+from filelist_parser import FileListParser
+
+
+# 配置
+STORE_ROOT = Path(__file__).parent.parent.parent / 'static'
+PRODUCT_SLUG = 'business-headshot-ai'
+FILELIST_PATH = Path(__file__).parent / PRODUCT_SLUG / 'files.txt'
+
+# 分页每页最多返回的数量
+MAX_PAGE_SIZE = 100
+
+# /api/batch 限制：单次最多传入的路径 + 前缀数、最多返回的文件数
+MAX_BATCH_KEYS = 1000
+MAX_BATCH_ROWS = 10000
+
+CATEGORY_NAMES = {
+    'home': '首页图片',
+    'faces': '人脸图片',
+    'backdrops': '背景图片',
+    'poses': '姿势图片',
+    'outfits': '服装图片',
+    'hairstyles': '发型图片',
+    'expressions': '表情图片',
+    'glasses': '眼镜图片',
+}
+
+
+class APIError(Exception):
+    """返回 JSON 错误响应 {'error': 消息}"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def load_parser():
+    """加载文件列表，不存在时打印提示并返回 None"""
+    try:
+        parser = FileListParser(str(FILELIST_PATH))
+        print(f"✅ 文件列表加载成功: {parser.get_total_count()} 个文件")
+        return parser
+    except FileNotFoundError:
+        print(f"❌ 文件列表不存在: {FILELIST_PATH}")
+        print("请先运行: ./generate-filelist.sh business-headshot-ai")
+        return None
+
+
+def parse_query(pairs) -> dict:
+    """
+    查询参数 [(名称, 值), ...] 转为 dict，同名参数取第一个值
+    
+    两个 Web 层都用它解析查询参数，?limit=1&limit=50 的响应和缓存键因此一致
+    """
+    query = {}
+    for name, value in pairs:
+        query.setdefault(name, value)
+    return query
+
+
+def get_int(query: dict, name: str, default: int) -> int:
+    """读取整数参数，缺失或格式不正确时返回 default"""
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        return default
+
+
+def file_url(base_url: str, path: str) -> str:
+    return f"{base_url}/{PRODUCT_SLUG}/{path}"
+
+
+def with_urls(items: list, base_url: str) -> list:
+    return [{'path': item, 'url': file_url(base_url, item)} for item in items]
+
+
+# ==================== 端点 ====================
+
+def api_health(parser, query, body, base_url):
+    """健康检查（Web 层补充 response_cache 统计）"""
+    return {
+        'status': 'ok',
+        'product': PRODUCT_SLUG,
+        'total_files': parser.get_total_count() if parser else 0,
+    }
+
+
+def api_files(parser, query, body, base_url):
+    """文件列表（分页；传了 cursor 时按游标分页，忽略 page）"""
+    page_size = min(get_int(query, 'page_size', 20), MAX_PAGE_SIZE)
+    if 'cursor' in query:
+        try:
+            data = parser.get_page_after(query['cursor'], page_size)
+        except ValueError:
+            raise APIError(400, 'Invalid cursor')
+    else:
+        data = parser.get_page(get_int(query, 'page', 1), page_size)
+    data['items'] = with_urls(data['items'], base_url)
+    return data
+
+
+def api_categories(parser, query, body, base_url):
+    """所有分类及文件数（分类计数在解析器加载时已预先统计）"""
+    counts = parser.get_stats()['categories']
+    result = [
+        {'key': key, 'name': name, 'count': counts[key]}
+        for key, name in CATEGORY_NAMES.items() if counts.get(key)
+    ]
+    return {'total': len(result), 'categories': result}
+
+
+def api_category_files(parser, query, body, base_url, category):
+    """分类文件（分页，参数同 api_files）"""
+    page_size = min(get_int(query, 'page_size', 20), MAX_PAGE_SIZE)
+    if 'cursor' in query:
+        try:
+            data = parser.get_category_page_after(category, query['cursor'], page_size)
+        except ValueError:
+            raise APIError(400, 'Invalid cursor')
+    else:
+        data = parser.get_paginated_category(category, get_int(query, 'page', 1), page_size)
+    data['items'] = with_urls(data['items'], base_url)
+    return data
+
+
+def api_search(parser, query, body, base_url):
+    """按关键词搜索文件"""
+    keyword = query.get('q', '').strip()
+    if not keyword:
+        raise APIError(400, 'Missing keyword')
+    case_sensitive = query.get('case_sensitive', 'false').lower() == 'true'
+    items = with_urls(parser.search(keyword, case_sensitive), base_url)
+    return {
+        'keyword': keyword,
+        'case_sensitive': case_sensitive,
+        'total': len(items),
+        'items': items
+    }
+
+
+def api_directory(parser, query, body, base_url):
+    """目录结构"""
+    path = query.get('path', '').strip()
+    structure = parser.get_directory_structure(path)
+    return {
+        'path': path or '/',
+        'directories': structure['directories'],
+        'files': structure['files'],
+        'total_directories': len(structure['directories']),
+        'total_files': len(structure['files'])
+    }
+
+
+def api_variants(parser, query, body, base_url):
+    """图片的响应式变体；传了 width 时选出宽度足够的最小版本"""
+    path = query.get('path', '').strip()
+    if not path:
+        raise APIError(400, 'Missing path')
+    
+    original = parser.find_file(path)
+    if original is None:
+        raise APIError(404, 'File not found')
+    
+    data = {
+        'path': original,
+        'url': file_url(base_url, original),
+        'variants': [
+            {'width': width, 'path': item, 'url': file_url(base_url, item)}
+            for width, item in parser.get_variants(path)
+        ]
+    }
+    
+    width = get_int(query, 'width', 0)
+    if width:
+        best = parser.pick_variant(path, width)
+        data['best'] = {'path': best, 'url': file_url(base_url, best)}
+    return data
+
+
+def api_batch(parser, query, body, base_url):
+    """批量查找路径 / 前缀，按列返回带版本号的 URL 和元数据"""
+    try:
+        payload = json.loads(body or b'null')
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        raise APIError(400, 'Invalid JSON body')
+    
+    paths = payload.get('paths', [])
+    prefixes = payload.get('prefixes', [])
+    if not all(isinstance(value, list) and all(isinstance(item, str) for item in value)
+               for value in (paths, prefixes)):
+        raise APIError(400, 'paths and prefixes must be lists of strings')
+    if len(paths) + len(prefixes) > MAX_BATCH_KEYS:
+        raise APIError(400, f'Too many paths/prefixes (max {MAX_BATCH_KEYS})')
+    
+    data = parser.lookup_many(paths, prefixes, limit=MAX_BATCH_ROWS)
+    
+    # 添加完整 URL（带版本号）
+    prefix_url = f"{base_url}/{PRODUCT_SLUG}/"
+    data['columns']['url'] = [
+        f"{prefix_url}{path}?v={version}" if version else f"{prefix_url}{path}"
+        for path, version in zip(data['columns']['path'], data['columns']['version'])
+    ]
+    
+    # 内容相同的文件（别名）统一返回规范文件的 URL，浏览器和 CDN 只缓存一份
+    if 'canonical' in data['columns']:
+        data['columns']['url'] = [
+            f"{prefix_url}{canonical}" if canonical else url
+            for canonical, url in zip(data['columns']['canonical'], data['columns']['url'])
+        ]
+    return data
+
+
+def api_stats(parser, query, body, base_url):
+    """统计信息（解析器加载时预先计算，文件列表变化时增量更新）"""
+    return parser.get_stats()
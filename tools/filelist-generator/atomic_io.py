@@ -0,0 +1,209 @@
+"""
+原子写入和文件锁
+供 generate-filelist.py 写出 files.txt / .versions.json 等文件使用
+
+- atomic_write：写入同目录临时文件，fsync 后 rename 覆盖目标，再 fsync 目录；
+  并发读取方（监视工具、API、HTML 更新工具）只会看到完整的旧文件或新文件
+- file_lock：基于 fcntl.flock 的排他锁，多个生成器同时处理同一产品时串行执行
+- save_json_journaled / load_json_journaled：带日志和备份的 JSON 存储，
+  中断或文件损坏时从日志 / 备份恢复，而不是返回空数据；
+  恢复会修改磁盘上的文件，只能在持有写入方的锁时调用
+- read_json_journaled：不持有锁的读取方使用，按同样的规则取得数据，但从不写入磁盘
+"""
+
+import contextlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def fsync_dir(dir_path: Path):
+    """fsync 目录，使 rename 本身落盘（不支持的平台忽略）"""
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def atomic_write(path: Path, mode: str = 'w', encoding: str = 'utf-8'):
+    """
+    原子写入文件
+    
+    用法：
+        with atomic_write(path) as f:
+            f.write(...)
+    
+    with 块内出现异常时删除临时文件，目标文件保持不变
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    
+    f = open(tmp_path, mode, encoding=None if 'b' in mode else encoding)
+    try:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        f.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    
+    fsync_dir(path.parent)
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """原子写入字节"""
+    with atomic_write(path, 'wb') as f:
+        f.write(data)
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: Path):
+    """
+    排他文件锁（阻塞等待）；不支持 fcntl 的平台不加锁
+    
+    锁随进程退出自动释放，不会因崩溃残留
+    """
+    if fcntl is None:
+        yield
+        return
+    
+    with open(lock_path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_name(path.name + '.journal')
+
+
+def _backup_path(path: Path) -> Path:
+    return path.with_name(path.name + '.bak')
+
+
+def save_json_journaled(path: Path, data, indent: int = 2):
+    """
+    带日志保存 JSON
+    
+    1. 新内容完整写入 {name}.journal（原子写入，fsync）
+    2. 当前文件硬链接为 {name}.bak（上一个已提交的版本）
+    3. 日志 rename 为目标文件，fsync 目录
+    
+    任一步中断后，load_json_journaled 都能恢复到旧版本或新版本
+    """
+    path = Path(path)
+    journal = _journal_path(path)
+    
+    with atomic_write(journal) as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    
+    if path.exists():
+        backup = _backup_path(path)
+        tmp_backup = backup.with_name(f".{backup.name}.{os.getpid()}.tmp")
+        try:
+            os.link(path, tmp_backup)
+        except OSError:
+            # 不支持硬链接的文件系统
+            shutil.copy2(path, tmp_backup)
+        os.replace(tmp_backup, backup)
+    
+    os.replace(journal, path)
+    fsync_dir(path.parent)
+
+
+def _read_json(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_json_journaled(path: Path, default=None):
+    """
+    只读加载带日志的 JSON（不持有锁的读取方使用，从不写入磁盘）
+    
+    - 存在完整的日志：返回日志内容（下次持锁加载时会前滚为同样的内容）
+    - 目标文件损坏：返回 .bak 的内容
+    - 都不可用：返回 default
+    """
+    path = Path(path)
+    
+    # 日志可能正被持锁的写入方提交，读取失败时按目标文件处理
+    with contextlib.suppress(OSError, ValueError):
+        return _read_json(_journal_path(path))
+    
+    if not path.exists():
+        return default
+    
+    try:
+        return _read_json(path)
+    except (OSError, ValueError):
+        try:
+            return _read_json(_backup_path(path))
+        except (OSError, ValueError):
+            return default
+
+
+def load_json_journaled(path: Path, default=None):
+    """
+    加载带日志的 JSON，并修复磁盘上的状态（调用方必须持有写入方的锁）
+    
+    - 存在完整的日志：上次保存在提交前中断，继续提交（前滚）
+    - 目标文件损坏：从 .bak 恢复并打印警告
+    - 都不可用：返回 default
+    
+    不持锁时恢复可能与正在保存的写入方交错（提交一半的日志、覆盖刚写入的文件），
+    不持锁的读取方请使用 read_json_journaled
+    """
+    path = Path(path)
+    journal = _journal_path(path)
+    
+    if journal.exists():
+        try:
+            data = _read_json(journal)
+        except (OSError, ValueError):
+            # 日志本身是原子写入的，读不出来说明是无关残留
+            with contextlib.suppress(OSError):
+                journal.unlink()
+        else:
+            print(f"♻️  从日志恢复未完成的写入: {path.name}")
+            os.replace(journal, path)
+            fsync_dir(path.parent)
+            return data
+    
+    if not path.exists():
+        return default
+    
+    try:
+        return _read_json(path)
+    except (OSError, ValueError) as e:
+        backup = _backup_path(path)
+        print(f"⚠️  {path.name} 已损坏（{e}），尝试从备份恢复")
+        try:
+            data = _read_json(backup)
+        except (OSError, ValueError):
+            print(f"❌ 备份不可用: {backup.name}")
+            return default
+        
+        # 保留损坏的文件便于排查，用备份覆盖
+        shutil.copy2(path, path.with_name(path.name + '.corrupt'))
+        atomic_write_bytes(path, backup.read_bytes())
+        print(f"♻️  已从 {backup.name} 恢复")
+        return data
@@ -0,0 +1,218 @@
+"""
+API 吞吐量对比
+用 asyncio 模拟大量并发的 keep-alive 连接，对一个或多个服务器发同样的请求，
+并排输出每秒请求数和延迟分位数，用于比较 api_example.py（Flask / WSGI）和 api_asgi.py（ASGI）
+
+只依赖标准库；结果与机器、服务器参数（线程数、worker 数）有关，请在同一台机器上对比。
+
+用法：
+python tools/filelist-generator/api_example.py &      # Flask，5000 端口
+python tools/filelist-generator/api_asgi.py &         # ASGI，5001 端口
+
+python tools/filelist-generator/bench_api.py http://127.0.0.1:5000 http://127.0.0.1:5001
+python tools/filelist-generator/bench_api.py http://127.0.0.1:5000 http://127.0.0.1:5001 -c 500 -n 20000 \\
+    --path "/api/files?cursor=&page_size=50" --path /business-headshot-ai/images/home/city/23.webp
+"""
+
+import asyncio
+import sys
+import time
+from urllib.parse import urlsplit
+
+
+# 默认测试的路径
+DEFAULT_PATHS = [
+    '/api/files?page=1&page_size=20',
+    '/api/categories',
+    '/api/stats',
+]
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_REQUESTS = 5000
+
+
+async def read_response(reader) -> tuple:
+    """读取一个 HTTP/1.1 响应（不关心响应体内容），返回 (状态码, 服务器是否关闭连接)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('连接已关闭')
+    version, status = status_line.split()[:2]
+    status = int(status)
+    
+    length = None
+    chunked = False
+    # HTTP/1.0 默认不保持连接
+    close = version == b'HTTP/1.0'
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+        elif name == 'connection':
+            close = value == 'close'
+    
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        # 没有长度信息，读到连接关闭
+        await reader.read()
+        close = True
+    
+    return status, close
+
+
+async def worker(host: str, port: int, paths: list, counter: dict, latencies: list, stats: dict):
+    """一个连接：顺序发送请求，服务器关闭连接时重新连接"""
+    reader = writer = None
+    while counter['remaining'] > 0:
+        counter['remaining'] -= 1
+        path = paths[counter['remaining'] % len(paths)]
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            f"Accept-Encoding: gzip\r\n"
+            f"\r\n"
+        ).encode()
+        
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(request)
+            await writer.drain()
+            status, close = await read_response(reader)
+            if close:
+                writer.close()
+                reader = writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            stats['errors'] += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        
+        latencies.append(time.perf_counter() - start)
+        if status >= 400:
+            stats['errors'] += 1
+    
+    if writer is not None:
+        writer.close()
+
+
+async def run_benchmark(base_url: str, paths: list, concurrency: int, total: int) -> dict:
+    """对一个服务器运行基准测试"""
+    parts = urlsplit(base_url)
+    host = parts.hostname or '127.0.0.1'
+    port = parts.port or 80
+    
+    counter = {'remaining': total}
+    latencies = []
+    stats = {'errors': 0}
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(host, port, paths, counter, latencies, stats)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    
+    return {
+        'url': base_url,
+        'requests': len(latencies),
+        'errors': stats['errors'],
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(0.50),
+        'p99': percentile(0.99),
+        'max': latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'urls': [],
+        'paths': [],
+        'concurrency': DEFAULT_CONCURRENCY,
+        'requests': DEFAULT_REQUESTS,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-c', '--concurrency') and i + 1 < len(argv):
+            options['concurrency'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg in ('-n', '--requests') and i + 1 < len(argv):
+            options['requests'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg == '--path' and i + 1 < len(argv):
+            options['paths'].append(argv[i + 1])
+            i += 2
+            continue
+        options['urls'].append(arg.rstrip('/'))
+        i += 1
+    
+    if not options['paths']:
+        options['paths'] = DEFAULT_PATHS
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    if not options['urls']:
+        print(__doc__)
+        sys.exit(1)
+    
+    print("=" * 60)
+    print("⏱️  API 吞吐量对比")
+    print("=" * 60)
+    print(f"并发连接: {options['concurrency']}")
+    print(f"请求总数: {options['requests']}")
+    print("路径:")
+    for path in options['paths']:
+        print(f"  {path}")
+    print()
+    
+    results = []
+    for url in options['urls']:
+        print(f"🚀 {url} ...")
+        results.append(asyncio.run(run_benchmark(
+            url, options['paths'], options['concurrency'], options['requests']
+        )))
+    
+    print()
+    print(f"{'服务器':<32} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'错误':>6}")
+    print("-" * 80)
+    for result in results:
+        print(
+            f"{result['url']:<32} {result['rps']:>10.0f} {result['p50']:>9.1f} "
+            f"{result['p99']:>9.1f} {result['max']:>9.1f} {result['errors']:>6}"
+        )
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""
+内容寻址的 blob 存储（可选）
+
+图片按内容哈希（与 .versions.json 相同的 MD5）存放在项目根目录的 objects/ 下：
+objects/ab/cdef0123...，前 2 位作为子目录，避免单个目录文件过多
+
+- generate-filelist.py --blobstore 在生成文件列表的同时把新内容写入存储，
+  并写出路径索引 tools/filelist-generator/{产品}/blob-index.json {路径: 哈希}
+- 相同内容只存一份；重命名、移动文件只改变索引，存储中没有新对象，同步时不需要重新上传
+- 写入时边复制边计算哈希，与索引中的哈希不一致（复制期间文件被修改）时放弃写入；
+  对象写入后设为只读，文件名即校验和，verify 重新计算即可发现损坏
+- dev_server.py --blobstore 通过索引提供文件，索引中没有的路径回退到 static/ 下的原文件
+
+用法：
+python tools/filelist-generator/generate-filelist.py --blobstore        # 写入存储并生成索引
+python tools/filelist-generator/blobstore.py verify                     # 校验所有对象
+python tools/filelist-generator/blobstore.py verify --delete            # 删除损坏的对象（下次生成时重新写入）
+python tools/filelist-generator/blobstore.py gc                         # 删除没有被任何索引引用的对象
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atomic_io import atomic_write
+
+
+# 存储目录：项目根目录下的 objects/
+BLOBSTORE_DIR = Path(__file__).parent.parent.parent / 'objects'
+
+# 路径索引文件名（位于 tools/filelist-generator/{产品}/）
+INDEX_NAME = 'blob-index.json'
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def blob_path(file_hash: str, root: Path = BLOBSTORE_DIR) -> Path:
+    """哈希对应的对象路径：objects/ab/cdef..."""
+    return root / file_hash[:2] / file_hash[2:]
+
+
+def hash_file(file_path) -> str:
+    """计算文件的 MD5（与 generate-filelist.py 的 get_file_hash 一致）"""
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def store_blob(source, file_hash: str, root: Path = BLOBSTORE_DIR) -> str:
+    """
+    把文件写入存储（对象已存在时跳过）
+    
+    Returns:
+        'stored'、'exists' 或 'mismatch'（复制得到的内容与 file_hash 不一致，未写入）
+    """
+    target = blob_path(file_hash, root)
+    if target.exists():
+        return 'exists'
+    
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        md5 = hashlib.md5()
+        with open(source, 'rb') as src, open(tmp_target, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                md5.update(chunk)
+                dst.write(chunk)
+            dst.flush()
+            os.fsync(dst.fileno())
+        if md5.hexdigest() != file_hash:
+            return 'mismatch'
+        # 对象不可变，设为只读防止被原地修改
+        os.chmod(tmp_target, 0o444)
+        os.replace(tmp_target, target)
+    finally:
+        if tmp_target.exists():
+            tmp_target.unlink()
+    return 'stored'
+
+
+def load_index(output_dir: Path) -> dict:
+    """加载路径索引 {路径: 哈希}，不存在时返回空字典"""
+    index_file = output_dir / INDEX_NAME
+    if not index_file.exists():
+        return {}
+    with open(index_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_index(output_dir: Path, index: dict):
+    """保存路径索引（原子替换）"""
+    with atomic_write(output_dir / INDEX_NAME) as f:
+        json.dump(dict(sorted(index.items())), f, ensure_ascii=False, indent=None, separators=(',', ':'))
+
+
+def update_blobstore(base_path: Path, output_dir: Path, versions: dict, root: Path = BLOBSTORE_DIR) -> dict:
+    """
+    按 .versions.json 把产品的图片写入存储，并更新路径索引
+    
+    Args:
+        base_path: 产品目录 static/{产品}/
+        output_dir: tools/filelist-generator/{产品}/
+        versions: 已更新的版本信息 {路径: {'hash', ...}}
+    
+    Returns:
+        {'files', 'stored', 'mismatch', 'index_changed'}
+    """
+    index = {posix_path: entry['hash'] for posix_path, entry in sorted(versions.items())}
+    stats = {'files': len(index), 'stored': 0, 'mismatch': 0, 'index_changed': False}
+    
+    for posix_path, file_hash in list(index.items()):
+        status = store_blob(base_path / posix_path, file_hash, root)
+        if status == 'stored':
+            stats['stored'] += 1
+        elif status == 'mismatch':
+            # 文件在生成期间被修改，下次生成时再写入
+            stats['mismatch'] += 1
+            del index[posix_path]
+    
+    if load_index(output_dir) != index:
+        save_index(output_dir, index)
+        stats['index_changed'] = True
+    
+    return stats
+
+
+class BlobResolver:
+    """
+    通过路径索引把请求路径解析为存储中的对象（线程安全）
+    
+    每个产品的索引在文件修改时间变化时重新加载；auto_reload 为 False 时只在 preload() 时重新加载
+    （pre-fork 模式下由主进程检查 is_stale() 并替换 worker，worker 不各自重新加载）
+    """
+    
+    def __init__(self, index_root: Path = Path(__file__).parent, root: Path = BLOBSTORE_DIR):
+        self.index_root = Path(index_root)
+        self.root = Path(root)
+        self.auto_reload = True
+        self._indexes = {}  # 产品 -> (索引修改时间, 索引)
+        self._lock = threading.Lock()
+    
+    def _index_mtimes(self) -> dict:
+        """磁盘上所有产品索引的修改时间 {产品: mtime_ns}"""
+        mtimes = {}
+        for index_file in self.index_root.glob(f'*/{INDEX_NAME}'):
+            try:
+                mtimes[index_file.parent.name] = index_file.stat().st_mtime_ns
+            except OSError:
+                continue
+        return mtimes
+    
+    def preload(self) -> int:
+        """
+        重新加载所有产品的索引（pre-fork 主进程在 fork 前调用，worker 通过写时复制共享）
+        
+        Returns:
+            加载的索引数
+        """
+        indexes = {}
+        for product_slug, mtime_ns in sorted(self._index_mtimes().items()):
+            try:
+                indexes[product_slug] = (mtime_ns, load_index(self.index_root / product_slug))
+            except (OSError, ValueError):
+                indexes[product_slug] = (mtime_ns, {})
+        with self._lock:
+            self._indexes = indexes
+        return len(indexes)
+    
+    def is_stale(self) -> bool:
+        """已加载的索引与磁盘上的是否不一致（新增、删除或修改时间变化）"""
+        with self._lock:
+            loaded = {product_slug: cached[0] for product_slug, cached in self._indexes.items()}
+        return self._index_mtimes() != loaded
+    
+    def _get_index(self, product_slug: str) -> dict:
+        if not self.auto_reload:
+            cached = self._indexes.get(product_slug)
+            return cached[1] if cached is not None else {}
+        
+        index_file = self.index_root / product_slug / INDEX_NAME
+        try:
+            mtime_ns = index_file.stat().st_mtime_ns
+        except OSError:
+            return {}
+        
+        with self._lock:
+            cached = self._indexes.get(product_slug)
+            if cached is None or cached[0] != mtime_ns:
+                try:
+                    cached = (mtime_ns, load_index(index_file.parent))
+                except (OSError, ValueError):
+                    cached = (mtime_ns, {})
+                self._indexes[product_slug] = cached
+            return cached[1]
+    
+    def resolve(self, product_slug: str, posix_path: str):
+        """
+        Returns:
+            (对象路径, 哈希)，索引中没有该路径或对象不存在时返回 None
+        """
+        file_hash = self._get_index(product_slug).get(posix_path)
+        if file_hash is None:
+            return None
+        target = blob_path(file_hash, self.root)
+        if not target.is_file():
+            return None
+        return target, file_hash
+
+
+def iter_blobs(root: Path = BLOBSTORE_DIR):
+    """
+    遍历存储中的所有对象（跳过写入中的临时文件）
+    
+    Yields:
+        (对象路径, 哈希)
+    """
+    if not root.exists():
+        return
+    for prefix_dir in sorted(root.iterdir()):
+        if not prefix_dir.is_dir() or len(prefix_dir.name) != 2:
+            continue
+        for entry in sorted(prefix_dir.iterdir()):
+            if entry.name.startswith('.'):
+                continue
+            yield entry, prefix_dir.name + entry.name
+
+
+def verify_blobstore(root: Path = BLOBSTORE_DIR, delete: bool = False) -> dict:
+    """
+    重新计算所有对象的哈希并与文件名比较
+    
+    Returns:
+        {'checked', 'bytes', 'corrupt': [对象路径, ...]}
+    """
+    result = {'checked': 0, 'bytes': 0, 'corrupt': []}
+    for target, file_hash in iter_blobs(root):
+        result['checked'] += 1
+        result['bytes'] += target.stat().st_size
+        if hash_file(target) != file_hash:
+            result['corrupt'].append(target)
+            if delete:
+                target.unlink()
+    return result
+
+
+def collect_garbage(root: Path = BLOBSTORE_DIR, index_root: Path = Path(__file__).parent) -> dict:
+    """
+    删除没有被任何产品索引引用的对象
+    
+    请不要与 generate-filelist.py --blobstore 同时运行（新写入、尚未进入索引的对象会被删除）
+    
+    Returns:
+        {'referenced', 'removed', 'bytes'}
+    """
+    referenced = set()
+    for index_file in Path(index_root).glob(f'*/{INDEX_NAME}'):
+        referenced.update(load_index(index_file.parent).values())
+    
+    result = {'referenced': len(referenced), 'removed': 0, 'bytes': 0}
+    for target, file_hash in iter_blobs(root):
+        if file_hash not in referenced:
+            result['bytes'] += target.stat().st_size
+            target.unlink()
+            result['removed'] += 1
+    
+    # 清理空的前缀目录
+    if root.exists():
+        for prefix_dir in root.iterdir():
+            if prefix_dir.is_dir() and not any(prefix_dir.iterdir()):
+                prefix_dir.rmdir()
+    
+    return result
+
+
+def main():
+    """主函数"""
+    args = sys.argv[1:]
+    command = args[0] if args else None
+    
+    if command not in ('verify', 'gc'):
+        print(__doc__)
+        sys.exit(1)
+    
+    print("=" * 60)
+    print("🗄️  内容寻址存储")
+    print("=" * 60)
+    print(f"📁 存储目录: {BLOBSTORE_DIR}")
+    print()
+    
+    if command == 'verify':
+        result = verify_blobstore(delete='--delete' in args)
+        print(f"🔍 已校验 {result['checked']} 个对象（{result['bytes'] / 1024 / 1024:.2f} MB）")
+        if result['corrupt']:
+            print(f"❌ 损坏: {len(result['corrupt'])} 个")
+            for target in result['corrupt']:
+                print(f"   • {target.relative_to(BLOBSTORE_DIR).as_posix()}")
+            if '--delete' in args:
+                print("🗑️  已删除，重新运行 generate-filelist.py --blobstore 写入")
+        else:
+            print("✅ 所有对象完整")
+    else:
+        result = collect_garbage()
+        print(f"📇 索引引用: {result['referenced']} 个对象")
+        print(f"🗑️  删除未引用对象: {result['removed']} 个（{result['bytes'] / 1024 / 1024:.2f} MB）")
+    
+    print("=" * 60)
+    
+    if command == 'verify' and result['corrupt']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
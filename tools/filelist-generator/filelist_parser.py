@@ -3,9 +3,67 @@
 提供快速解析和分页功能，供 server 端使用
 """
 
+from collections import Counter
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import base64
 import bisect
+import gzip
+import json
+import posixpath
+import re
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 响应式变体命名：demo-1@480w.webp 是 demo-1.webp 宽 480px 的版本
+# （由 tools/create-image-derivatives 生成）
+VARIANT_PATTERN = re.compile(r'^(?P<base>.+)@(?P<width>\d+)w(?P<ext>\.[A-Za-z0-9]+)$')
+
+# 常见的分类路径映射
+CATEGORY_PATHS = {
+    'home': 'images/home/',
+    'faces': 'images/demo-faces/',
+    'backdrops': 'images/options/backdrops/',
+    'poses': 'images/options/poses/',
+    'outfits': 'images/options/outfits/',
+    'hairstyles': 'images/options/hairstyles/',
+    'expressions': 'images/options/expressions/',
+    'glasses': 'images/options/glasses/',
+}
+
+# 排在任何以某前缀开头的路径之后的哨兵字符，用于二分查找前缀区间的结束位置
+MAX_CHAR = '\U0010ffff'
+
+# 人物目录：{性别}-{肤色}-{年龄}-{风格}，如 female-white-middle-standard
+PERSONA_PATTERN = re.compile(r'(?:^|/)((?:male|female)-[a-z]+-[a-z]+-[a-z]+)/')
+
+
+def load_manifest(manifest_path: str) -> Dict[str, list]:
+    """
+    加载 generate-filelist.py 生成的按列清单（manifest.json / .json.gz / .json.zst）
+    
+    Returns:
+        {'path': [...], 'version': [...], 'hash': [...], 'size': [...],
+         'width': [...], 'height': [...], 'mime': [...]}
+    """
+    manifest_path = Path(manifest_path)
+    data = manifest_path.read_bytes()
+    
+    if manifest_path.suffix == '.gz':
+        data = gzip.decompress(data)
+    elif manifest_path.suffix == '.zst':
+        if zstandard is None:
+            raise RuntimeError("读取 .zst 清单需要安装 zstandard")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    
+    manifest = json.loads(data)
+    if manifest.get('format') != 1:
+        raise ValueError(f"不支持的清单格式: {manifest.get('format')}")
+    return manifest['columns']
 
 
 class FileListParser:
@@ -16,20 +74,276 @@ class FileListParser:
         初始化解析器
         
         Args:
-            filelist_path: 文件列表路径，如 'tools/filelist-generator/business-headshot-ai/files.txt'
+            filelist_path: 文件列表路径，如 'tools/filelist-generator/business-headshot-ai/files.txt'，
+                也可以是清单 manifest.json（.gz / .zst），此时可通过 get_metadata() 查询元数据
         """
         self.filelist_path = Path(filelist_path)
         self._files: List[str] = []
         self._index_cache: Dict[str, List[str]] = {}
+        self._columns: Optional[Dict[str, list]] = None
+        self._rows: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self._aliases: Dict[str, str] = {}
+        self._stat_key = None
+        # 文件列表每次变化时加一，供调用方判断缓存是否过期
+        self.version = 0
         self._load_files()
+        self._init_stats()
     
     def _load_files(self):
         """加载文件列表"""
         if not self.filelist_path.exists():
             raise FileNotFoundError(f"文件列表不存在: {self.filelist_path}")
         
+        self._stat_key = self._current_stat_key()
+        self._aliases = self._load_aliases()
+        
+        if self.filelist_path.name.startswith('manifest.json'):
+            self._columns = load_manifest(self.filelist_path)
+            paths = self._columns['path']
+            self._rows = {path: i for i, path in enumerate(paths)}
+            self._sizes = dict(zip(paths, self._columns['size']))
+            self._files = sorted(
+                f"{path}?v={version}" if version else path
+                for path, version in zip(paths, self._columns['version'])
+            )
+            return
+        
         with open(self.filelist_path, 'r', encoding='utf-8') as f:
             self._files = [line.strip() for line in f if line.strip()]
+        self._sizes = self._load_sizes()
+    
+    def _current_stat_key(self) -> tuple:
+        """文件列表和别名表的 (修改时间, 大小)，用于判断是否需要重新加载"""
+        stat = self.filelist_path.stat()
+        aliases_file = self.filelist_path.parent / 'aliases.json'
+        aliases_mtime = aliases_file.stat().st_mtime_ns if aliases_file.exists() else None
+        return (stat.st_mtime_ns, stat.st_size, aliases_mtime)
+    
+    def _load_aliases(self) -> Dict[str, str]:
+        """加载同目录的 aliases.json {重复路径: 规范路径}（tools/dedup-static 生成），没有时返回空字典"""
+        try:
+            with open(self.filelist_path.parent / 'aliases.json', 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _load_sizes(self) -> Dict[str, int]:
+        """从同目录的 .versions.json 读取文件大小（没有或损坏时返回空字典，total_bytes 为 None）"""
+        try:
+            with open(self.filelist_path.parent / '.versions.json', 'r', encoding='utf-8') as f:
+                versions = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {path: entry['size'] for path, entry in versions.items() if 'size' in entry}
+    
+    # ==================== 统计 ====================
+    
+    def _entry_stats(self, entry: str) -> Tuple[List[str], str, Optional[str]]:
+        """单个条目所属的分类、扩展名和人物"""
+        path = entry.split('?v=')[0]
+        categories = [name for name, prefix in CATEGORY_PATHS.items() if path.startswith(prefix)]
+        ext = posixpath.splitext(path)[1].lower()
+        persona = PERSONA_PATTERN.search(path)
+        return categories, ext, persona.group(1) if persona else None
+    
+    def _apply_stats(self, entries, sign: int, sizes: Dict[str, int]):
+        """把条目计入（sign=1）或移出（sign=-1）统计"""
+        for entry in entries:
+            categories, ext, persona = self._entry_stats(entry)
+            for name in categories:
+                self._category_counts[name] += sign
+            self._format_counts[ext] += sign
+            if persona:
+                self._persona_counts[persona] += sign
+            size = sizes.get(entry.split('?v=')[0])
+            if size is None:
+                self._unsized += sign
+            else:
+                self._total_bytes += sign * size
+    
+    def _init_stats(self):
+        """加载时一次性计算统计"""
+        self._category_counts = Counter()
+        self._format_counts = Counter()
+        self._persona_counts = Counter()
+        self._total_bytes = 0
+        self._unsized = 0  # 没有大小信息的条目数
+        self._apply_stats(self._files, 1, self._sizes)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息（加载时预先计算，reload() 时增量更新）
+        
+        Returns:
+            {
+                'total_files': 文件数,
+                'total_bytes': 总字节数（缺少大小信息时为 None）,
+                'categories': {分类: 文件数},
+                'formats': {扩展名: 文件数},
+                'personas': {人物: 文件数}
+            }
+        """
+        return {
+            'total_files': len(self._files),
+            'total_bytes': self._total_bytes if self._unsized == 0 else None,
+            'categories': {name: self._category_counts[name] for name in CATEGORY_PATHS},
+            'formats': {ext: count for ext, count in sorted(self._format_counts.items()) if count},
+            'personas': {name: count for name, count in sorted(self._persona_counts.items()) if count},
+        }
+    
+    def needs_reload(self) -> bool:
+        """文件列表或别名表是否已变化（只比较修改时间和大小，不重新加载）"""
+        try:
+            return self._current_stat_key() != self._stat_key
+        except OSError:
+            return False
+    
+    def reload(self) -> bool:
+        """
+        文件列表或别名表有变化时重新加载，统计按新增 / 删除的条目增量更新
+        
+        Returns:
+            是否有变化
+        """
+        if self._current_stat_key() == self._stat_key:
+            return False
+        
+        old_files = self._files
+        old_sizes = self._sizes
+        old_aliases = self._aliases
+        self._load_files()
+        self._index_cache.clear()
+        
+        # 版本号变化的文件表现为一删一增
+        old_set = set(old_files)
+        new_set = set(self._files)
+        removed = old_set - new_set
+        added = new_set - old_set
+        if removed or added:
+            self._apply_stats(removed, -1, old_sizes)
+            self._apply_stats(added, 1, self._sizes)
+        elif old_sizes != self._sizes:
+            # 条目未变、只有大小信息变化（如 .versions.json 首次记录大小）
+            self._init_stats()
+        elif old_aliases == self._aliases:
+            return False
+        
+        self.version += 1
+        return True
+    
+    def get_metadata(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        获取文件元数据（仅从清单加载时可用）
+        
+        Args:
+            file_path: 文件路径，可带或不带 ?v= 版本号
+        
+        Returns:
+            {'path', 'version', 'hash', 'size', 'width', 'height', 'mime'}；不存在时返回 None
+        """
+        if self._columns is None:
+            return None
+        
+        row = self._rows.get(file_path.split('?v=')[0])
+        if row is None:
+            return None
+        return {name: column[row] for name, column in self._columns.items()}
+    
+    def lookup_many(self, paths: List[str] = (), prefixes: List[str] = (),
+                    limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        批量查找文件，结果按列返回（每列一个数组，比逐条的对象更紧凑）
+        
+        路径逐个二分查找；前缀二分定位区间后整段取出。重复的文件只返回一次，
+        顺序为：先 paths（按传入顺序），再各前缀下的文件（按列表顺序）
+        
+        Args:
+            paths: 文件路径列表，可带或不带 ?v= 版本号
+            prefixes: 路径前缀列表，如 'images/options/poses/female-white-middle-standard/'
+            limit: 最多返回的文件数，超过时截断
+        
+        Returns:
+            {
+                'count': 返回的文件数,
+                'columns': {'path': [...], 'version': [...], 'size': [...], ...},
+                'missing': 未找到的路径,
+                'truncated': 是否因 limit 截断
+            }
+            从清单加载时 columns 包含清单的所有列（hash、width、height、mime 等），
+            否则只有 path、version、size（大小未知时为 None）；
+            存在别名表时另有 canonical 列（内容相同的规范文件条目，不是别名时为 None）
+        """
+        files = self._files
+        entries = []
+        seen = set()
+        missing = []
+        truncated = False
+        
+        def add(entry: str) -> bool:
+            nonlocal truncated
+            if entry in seen:
+                return True
+            if limit is not None and len(entries) >= limit:
+                truncated = True
+                return False
+            seen.add(entry)
+            entries.append(entry)
+            return True
+        
+        for path in paths:
+            entry = self.find_file(path)
+            if entry is None:
+                missing.append(path)
+            elif not add(entry):
+                break
+        
+        for prefix in prefixes:
+            if truncated:
+                break
+            start, end = self._prefix_range(files, prefix)
+            for i in range(start, end):
+                if not add(files[i]):
+                    break
+        
+        split = [entry.split('?v=', 1) for entry in entries]
+        columns = {
+            'path': [item[0] for item in split],
+            'version': [item[1] if len(item) > 1 else None for item in split],
+        }
+        
+        if self._columns is not None:
+            rows = [self._rows.get(path) for path in columns['path']]
+            for name, column in self._columns.items():
+                if name not in columns:
+                    columns[name] = [column[row] if row is not None else None for row in rows]
+        else:
+            columns['size'] = [self._sizes.get(path) for path in columns['path']]
+        
+        if self._aliases:
+            columns['canonical'] = [self.resolve_alias(path) for path in columns['path']]
+        
+        return {
+            'count': len(entries),
+            'columns': columns,
+            'missing': missing,
+            'truncated': truncated
+        }
+    
+    def resolve_alias(self, file_path: str) -> Optional[str]:
+        """
+        查找内容相同的规范文件（别名表由 tools/dedup-static --aliases 生成）
+        
+        Args:
+            file_path: 文件路径，可带或不带 ?v= 版本号
+        
+        Returns:
+            规范文件的列表条目（带版本号）；不是别名时返回 None
+        """
+        canonical = self._aliases.get(file_path.split('?v=')[0])
+        if canonical is None:
+            return None
+        return self.find_file(canonical)
     
     def get_all_files(self) -> List[str]:
         """获取所有文件"""
@@ -77,6 +391,90 @@ class FileListParser:
             'items': self._files[start:end]
         }
     
+    def _prefix_range(self, files: List[str], prefix: str) -> Tuple[int, int]:
+        """二分查找以 prefix 开头的条目区间 [start, end)，不复制列表"""
+        if not prefix:
+            return 0, len(files)
+        return bisect.bisect_left(files, prefix), bisect.bisect_left(files, prefix + MAX_CHAR)
+    
+    @staticmethod
+    def encode_cursor(entry: str) -> str:
+        """把条目编码为不透明的游标（base64url，无填充）"""
+        return base64.urlsafe_b64encode(entry.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> str:
+        """
+        解码游标，返回其中的条目
+        
+        Raises:
+            ValueError: 游标格式不正确
+        """
+        try:
+            return base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"无效的游标: {cursor}") from e
+    
+    def get_page_after(self, cursor: Optional[str] = None, page_size: int = 20,
+                       prefix: str = '') -> Dict[str, Any]:
+        """
+        基于游标的分页（keyset pagination）
+        
+        游标记录上一页最后一个文件的路径，下一页从该路径之后二分定位，
+        翻到多深的页都只需 O(log n + page_size)；文件列表在两次请求之间重新生成时，
+        已返回过的文件不会重复或遗漏（文件版本号变化也不影响定位）
+        
+        Args:
+            cursor: 上一页返回的 next_cursor，为空时从头开始
+            page_size: 每页数量
+            prefix: 只返回以该前缀开头的文件，如 'images/home/'
+        
+        Returns:
+            {
+                'page_size': 每页数量,
+                'total': 匹配的总数,
+                'items': 文件列表,
+                'next_cursor': 下一页游标，没有更多时为 None
+            }
+        
+        Raises:
+            ValueError: 游标格式不正确
+        """
+        # 取一次引用，reload() 替换列表时本次请求仍使用同一份数据
+        files = self._files
+        page_size = max(page_size, 1)
+        start, end = self._prefix_range(files, prefix)
+        total = end - start
+        
+        if cursor:
+            path, sep, _ = self.decode_cursor(cursor).partition('?v=')
+            # 跳过该路径的所有版本
+            key = path + sep + MAX_CHAR if sep else path
+            start = max(start, bisect.bisect_right(files, key, start, end))
+        
+        stop = min(start + page_size, end)
+        items = files[start:stop]
+        
+        return {
+            'page_size': page_size,
+            'total': total,
+            'items': items,
+            'next_cursor': self.encode_cursor(items[-1]) if items and stop < end else None
+        }
+    
+    def get_category_page_after(self, category: str, cursor: Optional[str] = None,
+                                page_size: int = 20) -> Dict[str, Any]:
+        """
+        基于游标的分类分页，参见 get_page_after()
+        
+        Raises:
+            ValueError: 游标格式不正确
+        """
+        prefix = CATEGORY_PATHS.get(category, f'images/{category}/')
+        data = self.get_page_after(cursor, page_size, prefix)
+        data['category'] = category
+        return data
+    
     def filter_by_prefix(self, prefix: str) -> List[str]:
         """
         按路径前缀过滤文件
@@ -201,21 +599,102 @@ class FileListParser:
         Returns:
             该分类下的所有文件
         """
-        # 常见的分类路径映射
-        category_paths = {
-            'home': 'images/home/',
-            'faces': 'images/demo-faces/',
-            'backdrops': 'images/options/backdrops/',
-            'poses': 'images/options/poses/',
-            'outfits': 'images/options/outfits/',
-            'hairstyles': 'images/options/hairstyles/',
-            'expressions': 'images/options/expressions/',
-            'glasses': 'images/options/glasses/',
-        }
-        
-        prefix = category_paths.get(category, f'images/{category}/')
+        prefix = CATEGORY_PATHS.get(category, f'images/{category}/')
         return self.filter_by_prefix(prefix)
     
+    def find_file(self, file_path: str) -> Optional[str]:
+        """
+        查找文件对应的列表条目（带版本号）
+        
+        Args:
+            file_path: 文件路径，可带或不带 ?v= 版本号
+        
+        Returns:
+            列表中的条目，如 'images/home/city/23.webp?v=20251217_194016'；不存在时返回 None
+        """
+        path = file_path.split('?v=')[0]
+        
+        # 不带版本号的条目
+        idx = bisect.bisect_left(self._files, path)
+        if idx < len(self._files) and self._files[idx] == path:
+            return path
+        
+        # 带版本号的条目（'path-x' 之类的条目会排在 'path?v=' 之前，需单独定位）
+        versioned = path + '?v='
+        idx = bisect.bisect_left(self._files, versioned)
+        if idx < len(self._files) and self._files[idx].startswith(versioned):
+            return self._files[idx]
+        
+        return None
+    
+    def get_variants(self, file_path: str) -> List[Tuple[int, str]]:
+        """
+        获取图片的响应式变体
+        
+        Args:
+            file_path: 原图路径，如 'images/home/city/23.webp'
+        
+        Returns:
+            [(宽度, 条目), ...]，按宽度升序
+        """
+        path = file_path.split('?v=')[0]
+        dir_part, _, name = path.rpartition('/')
+        stem, dot, ext = name.rpartition('.')
+        if not dot:
+            return []
+        
+        # 同目录下还有主干相同的其他原图（demo.jpg 和 demo.png）时无法区分变体属于哪一张，
+        # 变体生成工具也会跳过它们
+        if self._count_stem(dir_part, stem) > 1:
+            return []
+        
+        # 变体与原图同目录、以 "stem@" 开头，在排序列表中连续
+        prefix = f"{dir_part}/{stem}@" if dir_part else f"{stem}@"
+        variants = []
+        for i in range(bisect.bisect_left(self._files, prefix), len(self._files)):
+            entry = self._files[i]
+            if not entry.startswith(prefix):
+                break
+            match = VARIANT_PATTERN.match(entry.split('?v=')[0].rpartition('/')[2])
+            if match and match['base'] == stem:
+                variants.append((int(match['width']), entry))
+        
+        variants.sort()
+        return variants
+    
+    def _count_stem(self, dir_part: str, stem: str) -> int:
+        """统计目录下主干为 stem 的文件数（demo.jpg、demo.png 的主干都是 demo）"""
+        prefix = f"{dir_part}/{stem}." if dir_part else f"{stem}."
+        count = 0
+        for i in range(bisect.bisect_left(self._files, prefix), len(self._files)):
+            entry = self._files[i]
+            if not entry.startswith(prefix):
+                break
+            if entry.split('?v=')[0].rpartition('/')[2].rpartition('.')[0] == stem:
+                count += 1
+        return count
+    
+    def pick_variant(self, file_path: str, min_width: int) -> Optional[str]:
+        """
+        选择宽度不小于 min_width 的最小变体，没有合适的变体时返回原图
+        
+        Args:
+            file_path: 原图路径
+            min_width: 需要的最小宽度（px）
+        
+        Returns:
+            列表条目（带版本号）；原图不存在时返回 None
+        """
+        original = self.find_file(file_path)
+        if original is None:
+            return None
+        
+        for width, entry in self.get_variants(file_path):
+            if width >= min_width:
+                return entry
+        
+        return original
+    
     def get_paginated_category(self, category: str, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
         """
         获取分类的分页数据
@@ -228,8 +707,11 @@ class FileListParser:
         Returns:
             分页数据
         """
-        files = self.get_files_by_category(category)
-        total = len(files)
+        # 只切出当前页，不复制整个分类
+        files = self._files
+        prefix = CATEGORY_PATHS.get(category, f'images/{category}/')
+        first, last = self._prefix_range(files, prefix)
+        total = last - first
         total_pages = (total + page_size - 1) // page_size
         
         if page < 1:
@@ -237,8 +719,8 @@ class FileListParser:
         if page > total_pages:
             page = total_pages if total_pages > 0 else 1
         
-        start = (page - 1) * page_size
-        end = min(start + page_size, total)
+        start = first + (page - 1) * page_size
+        end = min(start + page_size, last)
         
         return {
             'category': category,
@@ -8,14 +8,109 @@
 - 自动为文件添加版本号参数 ?v=timestamp
 - 只有文件内容或修改时间变化时才更新版本号
 - 版本号信息存储在 .versions.json 中
+- 同时记录文件大小和修改时间，两者都未变化时不重新计算哈希
+
+流式模式（--stream，仅 txt 格式）：
+- 用 os.scandir 按排序后的顺序遍历目录，生成的行已是最终顺序，边遍历边写出
+- 不构建 Path 对象、不在内存中累积和排序文件列表
+- 只有 files.txt 是流式的：启用版本号时 .versions.json 仍整体加载到内存并整体写回，
+  内存占用与文件数成正比（每个文件一条版本记录）
+
+占位图（--placeholders，需要 Pillow）：
+- 为每张图片生成约 20px 的 base64 WebP 缩略图，并记录原图宽高
+- 输出到 placeholders.json，页面可直接渲染占位图并预留布局，不产生额外请求
+- 按文件内容哈希缓存在 .placeholders.json 中，内容不变的图片只计算一次
+
+清单格式（manifest）：
+- 按列存储 path / version / hash / size / width / height / mime 的紧凑 JSON（manifest.json）
+- 同时输出 manifest.json.gz（安装 zstandard 时还有 manifest.json.zst）和 manifest.etag
+- 图片宽高按内容哈希缓存在 .versions.json 中，只在文件变化时重新读取
+
+内容寻址存储（--blobstore，见 blobstore.py）：
+- 图片按内容哈希写入项目根目录的 objects/ab/cdef...（已存在的对象跳过）
+- 写出路径索引 blob-index.json {路径: 哈希}，重命名、移动文件只改变索引
 """
 
 import os
+import io
+import sys
+import time
+import gzip
 import json
+import base64
 import hashlib
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
+# 与 atomic_io.py 同目录（本文件也会被其他工具通过 importlib 加载）
+sys.path.insert(0, str(Path(__file__).parent))
+
+from atomic_io import (
+    atomic_write, atomic_write_bytes, file_lock, load_json_journaled, read_json_journaled, save_json_journaled
+)
+from blobstore import INDEX_NAME, update_blobstore
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# 支持的图片格式
+IMAGE_EXTENSIONS = {'.webp', '.jpg', '.jpeg', '.png', '.gif'}
+
+# 占位图最大边长和编码质量
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 40
+
+# 清单格式版本和列
+MANIFEST_FORMAT = 1
+MANIFEST_COLUMNS = ['path', 'version', 'hash', 'size', 'width', 'height', 'mime']
+
+MIME_TYPES = {
+    '.webp': 'image/webp',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+}
+
+
+def iter_image_files(base_path: Path):
+    """
+    遍历目录下的所有图片文件（跳过隐藏文件和目录）
+    
+    Yields:
+        (文件路径, 相对 base_path 的 POSIX 路径)
+    """
+    for root, dirs, filenames in os.walk(base_path):
+        # 跳过隐藏目录
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        
+        for filename in filenames:
+            # 跳过隐藏文件
+            if filename.startswith('.'):
+                continue
+            
+            # 检查文件扩展名
+            ext = Path(filename).suffix.lower()
+            if ext not in IMAGE_EXTENSIONS:
+                continue
+            
+            # 获取相对路径
+            file_path = Path(root) / filename
+            rel_path = file_path.relative_to(base_path)
+            
+            # 转换为 POSIX 路径（使用 / 分隔符）
+            yield file_path, rel_path.as_posix()
+
 
 def get_file_hash(file_path: Path) -> str:
     """获取文件的 MD5 哈希值（用于检测文件是否变化）"""
@@ -26,33 +121,294 @@ def get_file_hash(file_path: Path) -> str:
     return hash_md5.hexdigest()
 
 
+def scan_image_files(base_path: str, versioned: bool = True):
+    """
+    按文件列表的最终顺序遍历图片文件（os.scandir + 字符串路径，跳过隐藏文件和目录）
+    
+    每层目录排序时，子目录按 "名称/"、文件按 "名称?"（versioned=False 时为 "名称"）比较，
+    与完整行 "路径?v=版本号" 的字典序一致，因此无需在最后整体排序。
+    与 os.walk 一致，不进入指向目录的符号链接。
+    
+    Yields:
+        (os.DirEntry, 相对 base_path 的 POSIX 路径)
+    """
+    suffix = '?' if versioned else ''
+    
+    def scan(dir_path: str, rel_prefix: str):
+        entries = []
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        entries.append((name + '/', entry))
+                elif os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    entries.append((name + suffix, entry))
+        entries.sort(key=lambda item: item[0])
+        
+        for key, entry in entries:
+            if key.endswith('/'):
+                yield from scan(entry.path, rel_prefix + key)
+            else:
+                yield entry, rel_prefix + entry.name
+    
+    yield from scan(base_path, '')
+
+
 def load_versions(output_dir: Path) -> dict:
-    """加载版本信息"""
-    version_file = output_dir / '.versions.json'
-    if version_file.exists():
+    """
+    加载版本信息（调用方必须持有产品锁 {output_dir}/.lock）
+    
+    上次写入中断时从日志前滚，文件损坏时从 .versions.json.bak 恢复，
+    避免所有文件被重新分配版本号（导致缓存全部失效）
+    """
+    return load_json_journaled(output_dir / '.versions.json', {})
+
+
+def read_versions(output_dir: Path) -> dict:
+    """只读加载版本信息（不持有产品锁的工具使用，不会修改任何文件）"""
+    return read_json_journaled(output_dir / '.versions.json', {})
+
+
+def update_version_entry(versions: dict, posix_path: str, file_path, stat, timestamp: str) -> str:
+    """
+    更新单个文件的版本记录；大小和修改时间都未变化时直接复用已有哈希
+    
+    Returns:
+        'new'（新文件）、'updated'（内容变化，版本号更新）或 'same'
+    """
+    entry = versions.get(posix_path)
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime_ns') == stat.st_mtime_ns:
+        return 'same'
+    
+    file_hash = get_file_hash(file_path)
+    if entry is None or entry.get('hash') != file_hash:
+        versions[posix_path] = {
+            'hash': file_hash,
+            'version': timestamp,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+        return 'new' if entry is None else 'updated'
+    
+    # 内容未变（如仅 touch），只刷新大小和修改时间
+    entry['size'] = stat.st_size
+    entry['mtime_ns'] = stat.st_mtime_ns
+    return 'same'
+
+
+def save_versions(output_dir: Path, versions: dict):
+    """保存版本信息（日志 + 原子替换，上一版本保留为 .versions.json.bak）"""
+    save_json_journaled(output_dir / '.versions.json', versions)
+
+
+def load_placeholder_cache(output_dir: Path) -> dict:
+    """加载占位图缓存 {文件哈希: {'width', 'height', 'placeholder'}}"""
+    cache_file = output_dir / '.placeholders.json'
+    if cache_file.exists():
         try:
-            with open(version_file, 'r', encoding='utf-8') as f:
+            with open(cache_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
-        except:
+        except (OSError, ValueError):
             return {}
     return {}
 
 
-def save_versions(output_dir: Path, versions: dict):
-    """保存版本信息"""
-    version_file = output_dir / '.versions.json'
-    with open(version_file, 'w', encoding='utf-8') as f:
-        json.dump(versions, f, ensure_ascii=False, indent=2)
+def make_placeholder(file_path: Path) -> dict:
+    """
+    生成占位图
+    
+    Returns:
+        {'width', 'height', 'placeholder'}，placeholder 为 data URI
+    """
+    with Image.open(file_path) as img:
+        width, height = img.size
+        # JPEG 可直接按缩小尺寸解码
+        img.draft('RGB', (PLACEHOLDER_SIZE * 2, PLACEHOLDER_SIZE * 2))
+        has_alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+        thumb = img.convert('RGBA' if has_alpha else 'RGB')
+        thumb.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BOX)
+    
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY, method=6)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    
+    return {
+        'width': width,
+        'height': height,
+        'placeholder': f"data:image/webp;base64,{encoded}",
+    }
+
+
+def generate_placeholders(output_dir: Path, file_hashes: dict):
+    """
+    生成 placeholders.json
+    
+    Args:
+        output_dir: 输出目录
+        file_hashes: {相对路径: (文件路径, 文件哈希)}
+    """
+    cache = load_placeholder_cache(output_dir)
+    new_cache = {}
+    placeholders = {}
+    computed_count = 0
+    
+    for posix_path in sorted(file_hashes):
+        file_path, file_hash = file_hashes[posix_path]
+        entry = cache.get(file_hash) or new_cache.get(file_hash)
+        if entry is None:
+            try:
+                entry = make_placeholder(file_path)
+            except Exception as e:
+                print(f"⚠️  无法生成占位图 {posix_path}: {e}")
+                continue
+            computed_count += 1
+        new_cache[file_hash] = entry
+        placeholders[posix_path] = entry
+    
+    # 只保留当前文件的缓存
+    with atomic_write(output_dir / '.placeholders.json') as f:
+        json.dump(new_cache, f, ensure_ascii=False, indent=2)
+    
+    output_file = output_dir / 'placeholders.json'
+    with atomic_write(output_file) as f:
+        json.dump(placeholders, f, ensure_ascii=False, separators=(',', ':'))
+    
+    print(f"🖼️  占位图: {len(placeholders)} 个（新生成 {computed_count} 个）")
+    print(f"💾 占位图文件大小: {output_file.stat().st_size / 1024:.2f} KB")
+
+
+def get_image_dimensions(file_path: Path, entry: dict = None) -> tuple:
+    """
+    读取图片宽高（只解析文件头）；entry 为 .versions.json 中的记录，有缓存时直接返回
+    
+    只缓存读取成功的宽高：未安装 Pillow 或读取失败时不写入 entry（旧版本写入的 None 也视为
+    没有缓存），安装 Pillow 或文件修复后下次生成即可补上
+    
+    Returns:
+        (width, height)，未安装 Pillow 或读取失败时为 (None, None)
+    """
+    if entry is not None:
+        if isinstance(entry.get('width'), int) and isinstance(entry.get('height'), int):
+            return entry['width'], entry['height']
+        entry.pop('width', None)
+        entry.pop('height', None)
+    
+    if Image is None:
+        return None, None
+    try:
+        with Image.open(file_path) as img:
+            width, height = img.size
+    except (OSError, ValueError):
+        return None, None
+    
+    if entry is not None:
+        entry['width'], entry['height'] = width, height
+    return width, height
+
+
+def write_manifest(output_dir: Path, rows: list) -> Path:
+    """
+    按列写出清单及其压缩版本和 ETag
+    
+    Args:
+        rows: [(path, version, hash, size, width, height, mime), ...]
+    
+    Returns:
+        manifest.json 路径
+    """
+    rows.sort()
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(MANIFEST_COLUMNS)}
+    data = json.dumps(
+        {'format': MANIFEST_FORMAT, 'count': len(rows), 'columns': columns},
+        ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    
+    output_file = output_dir / 'manifest.json'
+    atomic_write_bytes(output_file, data)
+    
+    # mtime=0：内容不变时压缩结果也不变
+    atomic_write_bytes(output_dir / 'manifest.json.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    if zstandard is not None:
+        atomic_write_bytes(output_dir / 'manifest.json.zst', zstandard.ZstdCompressor(level=19).compress(data))
+    
+    atomic_write_bytes(output_dir / 'manifest.etag', f'"{hashlib.md5(data).hexdigest()}"'.encode('utf-8'))
+    
+    return output_file
 
 
-def generate_filelist(product_slug: str, output_format: str = 'txt', enable_version: bool = True):
+def stream_filelist(base_path: Path, output_dir: Path, enable_version: bool = True, stats: dict = None) -> int:
+    """
+    流式生成 files.txt：按最终顺序遍历并逐行写出，不在内存中累积文件列表
+    
+    只有 files.txt 是流式的：启用版本号时 .versions.json 仍整体加载为字典，
+    遍历时逐条移入新字典，最后整体写回，这部分内存与文件数成正比
+    
+    stats 不为 None 时写入 {'files', 'new', 'updated', 'deleted'}
+    
+    Returns:
+        文件数
+    """
+    old_versions = load_versions(output_dir) if enable_version else {}
+    versions = {}  # 遍历时从 old_versions 移入，剩下的就是已删除的文件
+    updated_count = 0
+    new_count = 0
+    count = 0
+    current_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    output_file = output_dir / 'files.txt'
+    with atomic_write(output_file) as f:
+        for entry, posix_path in scan_image_files(str(base_path), enable_version):
+            count += 1
+            if not enable_version:
+                f.write(f"{posix_path}\n")
+                continue
+            
+            if posix_path in old_versions:
+                versions[posix_path] = old_versions.pop(posix_path)
+            status = update_version_entry(versions, posix_path, entry.path, entry.stat(), current_timestamp)
+            if status == 'new':
+                new_count += 1
+            elif status == 'updated':
+                updated_count += 1
+            
+            f.write(f"{posix_path}?v={versions[posix_path]['version']}\n")
+        
+        # 先提交版本信息再替换 files.txt：中断时 files.txt 不会引用未保存的版本号
+        if enable_version:
+            if old_versions:
+                print(f"🗑️  清理已删除文件: {len(old_versions)} 个")
+            save_versions(output_dir, versions)
+    
+    if stats is not None:
+        stats.update(files=count, new=new_count, updated=updated_count, deleted=len(old_versions))
+    
+    print(f"✅ 已生成文件列表: {output_file}")
+    print(f"📊 总计 {count} 个文件")
+    if enable_version:
+        print(f"🆕 新增文件: {new_count} 个")
+        print(f"🔄 更新文件: {updated_count} 个")
+    print(f"💾 文件大小: {output_file.stat().st_size / 1024:.2f} KB")
+    
+    return count
+
+
+def generate_filelist(product_slug: str, output_format: str = 'txt', enable_version: bool = True,
+                      placeholders: bool = False, stream: bool = False, stats: dict = None,
+                      blobstore: bool = False):
     """
     生成产品的文件列表
     
     Args:
         product_slug: 产品 slug，如 'business-headshot-ai'
-        output_format: 输出格式，'txt' 或 'json'
+        output_format: 输出格式，'txt'、'json' 或 'manifest'
         enable_version: 是否启用版本号
+        placeholders: 是否同时生成占位图（placeholders.json）
+        stream: 流式生成（仅 txt 格式，不支持 placeholders），返回文件数而不是文件列表
+        stats: 不为 None 时写入统计 {'files', 'new', 'updated', 'deleted'}
+        blobstore: 同时把图片写入内容寻址存储并更新 blob-index.json（需要启用版本号）
     """
     # 从 tools/filelist-generator/ 往上两级到项目根目录
     base_path = Path(__file__).parent.parent.parent / 'static' / product_slug
@@ -65,76 +421,96 @@ def generate_filelist(product_slug: str, output_format: str = 'txt', enable_vers
     output_dir = Path(__file__).parent / product_slug
     output_dir.mkdir(exist_ok=True)
     
+    # 同一产品同时只允许一个生成器写入
+    with file_lock(output_dir / '.lock'):
+        if stream:
+            if output_format != 'txt' or placeholders:
+                print("⚠️  流式模式只生成 txt 格式，忽略其他输出选项")
+            result = stream_filelist(base_path, output_dir, enable_version, stats)
+        else:
+            result = _build_filelist(base_path, output_dir, output_format, enable_version, placeholders, stats)
+        
+        if blobstore:
+            if enable_version:
+                write_blobstore(base_path, output_dir)
+            else:
+                print("⚠️  内容寻址存储需要 .versions.json 中的哈希，未启用版本号时跳过")
+        
+        return result
+
+
+def write_blobstore(base_path: Path, output_dir: Path):
+    """按刚保存的 .versions.json 把图片写入内容寻址存储并更新路径索引（调用方持有产品锁）"""
+    blob_stats = update_blobstore(base_path, output_dir, load_versions(output_dir))
+    
+    print(f"🗄️  内容寻址存储: {blob_stats['files']} 个文件，新写入对象 {blob_stats['stored']} 个")
+    if blob_stats['mismatch']:
+        print(f"⚠️  {blob_stats['mismatch']} 个文件在生成期间被修改，未写入存储")
+    if blob_stats['index_changed']:
+        print(f"📇 已更新索引: {output_dir / INDEX_NAME}")
+
+
+def _build_filelist(base_path: Path, output_dir: Path, output_format: str, enable_version: bool,
+                    placeholders: bool, stats: dict) -> list:
+    """generate_filelist 的非流式实现（调用方持有产品锁）"""
+    if placeholders and Image is None:
+        print("⚠️  未安装 Pillow，跳过占位图生成 (pip install Pillow)")
+        placeholders = False
+    
     # 加载版本信息
     versions = load_versions(output_dir) if enable_version else {}
     updated_count = 0
     new_count = 0
     
-    # 支持的图片格式
-    image_extensions = {'.webp', '.jpg', '.jpeg', '.png', '.gif'}
-    
     # 收集所有图片文件
     files = []
     current_files_set = set()  # 用于跟踪当前存在的文件
+    file_hashes = {}  # 生成占位图用
+    manifest_rows = []  # manifest 格式用
     current_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    for root, dirs, filenames in os.walk(base_path):
-        # 跳过隐藏目录
-        dirs[:] = [d for d in dirs if not d.startswith('.')]
+    for file_path, posix_path in iter_image_files(base_path):
+        current_files_set.add(posix_path)  # 记录当前存在的文件
         
-        for filename in filenames:
-            # 跳过隐藏文件
-            if filename.startswith('.'):
-                continue
-            
-            # 检查文件扩展名
-            ext = Path(filename).suffix.lower()
-            if ext not in image_extensions:
-                continue
-            
-            # 获取相对路径
-            file_path = Path(root) / filename
-            rel_path = file_path.relative_to(base_path)
-            
-            # 转换为 POSIX 路径（使用 / 分隔符）
-            posix_path = rel_path.as_posix()
-            current_files_set.add(posix_path)  # 记录当前存在的文件
+        if enable_version:
+            # 检查是否需要更新版本号
+            status = update_version_entry(versions, posix_path, file_path, file_path.stat(), current_timestamp)
+            if status == 'new':
+                new_count += 1
+            elif status == 'updated':
+                updated_count += 1
             
-            if enable_version:
-                # 计算文件哈希
-                file_hash = get_file_hash(file_path)
-                
-                # 检查是否需要更新版本号
-                if posix_path in versions:
-                    old_hash = versions[posix_path].get('hash')
-                    if old_hash != file_hash:
-                        # 文件已变化，更新版本号
-                        versions[posix_path] = {
-                            'hash': file_hash,
-                            'version': current_timestamp
-                        }
-                        updated_count += 1
-                else:
-                    # 新文件
-                    versions[posix_path] = {
-                        'hash': file_hash,
-                        'version': current_timestamp
-                    }
-                    new_count += 1
-                
-                # 添加版本号参数
-                version = versions[posix_path]['version']
-                posix_path_with_version = f"{posix_path}?v={version}"
-                files.append(posix_path_with_version)
-            else:
-                files.append(posix_path)
+            # 添加版本号参数
+            version = versions[posix_path]['version']
+            posix_path_with_version = f"{posix_path}?v={version}"
+            files.append(posix_path_with_version)
+        else:
+            files.append(posix_path)
+        
+        if placeholders or output_format == 'manifest':
+            file_hash = versions[posix_path]['hash'] if enable_version else get_file_hash(file_path)
+        
+        if placeholders:
+            file_hashes[posix_path] = (file_path, file_hash)
+        
+        if output_format == 'manifest':
+            width, height = get_image_dimensions(file_path, versions.get(posix_path))
+            manifest_rows.append((
+                posix_path,
+                versions[posix_path]['version'] if enable_version else '',
+                file_hash,
+                file_path.stat().st_size,
+                width,
+                height,
+                MIME_TYPES.get(file_path.suffix.lower(), 'application/octet-stream'),
+            ))
     
     # 排序
     files.sort()
     
     # 清理已删除文件的版本信息
+    deleted_count = 0
     if enable_version:
-        deleted_count = 0
         files_to_delete = []
         for file_path in versions.keys():
             if file_path not in current_files_set:
@@ -149,9 +525,12 @@ def generate_filelist(product_slug: str, output_format: str = 'txt', enable_vers
         
         save_versions(output_dir, versions)
     
+    if stats is not None:
+        stats.update(files=len(files), new=new_count, updated=updated_count, deleted=deleted_count)
+    
     if output_format == 'txt':
         output_file = output_dir / 'files.txt'
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with atomic_write(output_file) as f:
             for file_path in files:
                 f.write(f"{file_path}\n")
         
@@ -164,7 +543,7 @@ def generate_filelist(product_slug: str, output_format: str = 'txt', enable_vers
     
     elif output_format == 'json':
         output_file = output_dir / 'files.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with atomic_write(output_file) as f:
             json.dump(files, f, ensure_ascii=False, indent=None)
         
         print(f"✅ 已生成文件列表: {output_file}")
@@ -174,11 +553,60 @@ def generate_filelist(product_slug: str, output_format: str = 'txt', enable_vers
             print(f"🔄 更新文件: {updated_count} 个")
         print(f"💾 文件大小: {output_file.stat().st_size / 1024:.2f} KB")
     
+    elif output_format == 'manifest':
+        output_file = write_manifest(output_dir, manifest_rows)
+        
+        print(f"✅ 已生成清单: {output_file}")
+        print(f"📊 总计 {len(files)} 个文件")
+        if enable_version:
+            print(f"🆕 新增文件: {new_count} 个")
+            print(f"🔄 更新文件: {updated_count} 个")
+        print(f"💾 文件大小: {output_file.stat().st_size / 1024:.2f} KB"
+              f"（gzip {(output_dir / 'manifest.json.gz').stat().st_size / 1024:.2f} KB）")
+    
+    if placeholders:
+        generate_placeholders(output_dir, file_hashes)
+    
     return files
 
 
-def generate_all_products(output_format: str = 'txt'):
-    """生成所有产品的文件列表"""
+def _generate_product_job(job: tuple) -> dict:
+    """
+    生成单个产品的文件列表（可在子进程中执行），输出单独捕获，避免多个产品的日志交错
+    
+    Returns:
+        {'product', 'output', 'seconds', 'stats', 'error'}
+    """
+    product, output_format, placeholders, stream, blobstore = job
+    output = io.StringIO()
+    stats = {}
+    error = None
+    
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        try:
+            generate_filelist(product, output_format, placeholders=placeholders, stream=stream, stats=stats,
+                              blobstore=blobstore)
+        except Exception as e:
+            error = str(e)
+    seconds = time.perf_counter() - start
+    
+    return {
+        'product': product,
+        'output': output.getvalue(),
+        'seconds': seconds,
+        'stats': stats,
+        'error': error,
+    }
+
+
+def generate_all_products(output_format: str = 'txt', placeholders: bool = False, stream: bool = False,
+                          workers: int = 1, blobstore: bool = False):
+    """
+    生成所有产品的文件列表
+    
+    workers > 1 时多个产品分发到进程池并行生成；每个产品只写自己的输出目录
+    """
     # 从 tools/filelist-generator/ 往上两级到项目根目录
     store_dir = Path(__file__).parent.parent.parent / 'static'
     
@@ -200,35 +628,110 @@ def generate_all_products(output_format: str = 'txt'):
     print("=" * 60)
     print()
     
-    for product in products:
-        print(f"处理产品: {product}")
-        generate_filelist(product, output_format)
+    jobs = [(product, output_format, placeholders, stream, blobstore) for product in sorted(products)]
+    workers = min(workers, len(jobs))
+    results = []
+    
+    def report(result: dict):
+        # 每个产品完成后整体输出其日志
+        results.append(result)
+        print(f"处理产品: {result['product']}")
+        print(result['output'], end='')
+        if result['error']:
+            print(f"❌ 错误: {result['error']}")
         print()
     
+    start = time.perf_counter()
+    if workers <= 1:
+        for job in jobs:
+            report(_generate_product_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_generate_product_job, job) for job in jobs]
+            for future in as_completed(futures):
+                report(future.result())
+    elapsed = time.perf_counter() - start
+    
+    print("=" * 60)
+    print("📊 统计信息")
+    print("=" * 60)
+    for result in sorted(results, key=lambda r: r['product']):
+        stats = result['stats']
+        if result['error'] or not stats:
+            print(f"❌ {result['product']}: {result['error'] or '未生成'}")
+        else:
+            print(
+                f"✅ {result['product']}: {stats['files']} 个文件，新增 {stats['new']}，"
+                f"更新 {stats['updated']}，删除 {stats['deleted']}（{result['seconds']:.2f}s）"
+            )
+    print(f"⏱️  总耗时: {elapsed:.2f}s（{max(workers, 1)} 个进程）")
     print("=" * 60)
     print("✅ 所有文件列表生成完成！")
     print("=" * 60)
 
 
+def parse_args(argv: list) -> dict:
+    """
+    解析命令行参数
+    
+    generate-filelist.py [product_slug [txt|json|manifest]] [--placeholders] [--stream] [--blobstore] [-j N]
+    """
+    options = {
+        'product': None,
+        'format': 'txt',
+        'placeholders': False,
+        'stream': False,
+        'blobstore': False,
+        'workers': os.cpu_count() or 1,
+    }
+    
+    positional = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if arg in ('-j', '--workers') and i < len(argv):
+            options['workers'] = max(1, int(argv[i]))
+            i += 1
+        elif arg == '--placeholders':
+            options['placeholders'] = True
+        elif arg == '--stream':
+            options['stream'] = True
+        elif arg == '--blobstore':
+            options['blobstore'] = True
+        else:
+            positional.append(arg)
+    
+    if positional:
+        options['product'] = positional[0]
+    if len(positional) > 1:
+        options['format'] = positional[1]
+    
+    return options
+
+
 def main():
-    import sys
+    options = parse_args(sys.argv[1:])
     
-    if len(sys.argv) > 1:
-        product_slug = sys.argv[1]
-        output_format = sys.argv[2] if len(sys.argv) > 2 else 'txt'
-        
+    if options['product']:
         print("=" * 60)
         print("📦 静态资源文件列表生成工具")
         print("=" * 60)
         print()
         
-        generate_filelist(product_slug, output_format)
+        generate_filelist(
+            options['product'], options['format'],
+            placeholders=options['placeholders'], stream=options['stream'], blobstore=options['blobstore']
+        )
         
         print()
         print("=" * 60)
     else:
         # 生成所有产品
-        generate_all_products('txt')
+        generate_all_products(
+            'txt', placeholders=options['placeholders'], stream=options['stream'], workers=options['workers'],
+            blobstore=options['blobstore']
+        )
 
 
 if __name__ == '__main__':
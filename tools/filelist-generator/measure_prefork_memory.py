@@ -0,0 +1,246 @@
+"""
+测量 pre-fork 模式下每个 worker 的内存占用（RSS / PSS）
+对比三种方式启动 N 个 worker 后的内存，用于验证 prefork_server.py 的效果：
+
+- naive：先 fork，每个 worker 各自 import 应用、加载文件列表（相当于多个独立进程）
+- preload：主进程加载应用后 fork，worker 通过写时复制共享
+- freeze：主进程加载应用，gc.collect() + gc.freeze() 后 fork（prefork_server.py 的做法）
+
+每个 worker 启动后先用 Flask 测试客户端执行一轮请求（分页、分类、搜索、统计）并 gc.collect()，
+再由主进程读取 /proc/{pid}/smaps_rollup（--idle 时不执行请求）。每种方式在单独的子进程中运行，互不影响。
+只支持 Linux；需要安装 Flask。
+
+注意：搜索会遍历全部条目，CPython 读取对象时要修改引用计数，被访问过的共享页随之被复制，
+因此执行请求后的 PSS 比空闲时高，文件列表越大差距越明显。
+
+用法：
+python tools/filelist-generator/measure_prefork_memory.py                       # 使用 business-headshot-ai/files.txt
+python tools/filelist-generator/measure_prefork_memory.py -w 4 --synthetic 300000  # 生成 30 万条的临时文件列表
+python tools/filelist-generator/measure_prefork_memory.py --filelist path/to/files.txt
+python tools/filelist-generator/measure_prefork_memory.py --synthetic 300000 --idle  # 不执行请求，只测 fork 后的占用
+"""
+
+import gc
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from prefork_server import format_kb, memory_usage
+
+
+MODES = ['naive', 'preload', 'freeze']
+MODE_NAMES = {
+    'naive': '各自加载',
+    'preload': '主进程加载',
+    'freeze': '主进程加载 + gc.freeze',
+}
+
+DEFAULT_WORKERS = 4
+
+# worker 启动后执行的请求（每个路径执行 WORKLOAD_ROUNDS 次）
+WORKLOAD = [
+    '/api/files?page=1&page_size=100',
+    '/api/files?page=50&page_size=100',
+    '/api/files?cursor=&page_size=100',
+    '/api/categories',
+    '/api/categories/home?page_size=100',
+    '/api/search?q=city',
+    '/api/stats',
+]
+WORKLOAD_ROUNDS = 3
+
+
+def write_synthetic_filelist(path: Path, count: int):
+    """生成 count 条排序好的带版本号条目，目录结构与真实文件列表相似"""
+    categories = ['home', 'faces', 'backdrops', 'poses', 'outfits', 'hairstyles', 'expressions', 'glasses']
+    lines = []
+    for i in range(count):
+        category = categories[i % len(categories)]
+        persona = f"persona-{i // 1000:03d}"
+        lines.append(f"images/{category}/{persona}/{i:07d}.webp?v=20250101_{i % 240000:06d}")
+    lines.sort()
+    path.write_text(''.join(f"{line}\n" for line in lines), encoding='utf-8')
+
+
+def load_app(filelist: str):
+    """加载 api_example（文件列表路径替换为 filelist）"""
+    import api_handlers
+    api_handlers.FILELIST_PATH = Path(filelist)
+    import api_example
+    api_example.AUTO_RELOAD = False
+    return api_example
+
+
+def run_workload(module):
+    client = module.app.test_client()
+    for _ in range(WORKLOAD_ROUNDS):
+        for path in WORKLOAD:
+            response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: {response.status_code}")
+    gc.collect()
+
+
+def measure_mode(mode: str, workers: int, filelist: str, idle: bool = False) -> dict:
+    """在当前进程中按 mode 启动 worker 并测量（由 --run-mode 子进程调用）"""
+    module = None
+    if mode != 'naive':
+        module = load_app(filelist)
+        if mode == 'freeze':
+            gc.collect()
+            gc.freeze()
+    
+    pids = []
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                module = module or load_app(filelist)
+                if not idle:
+                    run_workload(module)
+                os.write(write_fd, b'1')
+                signal.pause()
+            except BaseException as e:
+                print(f"❌ worker 异常退出: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        pids.append(pid)
+        pipes.append(read_fd)
+    
+    try:
+        for read_fd in pipes:
+            if os.read(read_fd, 1) != b'1':
+                raise RuntimeError("worker 启动失败")
+            os.close(read_fd)
+        master = memory_usage(os.getpid())
+        usages = [memory_usage(pid) for pid in pids]
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+    
+    return {
+        'master': master,
+        'workers': usages,
+    }
+
+
+def run_mode(mode: str, workers: int, filelist: str, idle: bool) -> dict:
+    """在新的子进程中测量一种方式，避免主进程已加载的模块影响结果"""
+    args = [sys.executable, __file__, '--run-mode', mode, '-w', str(workers), '--filelist', filelist]
+    if idle:
+        args.append('--idle')
+    output = subprocess.run(args, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_results(results: dict, workers: int):
+    print()
+    print(f"{'方式':<24} {'worker RSS MB':>14} {'worker PSS MB':>14} {'合计 PSS MB':>12}")
+    print("-" * 68)
+    for mode, data in results.items():
+        rss = sum(usage['rss'] for usage in data['workers']) / workers
+        pss = sum(usage['pss'] for usage in data['workers']) / workers
+        total = data['master']['pss'] + sum(usage['pss'] for usage in data['workers'])
+        print(f"{MODE_NAMES[mode]:<24} {format_kb(rss):>14} {format_kb(pss):>14} {format_kb(total):>12}")
+    print("-" * 68)
+    print("worker 列为平均值；合计 PSS 包括主进程")
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'workers': DEFAULT_WORKERS,
+        'filelist': None,
+        'synthetic': 0,
+        'run_mode': None,
+        'idle': False,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-w', '--workers') and i + 1 < len(argv):
+            options['workers'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg == '--filelist' and i + 1 < len(argv):
+            options['filelist'] = argv[i + 1]
+            i += 2
+            continue
+        if arg == '--synthetic' and i + 1 < len(argv):
+            options['synthetic'] = int(argv[i + 1])
+            i += 2
+            continue
+        if arg == '--idle':
+            options['idle'] = True
+            i += 1
+            continue
+        if arg == '--run-mode' and i + 1 < len(argv):
+            options['run_mode'] = argv[i + 1]
+            i += 2
+            continue
+        i += 1
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    
+    if options['run_mode']:
+        result = measure_mode(options['run_mode'], options['workers'], options['filelist'], options['idle'])
+        print(json.dumps(result))
+        return
+    
+    if not Path('/proc/self/smaps_rollup').exists():
+        print("❌ 需要 Linux 的 /proc/{pid}/smaps_rollup")
+        sys.exit(1)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        filelist = options['filelist']
+        if options['synthetic']:
+            filelist = str(Path(tmp) / 'files.txt')
+            write_synthetic_filelist(Path(filelist), options['synthetic'])
+        elif filelist is None:
+            import api_handlers
+            filelist = str(api_handlers.FILELIST_PATH)
+        
+        if not Path(filelist).exists():
+            print(f"❌ 文件列表不存在: {filelist}")
+            sys.exit(1)
+        
+        with open(filelist, 'rb') as f:
+            entries = sum(1 for _ in f)
+        
+        print("=" * 60)
+        print("📏 Pre-fork worker 内存占用")
+        print("=" * 60)
+        print(f"文件列表: {filelist}（{entries} 条，{Path(filelist).stat().st_size / 1024 / 1024:.1f} MB）")
+        print(f"Worker: {options['workers']}")
+        print(f"请求: {'不执行（--idle）' if options['idle'] else f'每个路径 {WORKLOAD_ROUNDS} 次'}")
+        
+        results = {}
+        for mode in MODES:
+            print(f"⏱️  {MODE_NAMES[mode]} ...")
+            results[mode] = run_mode(mode, options['workers'], filelist, options['idle'])
+    
+    print_results(results, options['workers'])
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
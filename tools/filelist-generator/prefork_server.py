@@ -0,0 +1,517 @@
+"""
+Pre-fork 多进程服务器
+主进程加载并索引文件列表一次，然后 fork 出多个 worker；
+worker 通过写时复制（copy-on-write）共享主进程的内存页，不再各自加载 files.txt
+
+- fork 前 gc.collect() + gc.freeze()：已加载的对象移入永久代，worker 中的垃圾回收
+  不会扫描、改写它们，共享页不会因 GC 被复制
+- 支持 SO_REUSEPORT 时每个 worker 各自监听同一端口，由内核分配连接；
+  否则主进程监听一次，worker 继承同一个 socket
+- 每个 worker 的请求数记录在共享内存中，主进程定期输出请求数和 RSS / PSS
+  （PSS 按共享进程数分摊共享页，能反映真实占用，读取自 /proc/{pid}/smaps_rollup）
+- worker 异常退出时自动重启；启动后很快退出的按指数退避重启，连续失败
+  WORKER_MAX_FAILURES 次后放弃（如端口已被其他进程占用），所有 worker 都放弃时主进程退出
+- SIGHUP 时主进程重新加载文件列表并逐个替换 worker：先启动新 worker、等它绑定端口，
+  再向旧 worker 发送 SIGTERM；旧 worker 调用 server.shutdown() 停止接受连接，
+  处理完已接受的请求后退出，替换期间始终有 worker 在监听，不会拒绝连接或中断请求
+- 主进程每秒检查一次文件列表是否变化，变化时同样重新加载并替换 worker；
+  worker 不在请求中各自重新加载（api_example.AUTO_RELOAD = False），
+  否则每个 worker 各持一份私有副本，共享的内存页随之失效
+
+用法：
+python tools/filelist-generator/prefork_server.py                     # api_example:app，4 个 worker，5000 端口
+python tools/filelist-generator/prefork_server.py -w 8 --port 5000
+python tools/filelist-generator/prefork_server.py --app api_example:app --stats-interval 10
+
+dev_server.py 也可以用 --workers N 以 pre-fork 模式运行
+"""
+
+import gc
+import importlib
+import math
+import multiprocessing
+import os
+import select
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+
+DEFAULT_WORKERS = 4
+DEFAULT_PORT = 5000
+
+# 定期输出 worker 统计的间隔（秒），0 表示只在退出时输出
+DEFAULT_STATS_INTERVAL = 30
+
+# 主进程检查共享数据是否变化的间隔（秒）
+CHANGE_CHECK_INTERVAL = 1.0
+
+# 新 worker 创建服务器（绑定端口）的最长等待时间（秒）
+WORKER_READY_TIMEOUT = 10.0
+
+# 优雅停止 worker 的最长等待时间（秒），超时后强制结束
+WORKER_STOP_TIMEOUT = 30.0
+
+# 启动后运行不足该时间（秒）就退出的 worker 视为启动失败
+WORKER_MIN_UPTIME = 5.0
+
+# 启动失败后的重启间隔：第 1 次立即重启，之后从 WORKER_BACKOFF_BASE 秒开始翻倍，最长 WORKER_BACKOFF_MAX 秒；
+# 同一序号连续失败 WORKER_MAX_FAILURES 次后不再重启
+WORKER_BACKOFF_BASE = 0.5
+WORKER_BACKOFF_MAX = 30.0
+WORKER_MAX_FAILURES = 5
+
+# 只在 Linux 等支持 SO_REUSEPORT 和 fork 的平台上启用
+HAS_REUSEPORT = hasattr(socket, 'SO_REUSEPORT')
+HAS_FORK = hasattr(os, 'fork')
+
+
+def make_server_class(base_class, reuse_port: bool):
+    """创建设置了 SO_REUSEADDR（以及 SO_REUSEPORT）的服务器类"""
+    
+    class PreforkServer(base_class):
+        allow_reuse_address = True
+        
+        def server_bind(self):
+            if reuse_port:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            super().server_bind()
+    
+    return PreforkServer
+
+
+def make_counting_handler(handler_class, counter, index: int, quiet: bool = True):
+    """
+    创建统计请求数的处理器类
+    
+    http.server 和 wsgiref 的处理器每个请求结束时都会调用 log_request，
+    在这里给共享内存中本 worker 的计数加一
+    """
+    lock = threading.Lock()
+    
+    class CountingHandler(handler_class):
+        def log_request(self, code='-', size='-'):
+            with lock:
+                counter[index] += 1
+            if not quiet:
+                super().log_request(code, size)
+    
+    return CountingHandler
+
+
+def memory_usage(pid: int) -> dict:
+    """
+    读取进程内存占用（KB）
+    
+    Returns:
+        {'rss', 'pss'}；不支持的平台为 None
+    """
+    usage = {'rss': None, 'pss': None}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in ('Rss', 'Pss'):
+                    usage[name.lower()] = int(value.split()[0])
+    except (OSError, ValueError):
+        pass
+    return usage
+
+
+def format_kb(value) -> str:
+    return f"{value / 1024:.1f}" if value is not None else '-'
+
+
+def print_stats(workers: dict, counter):
+    """输出主进程和每个 worker 的请求数、RSS、PSS"""
+    print()
+    print(f"{'进程':<10} {'PID':>8} {'请求数':>10} {'RSS MB':>10} {'PSS MB':>10}")
+    print("-" * 52)
+    
+    master = memory_usage(os.getpid())
+    print(f"{'master':<10} {os.getpid():>8} {'-':>10} {format_kb(master['rss']):>10} {format_kb(master['pss']):>10}")
+    
+    total_pss = master['pss']
+    for index, pid in sorted(workers.items()):
+        usage = memory_usage(pid)
+        if total_pss is not None and usage['pss'] is not None:
+            total_pss += usage['pss']
+        print(f"{f'worker-{index}':<10} {pid:>8} {counter[index]:>10} "
+              f"{format_kb(usage['rss']):>10} {format_kb(usage['pss']):>10}")
+    
+    print("-" * 52)
+    print(f"{'合计':<10} {'':>8} {sum(counter):>10} {'':>10} {format_kb(total_pss):>10}")
+    sys.stdout.flush()
+
+
+def run_prefork(make_server, workers: int, reload=None,
+                stats_interval: int = DEFAULT_STATS_INTERVAL, changed=None) -> bool:
+    """
+    运行 pre-fork 服务器（调用前应已在主进程中加载好共享数据）
+    
+    Args:
+        make_server: make_server(reuse_port, counter, index) -> socketserver.BaseServer，
+            reuse_port 为 False 时 index 为 None（主进程中创建、所有 worker 共用）
+        workers: worker 数量
+        reload: SIGHUP 时在主进程中调用的重新加载函数（可选）
+        stats_interval: 定期输出统计的间隔（秒），0 表示只在退出时输出
+        changed: 主进程定期调用，返回 True 时与 SIGHUP 一样重新加载并替换 worker（可选）
+    
+    Returns:
+        正常停止时为 True；所有 worker 都反复启动失败、主进程放弃时为 False
+    """
+    if not HAS_FORK:
+        print("⚠️  当前平台不支持 fork，以单进程运行")
+        make_server(False, [0], 0).serve_forever()
+        return True
+    
+    # 每个 worker 的请求数（共享内存，fork 后所有进程可见）
+    counter = multiprocessing.RawArray('Q', workers)
+    
+    shared_server = None
+    if not HAS_REUSEPORT:
+        print("⚠️  不支持 SO_REUSEPORT，worker 共用主进程的监听 socket")
+        shared_server = make_server(False, counter, None)
+    
+    # 已加载的对象移入永久代，worker 的 GC 不再触碰这些内存页
+    gc.collect()
+    gc.freeze()
+    
+    # 当前 worker {序号: pid}、启动时间，以及正在停止的旧 worker {pid: 强制结束的时间}
+    children = {}
+    started = {}
+    retiring = {}
+    # 连续启动失败的次数、下次重启的时间、已放弃的序号
+    failures = {}
+    pending = {}
+    abandoned = set()
+    state = {'running': True, 'reload': False}
+    
+    def spawn(index: int) -> tuple:
+        """
+        fork 一个 worker，等它创建好服务器（已绑定端口）后返回
+        
+        Returns:
+            (pid, 是否就绪)；未就绪的 worker 可能已退出，或仍在启动
+        """
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid:
+            os.close(write_fd)
+            try:
+                ready, _, _ = select.select([read_fd], [], [], WORKER_READY_TIMEOUT)
+                return pid, bool(ready) and os.read(read_fd, 1) == b'1'
+            finally:
+                os.close(read_fd)
+        
+        # worker：Ctrl+C 由主进程统一处理
+        os.close(read_fd)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_DFL)
+        code = 0
+        try:
+            server = shared_server
+            if server is None:
+                server = make_server(True, counter, index)
+            elif hasattr(server, 'RequestHandlerClass'):
+                server.RequestHandlerClass = make_counting_handler(
+                    server.RequestHandlerClass, counter, index
+                )
+            
+            # SIGTERM 时优雅停止：不再接受新连接，处理完已接受的请求后退出
+            # （shutdown() 会等待 serve_forever 返回，不能在同一线程的信号处理函数中直接调用）
+            def graceful_stop(signum, frame):
+                threading.Thread(target=server.shutdown, daemon=True).start()
+            
+            signal.signal(signal.SIGTERM, graceful_stop)
+            # ThreadingMixIn 只等待非守护线程，请求线程改为非守护，server_close() 才会等它们结束
+            if getattr(server, 'daemon_threads', False):
+                server.daemon_threads = False
+            os.write(write_fd, b'1')
+            os.close(write_fd)
+            server.serve_forever()
+            
+            # 独占的监听 socket（SO_REUSEPORT）关闭前先处理队列中已完成握手的连接，
+            # 否则这些连接会被内核重置；共享 socket 由其他 worker 继续处理
+            if server is not shared_server:
+                server.timeout = 0
+                while select.select([server], [], [], 0)[0]:
+                    server.handle_request()
+            # 等待处理中的请求线程结束
+            server.server_close()
+        except BaseException as e:
+            print(f"❌ worker-{index} 异常退出: {e}")
+            code = 1
+        finally:
+            sys.stdout.flush()
+            os._exit(code)
+    
+    def start(index: int):
+        """启动（或重启）序号为 index 的 worker"""
+        pid, _ = spawn(index)
+        children[index] = pid
+        started[index] = time.monotonic()
+    
+    def retire(pid: int):
+        """让旧 worker 优雅停止，超过 WORKER_STOP_TIMEOUT 仍未退出时强制结束"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        retiring[pid] = time.monotonic() + WORKER_STOP_TIMEOUT
+    
+    def replace_all():
+        """
+        逐个替换 worker：先启动新 worker 并等它绑定端口，再停止对应的旧 worker，
+        任何时刻都有 worker 在监听，替换期间不会拒绝连接；新 worker 启动失败时保留旧 worker
+        """
+        for index in sorted(children):
+            old_pid = children[index]
+            pid, ready = spawn(index)
+            if not ready:
+                print(f"⚠️  新的 worker-{index} 未能启动，保留旧 worker")
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                retiring[pid] = math.inf
+                continue
+            children[index] = pid
+            started[index] = time.monotonic()
+            retire(old_pid)
+    
+    def worker_exited(index: int):
+        """worker 意外退出：启动后很快退出的按指数退避重启，连续失败过多时放弃该序号"""
+        del children[index]
+        if not state['running']:
+            return
+        
+        if time.monotonic() - started[index] >= WORKER_MIN_UPTIME:
+            failures[index] = 0
+        failures[index] = failures.get(index, 0) + 1
+        
+        if failures[index] >= WORKER_MAX_FAILURES:
+            abandoned.add(index)
+            print(f"❌ worker-{index} 连续 {WORKER_MAX_FAILURES} 次启动后很快退出，不再重启")
+            if len(abandoned) == workers:
+                print("❌ 所有 worker 都无法启动（端口是否已被占用？），停止服务器")
+                state['running'] = False
+            return
+        
+        if failures[index] == 1:
+            start(index)
+            return
+        delay = min(WORKER_BACKOFF_MAX, WORKER_BACKOFF_BASE * 2 ** (failures[index] - 2))
+        print(f"⏳ worker-{index} 很快退出（第 {failures[index]} 次），{delay:.1f} 秒后重启")
+        pending[index] = time.monotonic() + delay
+    
+    def stop(signum, frame):
+        state['running'] = False
+    
+    def request_reload(signum, frame):
+        state['reload'] = True
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGHUP, request_reload)
+    
+    for index in range(workers):
+        start(index)
+    print(f"✅ 已启动 {workers} 个 worker（{'SO_REUSEPORT' if shared_server is None else '共享 socket'}）")
+    sys.stdout.flush()
+    
+    last_stats = time.monotonic()
+    last_check = time.monotonic()
+    try:
+        while state['running']:
+            if changed is not None and time.monotonic() - last_check >= CHANGE_CHECK_INTERVAL:
+                last_check = time.monotonic()
+                if changed():
+                    print("📝 共享数据已变化")
+                    state['reload'] = True
+            
+            if state['reload']:
+                state['reload'] = False
+                print("🔄 重新加载并逐个替换 worker")
+                if reload is not None:
+                    gc.unfreeze()
+                    reload()
+                    gc.collect()
+                    gc.freeze()
+                replace_all()
+            
+            # 到时间的 worker 重启
+            for index, due in list(pending.items()):
+                if time.monotonic() >= due:
+                    del pending[index]
+                    start(index)
+            
+            # 超时仍未退出的旧 worker 强制结束
+            for pid, deadline in list(retiring.items()):
+                if time.monotonic() >= deadline:
+                    print(f"⚠️  旧 worker {pid} 未在 {WORKER_STOP_TIMEOUT} 秒内退出，强制结束")
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    retiring[pid] = math.inf
+            
+            # 回收退出的进程：旧 worker 直接移除，当前 worker 按退避规则重启
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid:
+                if retiring.pop(pid, None) is None:
+                    for index, child_pid in list(children.items()):
+                        if child_pid == pid:
+                            worker_exited(index)
+                continue
+            
+            if stats_interval and time.monotonic() - last_stats >= stats_interval:
+                print_stats(children, counter)
+                last_stats = time.monotonic()
+            
+            time.sleep(0.2)
+    finally:
+        print_stats(children, counter)
+        stop_workers(list(children.values()) + list(retiring))
+        if shared_server is not None:
+            shared_server.server_close()
+        print("\n👋 服务器已停止")
+    
+    return len(abandoned) < workers
+
+
+def stop_workers(pids: list):
+    """向 worker 发送 SIGTERM 并等待退出，超过 WORKER_STOP_TIMEOUT 仍未退出的强制结束"""
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    
+    deadline = time.monotonic() + WORKER_STOP_TIMEOUT
+    remaining = set(pids)
+    while remaining:
+        for pid in list(remaining):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                remaining.discard(pid)
+        if remaining and time.monotonic() >= deadline:
+            for pid in remaining:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            return
+        time.sleep(0.05)
+
+
+# ==================== WSGI 应用 ====================
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+def load_wsgi_app(spec: str):
+    """加载 'module:attr' 形式的 WSGI 应用（模块位于本目录）"""
+    module_name, _, attr = spec.partition(':')
+    sys.path.insert(0, str(Path(__file__).parent))
+    module = importlib.import_module(module_name)
+    return module, getattr(module, attr or 'app')
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'app': 'api_example:app',
+        'host': '0.0.0.0',
+        'port': DEFAULT_PORT,
+        'workers': DEFAULT_WORKERS,
+        'stats_interval': DEFAULT_STATS_INTERVAL,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-w', '--workers') and i + 1 < len(argv):
+            options['workers'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg == '--port' and i + 1 < len(argv):
+            options['port'] = int(argv[i + 1])
+            i += 2
+            continue
+        if arg == '--host' and i + 1 < len(argv):
+            options['host'] = argv[i + 1]
+            i += 2
+            continue
+        if arg == '--app' and i + 1 < len(argv):
+            options['app'] = argv[i + 1]
+            i += 2
+            continue
+        if arg == '--stats-interval' and i + 1 < len(argv):
+            options['stats_interval'] = max(0, int(argv[i + 1]))
+            i += 2
+            continue
+        i += 1
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    
+    print("=" * 60)
+    print("🚀 Pre-fork API Server")
+    print("=" * 60)
+    print(f"应用: {options['app']}")
+    print(f"监听: http://{options['host']}:{options['port']}")
+    print(f"Worker: {options['workers']}")
+    print("=" * 60)
+    print()
+    
+    # 主进程中加载应用（文件列表在这里解析、索引一次）
+    module, app = load_wsgi_app(options['app'])
+    parser = getattr(module, 'parser', None)
+    cache = getattr(module, 'response_cache', None)
+    
+    # 文件列表的变化由主进程检查，worker 不在请求中各自重新加载
+    if hasattr(module, 'AUTO_RELOAD'):
+        module.AUTO_RELOAD = False
+    
+    def reload():
+        if parser is not None and parser.reload() and cache is not None:
+            cache.clear()
+    
+    def make_server(reuse_port, counter, index):
+        server_class = make_server_class(ThreadingWSGIServer, reuse_port)
+        handler_class = WSGIRequestHandler
+        if index is not None:
+            handler_class = make_counting_handler(handler_class, counter, index)
+        server = server_class((options['host'], options['port']), handler_class)
+        server.set_app(app)
+        return server
+    
+    changed = parser.needs_reload if parser is not None else None
+    if not run_prefork(make_server, options['workers'], reload, options['stats_interval'], changed):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
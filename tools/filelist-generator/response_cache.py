@@ -0,0 +1,107 @@
+"""
+预序列化响应缓存
+供 api_example.py 使用：文件列表不变时，相同请求直接返回已压缩好的 JSON 字节
+
+- 键由调用方决定，通常为 (端点, 规范化后的参数, Host, 文件列表版本号)
+- 值为 gzip 压缩后的 JSON 字节和 ETag，客户端不接受 gzip 时再解压
+- 按字节预算做 LRU 淘汰；文件列表重新加载后调用 clear() 整体失效
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# 默认字节预算（压缩后的大小）
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def serialize(data: Any) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class ResponseCache:
+    """按字节预算 LRU 淘汰的响应缓存（线程安全）"""
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes: 缓存的压缩后响应体总大小上限，超过时淘汰最久未使用的条目
+        """
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, Tuple[bytes, str]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        """
+        查找缓存
+        
+        Returns:
+            (gzip 压缩的响应体, ETag)；未命中时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key: Hashable, data: Any) -> Tuple[bytes, str]:
+        """
+        序列化、压缩并缓存响应数据
+        
+        单个响应超过字节预算时只返回不缓存
+        
+        Returns:
+            (gzip 压缩的响应体, ETag)
+        """
+        body = serialize(data)
+        # mtime=0：相同内容压缩结果也相同
+        entry = (gzip.compress(body, compresslevel=6, mtime=0), hashlib.md5(body).hexdigest())
+        size = len(entry[0])
+        
+        if size > self.max_bytes:
+            return entry
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            
+            self._entries[key] = entry
+            self._bytes += size
+            
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[0])
+                self.evictions += 1
+        
+        return entry
+    
+    def clear(self):
+        """清空缓存（文件列表重新加载后调用）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def get_info(self) -> Dict[str, int]:
+        """缓存统计"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
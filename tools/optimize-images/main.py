@@ -0,0 +1,338 @@
+"""
+重新压缩 static 目录下的图片，减小体积
+
+功能：
+1. 遍历 static 下所有产品的图片（与 generate-filelist.py 的遍历规则一致）
+2. 按格式尝试体积更小的编码：
+   - 无损 WebP：method=6 无损重新编码（像素完全一致）
+   - 有损 WebP：按 LOSSY_QUALITIES 从低到高尝试重新编码，
+     取满足画质阈值（SSIM / PSNR，见 encoder_presets.py）的最小结果
+   - PNG：optimize=True 无损重新编码
+   - JPEG：optimize=True + quality='keep'（保留原量化表，只优化熵编码）
+   重新编码时保留 EXIF（含方向标记）和 ICC 颜色配置
+3. 只有结果更小（且满足画质阈值）时才替换原文件，替换为原子操作
+4. 多张图片分发到进程池并行处理，输出前后字节数报告
+5. --apply 后重新生成受影响产品的 files.txt / .versions.json，
+   哈希变化的文件获得新版本号，缓存随之失效
+6. 处理过的文件（大小 + 修改时间）记录在 tools/filelist-generator/{产品}/.optimize-manifest.json，
+   再次运行时跳过，避免有损图片反复重新编码累积画质损失（--force 忽略记录）
+
+默认为预览模式，不修改任何文件。
+
+用法：
+python tools/optimize-images/main.py                               # 预览所有产品
+python tools/optimize-images/main.py business-headshot-ai          # 只处理指定产品
+python tools/optimize-images/main.py business-headshot-ai --apply  # 实际替换
+python tools/optimize-images/main.py --lossless-only               # 只做无损优化
+python tools/optimize-images/main.py --min-ssim=0.99 --min-psnr=42 -j 8
+python tools/optimize-images/main.py business-headshot-ai --apply --force    # 忽略处理记录
+"""
+
+import importlib.util
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+TOOLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TOOLS_DIR / 'create-backdrops-blur-image'))
+
+from encoder_presets import psnr, ssim_estimate
+
+
+# 有损 WebP 尝试的质量（从低到高，取第一个满足画质阈值的结果）
+LOSSY_QUALITIES = [75, 80, 85, 90]
+
+# 画质阈值
+DEFAULT_MIN_SSIM = 0.985
+DEFAULT_MIN_PSNR = 40.0
+
+# 体积至少减少的比例，太小的收益不值得改变文件哈希（会使缓存失效）
+MIN_SAVING_RATIO = 0.02
+
+# 重新编码时保留的元数据（方向标记、颜色配置丢失会导致图片旋转或偏色）
+PRESERVED_METADATA = ('exif', 'icc_profile')
+
+# 处理记录文件名（位于 tools/filelist-generator/{产品}/）
+OPTIMIZE_MANIFEST_NAME = '.optimize-manifest.json'
+
+
+def load_filelist_generator():
+    """加载 tools/filelist-generator/generate-filelist.py（文件名含 - 无法直接 import）"""
+    module_path = TOOLS_DIR / 'filelist-generator' / 'generate-filelist.py'
+    spec = importlib.util.spec_from_file_location('generate_filelist', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_optimize_manifest(manifest_file: Path) -> dict:
+    """加载处理记录 {相对路径: {'size', 'mtime_ns'}}"""
+    if manifest_file.exists():
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_optimize_manifest(manifest_file: Path, manifest: dict):
+    """保存处理记录（先写临时文件再替换）"""
+    manifest_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = manifest_file.with_name(manifest_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def webp_is_lossless(data: bytes) -> bool:
+    """检查 WebP 是否为无损编码（包含 VP8L 数据块）"""
+    if data[:4] != b'RIFF' or data[8:12] != b'WEBP':
+        return False
+    
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = int.from_bytes(data[offset + 4:offset + 8], 'little')
+        if chunk_id == b'VP8L':
+            return True
+        if chunk_id == b'VP8 ':
+            return False
+        # 数据块按偶数字节对齐
+        offset += 8 + chunk_size + (chunk_size & 1)
+    
+    return False
+
+
+def encode(img, fmt: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **params)
+    return buffer.getvalue()
+
+
+def optimize_image(task: tuple) -> dict:
+    """
+    尝试重新压缩单张图片（子进程中执行）
+    
+    Args:
+        task: (图片路径, 选项 {'apply', 'lossless_only', 'min_ssim', 'min_psnr'})
+    
+    Returns:
+        {'path', 'before', 'after', 'mode', 'error'}
+    """
+    file_path, options = task
+    data = file_path.read_bytes()
+    result = {'path': file_path, 'before': len(data), 'after': len(data), 'mode': None, 'error': None}
+    
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            fmt = img.format
+            # GIF 动图等不处理
+            if getattr(img, 'is_animated', False):
+                return result
+            img.load()
+            metadata = {key: img.info[key] for key in PRESERVED_METADATA if img.info.get(key)}
+            
+            best = None
+            if fmt == 'WEBP':
+                if webp_is_lossless(data):
+                    best = (encode(img, 'WEBP', lossless=True, quality=100, method=6, exact=True, **metadata), 'webp 无损')
+                elif not options['lossless_only']:
+                    for quality in LOSSY_QUALITIES:
+                        candidate = encode(img, 'WEBP', quality=quality, method=6, **metadata)
+                        if len(candidate) >= len(data):
+                            break
+                        with Image.open(io.BytesIO(candidate)) as decoded:
+                            decoded.load()
+                            if (ssim_estimate(img, decoded) >= options['min_ssim']
+                                    and psnr(img, decoded) >= options['min_psnr']):
+                                best = (candidate, f"webp q={quality}")
+                                break
+            elif fmt == 'PNG':
+                best = (encode(img, 'PNG', optimize=True, **metadata), 'png optimize')
+            elif fmt == 'JPEG':
+                best = (encode(img, 'JPEG', optimize=True, quality='keep', **metadata), 'jpeg optimize')
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+    
+    if best is None:
+        return result
+    
+    candidate, mode = best
+    if len(candidate) > len(data) * (1 - MIN_SAVING_RATIO):
+        return result
+    
+    result['after'] = len(candidate)
+    result['mode'] = mode
+    
+    if options['apply']:
+        # 先写同目录临时文件，再原子替换
+        tmp_file = file_path.with_name(f".{file_path.name}.tmp")
+        try:
+            tmp_file.write_bytes(candidate)
+            os.replace(tmp_file, file_path)
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+    
+    return result
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'product': None,
+        'apply': False,
+        'lossless_only': False,
+        'min_ssim': DEFAULT_MIN_SSIM,
+        'min_psnr': DEFAULT_MIN_PSNR,
+        'force': False,
+        'workers': os.cpu_count() or 1,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-j', '--workers') and i + 1 < len(argv):
+            options['workers'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg == '--apply':
+            options['apply'] = True
+        elif arg == '--force':
+            options['force'] = True
+        elif arg == '--lossless-only':
+            options['lossless_only'] = True
+        elif arg.startswith('--min-ssim='):
+            options['min_ssim'] = float(arg.split('=', 1)[1])
+        elif arg.startswith('--min-psnr='):
+            options['min_psnr'] = float(arg.split('=', 1)[1])
+        elif options['product'] is None:
+            options['product'] = arg
+        i += 1
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    dry_run = not options['apply']
+    
+    print("=" * 60)
+    print(f"🗜️  图片重新压缩工具 {'[预览模式]' if dry_run else '[执行模式]'}")
+    print("=" * 60)
+    print()
+    
+    static_dir = TOOLS_DIR.parent / 'static'
+    if options['product']:
+        products = [options['product']]
+    else:
+        products = [
+            item.name for item in static_dir.iterdir()
+            if item.is_dir() and not item.name.startswith('.')
+        ]
+    
+    generator = load_filelist_generator()
+    manifests = {}
+    tasks = []
+    task_keys = []
+    skipped = 0
+    for product_name in products:
+        product_dir = static_dir / product_name
+        if not product_dir.exists():
+            print(f"⚠️  产品目录不存在: {product_name}")
+            continue
+        
+        manifest_file = TOOLS_DIR / 'filelist-generator' / product_name / OPTIMIZE_MANIFEST_NAME
+        manifest = {} if options['force'] else load_optimize_manifest(manifest_file)
+        manifests[product_name] = (manifest_file, manifest)
+        
+        for file_path, posix_path in generator.iter_image_files(product_dir):
+            stat = file_path.stat()
+            entry = manifest.get(posix_path)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                skipped += 1
+                continue
+            tasks.append((file_path, options))
+            task_keys.append((product_name, posix_path))
+    
+    print(f"📦 找到 {len(tasks) + skipped} 个图片（已处理过 {skipped} 个）")
+    print(f"🎯 画质阈值: SSIM >= {options['min_ssim']}, PSNR >= {options['min_psnr']} dB")
+    print()
+    
+    workers = min(options['workers'], len(tasks))
+    if workers <= 1:
+        results = [optimize_image(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(optimize_image, tasks, chunksize=chunksize))
+    
+    total_before = 0
+    total_after = 0
+    optimized = 0
+    errors = []
+    changed_products = set()
+    
+    for (product_name, posix_path), result in zip(task_keys, results):
+        if not dry_run and not result['error']:
+            stat = result['path'].stat()
+            manifests[product_name][1][posix_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        
+        total_before += result['before']
+        total_after += result['after']
+        if result['error']:
+            errors.append(result)
+        elif result['mode']:
+            optimized += 1
+            changed_products.add(product_name)
+            saved = result['before'] - result['after']
+            rel_path = result['path'].relative_to(static_dir)
+            print(
+                f"  {'[预览] ' if dry_run else '✅ '}{rel_path}: "
+                f"{result['before'] / 1024:.1f} KB -> {result['after'] / 1024:.1f} KB "
+                f"(-{saved / result['before'] * 100:.1f}%, {result['mode']})"
+            )
+    
+    print()
+    print("=" * 60)
+    print("📊 统计信息")
+    print("=" * 60)
+    print(f"🖼️  处理图片: {len(results)} 个")
+    print(f"🗜️  {'可优化' if dry_run else '已优化'}: {optimized} 个")
+    print(f"📦 优化前: {total_before / 1024 / 1024:.2f} MB")
+    print(f"📦 优化后: {total_after / 1024 / 1024:.2f} MB")
+    if total_before:
+        saved = total_before - total_after
+        print(f"💾 节省: {saved / 1024 / 1024:.2f} MB ({saved / total_before * 100:.1f}%)")
+    
+    if errors:
+        print(f"\n❌ 错误 ({len(errors)} 个):")
+        for result in errors:
+            print(f"   • {result['path']}: {result['error']}")
+    
+    print("=" * 60)
+    
+    if dry_run:
+        print("\n💡 提示: 使用 --apply 参数执行实际替换")
+        return
+    
+    for manifest_file, manifest in manifests.values():
+        save_optimize_manifest(manifest_file, manifest)
+    
+    # 文件内容变化后重新生成文件列表，更新哈希和版本号
+    for product_name in sorted(changed_products):
+        print()
+        print(f"🔄 重新生成文件列表: {product_name}")
+        generator.generate_filelist(product_name)
+
+
+if __name__ == '__main__':
+    main()
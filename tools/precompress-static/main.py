@@ -0,0 +1,197 @@
+"""
+为文本类静态资源预先生成 .gz / .br 压缩文件
+
+功能：
+1. 遍历 static/ 和 tools/filelist-generator/{产品}/ 下的 HTML、CSS、JS、JSON、TXT、SVG 等文本文件
+   （图片本身已是压缩格式，跳过）
+2. 在原文件旁写出 name.ext.gz（gzip -9），安装 brotli 时还写出 name.ext.br（quality 11）
+3. 压缩文件不比原文件新时才重新生成；压缩后没有变小的不保留；原文件已删除的压缩文件会被清理
+4. dev_server.py 和 nginx（gzip_static / brotli_static）按 Accept-Encoding 直接返回压缩文件，
+   不必每次请求都重新压缩
+
+用法：
+python tools/precompress-static/main.py                   # 处理所有产品
+python tools/precompress-static/main.py business-headshot-ai
+python tools/precompress-static/main.py --force           # 全部重新压缩
+"""
+
+import gzip
+import os
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from atomic_io import atomic_write_bytes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 需要预压缩的文本类扩展名
+COMPRESSIBLE_EXTENSIONS = {'.html', '.htm', '.css', '.js', '.mjs', '.json', '.txt', '.svg', '.xml'}
+
+# 小于该大小的文件不压缩（与 nginx gzip_min_length 一致）
+MIN_SIZE = 1024
+
+# 压缩文件后缀
+ENCODINGS = ['.gz', '.br']
+
+
+def compress(data: bytes, suffix: str) -> bytes:
+    if suffix == '.gz':
+        # mtime=0：内容不变时压缩结果也不变
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+def iter_compressible_files(root: Path):
+    """遍历可压缩的文本文件（跳过隐藏文件和目录）"""
+    for dir_path, dirs, filenames in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for filename in filenames:
+            if filename.startswith('.'):
+                continue
+            if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                yield Path(dir_path) / filename
+
+
+def prune_orphans(root: Path) -> int:
+    """删除原文件已不存在的压缩文件"""
+    removed = 0
+    for dir_path, dirs, filenames in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for filename in filenames:
+            stem, ext = os.path.splitext(filename)
+            if ext not in ENCODINGS or os.path.splitext(stem)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            if not os.path.exists(os.path.join(dir_path, stem)):
+                os.unlink(os.path.join(dir_path, filename))
+                removed += 1
+    return removed
+
+
+def precompress_file(source: Path, suffixes: list, force: bool = False) -> dict:
+    """
+    为单个文件生成压缩版本
+    
+    Returns:
+        {'created': 生成数, 'skipped': 已是最新数, 'saved': 节省字节数}
+    """
+    result = {'created': 0, 'skipped': 0, 'saved': 0}
+    stat = source.stat()
+    data = None
+    
+    for suffix in suffixes:
+        target = source.with_name(source.name + suffix)
+        
+        if stat.st_size < MIN_SIZE:
+            if target.exists():
+                target.unlink()
+            continue
+        
+        if not force and target.exists() and target.stat().st_mtime_ns >= stat.st_mtime_ns:
+            result['skipped'] += 1
+            continue
+        
+        if data is None:
+            data = source.read_bytes()
+        compressed = compress(data, suffix)
+        
+        # 没有变小的压缩结果没有意义
+        if len(compressed) >= len(data):
+            if target.exists():
+                target.unlink()
+            continue
+        
+        atomic_write_bytes(target, compressed)
+        # 与原文件保持相同的修改时间，便于判断是否过期
+        os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        result['created'] += 1
+        result['saved'] += len(data) - len(compressed)
+    
+    return result
+
+
+def process_root(root: Path, suffixes: list, force: bool = False) -> dict:
+    """处理一个目录"""
+    totals = {'files': 0, 'created': 0, 'skipped': 0, 'saved': 0, 'pruned': 0}
+    
+    for source in iter_compressible_files(root):
+        totals['files'] += 1
+        result = precompress_file(source, suffixes, force)
+        totals['created'] += result['created']
+        totals['skipped'] += result['skipped']
+        totals['saved'] += result['saved']
+    
+    totals['pruned'] = prune_orphans(root)
+    return totals
+
+
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'product': None,
+        'force': False,
+    }
+    
+    for arg in argv:
+        if arg == '--force':
+            options['force'] = True
+        elif options['product'] is None:
+            options['product'] = arg
+    
+    return options
+
+
+def main():
+    """主函数"""
+    options = parse_args(sys.argv[1:])
+    
+    print("=" * 60)
+    print("🗜️  预压缩文本类静态资源")
+    print("=" * 60)
+    print()
+    
+    suffixes = ['.gz']
+    if brotli is not None:
+        suffixes.append('.br')
+    else:
+        print("⚠️  未安装 brotli，只生成 .gz（pip install brotli）")
+        print()
+    
+    base_dir = TOOLS_DIR.parent
+    static_dir = base_dir / 'static'
+    
+    if options['product']:
+        products = [options['product']]
+    else:
+        products = [
+            item.name for item in static_dir.iterdir()
+            if item.is_dir() and not item.name.startswith('.')
+        ]
+    
+    for product_name in products:
+        roots = [static_dir / product_name, TOOLS_DIR / 'filelist-generator' / product_name]
+        
+        print(f"📁 {product_name}")
+        for root in roots:
+            if not root.exists():
+                continue
+            
+            totals = process_root(root, suffixes, options['force'])
+            print(f"   {root.relative_to(base_dir)}: {totals['files']} 个文件，"
+                  f"生成 {totals['created']} 个，已是最新 {totals['skipped']} 个，"
+                  f"节省 {totals['saved'] / 1024:.1f} KB")
+            if totals['pruned']:
+                print(f"   🗑️  清理 {totals['pruned']} 个过期压缩文件")
+        print()
+    
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+批量重命名引擎（static_filenames_to_lowercase.py 和 backdrops_rename_*.py 共用）
+
+流程：
+1. 规划：一次 os.scandir 遍历（跳过隐藏文件和目录），对每个文件 / 文件夹调用
+   rename_func(name, rel_path, is_dir) 得到新名称，计算每一项的最终路径
+2. 冲突检测：执行前检查所有最终路径（不区分大小写比较，macOS / Windows 上同样安全），
+   有冲突时不执行任何重命名
+3. 执行：两阶段重命名，每个阶段都按深度从深到浅执行
+   - 阶段 1：改为临时名称（name-tmp-rename），交换名称（如 02 <-> 03）、只改大小写时也不会冲突
+   - 阶段 2：改为最终名称
+   所有步骤在执行前写入日志 .rename-journal.json，任一步失败时按日志逆序回滚；
+   进程中断留下日志时，用 rollback 命令恢复
+4. 更新索引：把 tools/filelist-generator/{产品}/ 下 .versions.json、blob-index.json、aliases.json
+   中的路径改为新路径。重命名不改变文件大小和修改时间，重新生成文件列表时不会重新计算哈希，
+   版本号也保持不变
+
+用法：
+python tools/rename_engine.py rollback static/business-headshot-ai     # 回滚中断的重命名
+"""
+
+import json
+import os
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from atomic_io import atomic_write, file_lock, load_json_journaled, save_json_journaled
+from blobstore import INDEX_NAME, load_index, save_index
+
+
+STATIC_DIR = TOOLS_DIR.parent / 'static'
+FILELIST_DIR = TOOLS_DIR / 'filelist-generator'
+
+TEMP_SUFFIX = "-tmp-rename"
+JOURNAL_NAME = '.rename-journal.json'
+ALIASES_NAME = 'aliases.json'
+
+
+def scan_tree(base_path: Path) -> list:
+    """
+    遍历目录树（跳过隐藏文件和目录，不跟随符号链接）
+    
+    Returns:
+        [(相对路径, 是否为目录), ...]，父目录总在其内容之前
+    """
+    entries = []
+    
+    def scan(dir_path: str, rel_prefix: str):
+        with os.scandir(dir_path) as it:
+            children = sorted(
+                (entry for entry in it if not entry.name.startswith('.')),
+                key=lambda entry: entry.name
+            )
+        for entry in children:
+            rel = rel_prefix + entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            entries.append((rel, is_dir))
+            if is_dir:
+                scan(entry.path, rel + '/')
+    
+    scan(str(base_path), '')
+    return entries
+
+
+def _parent(rel: str) -> str:
+    return rel.rpartition('/')[0]
+
+
+def _join(parent: str, name: str) -> str:
+    return f"{parent}/{name}" if parent else name
+
+
+def plan_renames(base_path: Path, rename_func) -> dict:
+    """
+    规划重命名（不修改任何文件）
+    
+    Args:
+        base_path: 根目录（自身不会被重命名）
+        rename_func: rename_func(name, rel_path, is_dir) -> 新名称，返回原名称或 None 表示不改
+    
+    Returns:
+        {
+            'base': 根目录,
+            'renames': [{'path', 'name', 'dir'}, ...]（按深度从深到浅）,
+            'moves': {原文件路径: 新文件路径}（含随父目录移动的文件）,
+            'conflicts': [(最终路径, [原路径, ...]), ...],
+            'ops': [(源路径, 目标路径), ...]（两阶段的全部步骤，均相对根目录）,
+        }
+    """
+    base_path = Path(base_path)
+    entries = scan_tree(base_path)
+    existing = {rel for rel, _ in entries}
+    
+    final = {'': ''}
+    renames = []
+    conflicts = []
+    for rel, is_dir in entries:
+        name = rel.rpartition('/')[2]
+        new_name = rename_func(name, rel, is_dir) or name
+        if '/' in new_name or new_name in ('.', '..'):
+            raise ValueError(f"无效的新名称: {rel} -> {new_name}")
+        
+        final[rel] = _join(final[_parent(rel)], new_name)
+        if new_name != name:
+            renames.append({'path': rel, 'name': new_name, 'dir': is_dir})
+            temp_rel = _join(_parent(rel), name + TEMP_SUFFIX)
+            if temp_rel in existing:
+                conflicts.append((temp_rel, [rel]))
+    
+    # 多个项目的最终路径相同（不区分大小写）时冲突；只报告包含被重命名项目的组
+    renamed_paths = {item['path'] for item in renames}
+    targets = defaultdict(list)
+    for rel, _ in entries:
+        targets[final[rel].casefold()].append(rel)
+    for sources in targets.values():
+        if len(sources) > 1 and any(rel in renamed_paths for rel in sources):
+            conflicts.append((final[sources[0]], sources))
+    
+    renames.sort(key=lambda item: (-item['path'].count('/'), item['path']))
+    
+    def temp_path(rel: str) -> str:
+        """阶段 1 完成后的路径（被重命名的各级都是临时名称）"""
+        parts = []
+        prefix = ''
+        for part in rel.split('/') if rel else []:
+            prefix = _join(prefix, part)
+            parts.append(part + TEMP_SUFFIX if prefix in renamed_paths else part)
+        return '/'.join(parts)
+    
+    # 从深到浅执行：处理某一项时，它的上级目录都还没有改名
+    ops = [(item['path'], item['path'] + TEMP_SUFFIX) for item in renames]
+    ops += [
+        (temp_path(item['path']), _join(temp_path(_parent(item['path'])), item['name']))
+        for item in renames
+    ]
+    
+    moves = {
+        rel: final[rel]
+        for rel, is_dir in entries
+        if not is_dir and final[rel] != rel
+    }
+    
+    return {
+        'base': base_path,
+        'renames': renames,
+        'moves': moves,
+        'conflicts': conflicts,
+        'ops': ops,
+    }
+
+
+def _undo(base_path: Path, ops: list) -> int:
+    """逆序撤销已执行的步骤（目标存在且源不存在即视为已执行）"""
+    undone = 0
+    for src, dst in reversed(ops):
+        src_path = base_path / src
+        dst_path = base_path / dst
+        if os.path.lexists(dst_path) and not os.path.lexists(src_path):
+            os.rename(dst_path, src_path)
+            undone += 1
+    return undone
+
+
+def execute_plan(plan: dict) -> dict:
+    """
+    执行重命名计划，失败时自动回滚
+    
+    Returns:
+        {'files', 'dirs', 'errors', 'rolled_back', 'indexes'}
+    """
+    base_path = plan['base']
+    stats = {'files': 0, 'dirs': 0, 'errors': [], 'rolled_back': False, 'indexes': 0}
+    
+    if plan['conflicts']:
+        for target, sources in plan['conflicts']:
+            stats['errors'].append(f"冲突: {', '.join(sources)} -> {target}")
+        return stats
+    
+    if not plan['ops']:
+        return stats
+    
+    journal_file = base_path / JOURNAL_NAME
+    if journal_file.exists():
+        stats['errors'].append(
+            f"存在未完成的重命名日志 {journal_file}，请先运行: python tools/rename_engine.py rollback {base_path}"
+        )
+        return stats
+    
+    with atomic_write(journal_file) as f:
+        json.dump({'ops': plan['ops']}, f, ensure_ascii=False, indent=2)
+    
+    done = 0
+    try:
+        for src, dst in plan['ops']:
+            if os.path.lexists(base_path / dst):
+                raise FileExistsError(f"目标已存在: {dst}")
+            os.rename(base_path / src, base_path / dst)
+            done += 1
+    except OSError as e:
+        stats['errors'].append(f"{plan['ops'][done][0]} -> {plan['ops'][done][1]}: {e}")
+        _undo(base_path, plan['ops'][:done])
+        stats['rolled_back'] = True
+        journal_file.unlink()
+        return stats
+    
+    # 先删除日志再更新索引：中断时索引只是过期（重新生成时按新文件处理），不会与文件不一致
+    journal_file.unlink()
+    
+    for item in plan['renames']:
+        stats['dirs' if item['dir'] else 'files'] += 1
+    stats['indexes'] = update_path_indexes(base_path, plan['moves'])
+    
+    return stats
+
+
+def rollback(base_path: Path) -> int:
+    """
+    按日志回滚中断的重命名
+    
+    Returns:
+        撤销的步骤数；没有日志时返回 0
+    """
+    base_path = Path(base_path)
+    journal_file = base_path / JOURNAL_NAME
+    if not journal_file.exists():
+        return 0
+    with open(journal_file, 'r', encoding='utf-8') as f:
+        ops = [tuple(op) for op in json.load(f)['ops']]
+    undone = _undo(base_path, ops)
+    journal_file.unlink()
+    return undone
+
+
+def _remap(mapping: dict, moves: dict, values: bool = False) -> dict:
+    """把字典的键（values=True 时包括值）中的旧路径替换为新路径"""
+    return {
+        moves.get(key, key): moves.get(value, value) if values else value
+        for key, value in mapping.items()
+    }
+
+
+def update_path_indexes(base_path: Path, moves: dict) -> int:
+    """
+    把重命名同步到 tools/filelist-generator/{产品}/ 下以路径为键的文件
+    
+    base_path 不在 static/ 下时跳过（无法确定产品）
+    
+    Returns:
+        更新的文件数
+    """
+    try:
+        rel_base = Path(base_path).resolve().relative_to(STATIC_DIR.resolve())
+    except ValueError:
+        return 0
+    
+    # 按产品分组，路径改为相对产品目录（产品目录自身改名时不处理）
+    grouped = defaultdict(dict)
+    for old, new in moves.items():
+        old_parts = rel_base.parts + tuple(old.split('/'))
+        new_parts = rel_base.parts + tuple(new.split('/'))
+        if old_parts[0] == new_parts[0]:
+            grouped[old_parts[0]]['/'.join(old_parts[1:])] = '/'.join(new_parts[1:])
+    
+    updated = 0
+    for product_name, product_moves in grouped.items():
+        output_dir = FILELIST_DIR / product_name
+        if not output_dir.is_dir():
+            continue
+        
+        # 与生成器互斥
+        with file_lock(output_dir / '.lock'):
+            versions_file = output_dir / '.versions.json'
+            if versions_file.exists():
+                versions = load_json_journaled(versions_file, {})
+                new_versions = _remap(versions, product_moves)
+                if new_versions != versions:
+                    save_json_journaled(versions_file, new_versions)
+                    updated += 1
+            
+            if (output_dir / INDEX_NAME).exists():
+                index = load_index(output_dir)
+                new_index = _remap(index, product_moves)
+                if new_index != index:
+                    save_index(output_dir, new_index)
+                    updated += 1
+            
+            aliases_file = output_dir / ALIASES_NAME
+            if aliases_file.exists():
+                with open(aliases_file, 'r', encoding='utf-8') as f:
+                    aliases = json.load(f)
+                new_aliases = _remap(aliases, product_moves, values=True)
+                if new_aliases != aliases:
+                    with atomic_write(aliases_file) as f:
+                        json.dump(dict(sorted(new_aliases.items())), f, ensure_ascii=False, indent=2)
+                    updated += 1
+    
+    return updated
+
+
+def main():
+    """主函数"""
+    args = sys.argv[1:]
+    if len(args) != 2 or args[0] != 'rollback':
+        print(__doc__)
+        sys.exit(1)
+    
+    base_path = Path(args[1])
+    print("=" * 60)
+    print("↩️  回滚中断的重命名")
+    print("=" * 60)
+    if not (base_path / JOURNAL_NAME).exists():
+        print(f"✅ 没有未完成的重命名: {base_path}")
+    else:
+        undone = rollback(base_path)
+        print(f"✅ 已撤销 {undone} 个步骤，恢复为重命名前的状态")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,15 +3,18 @@
 将 static 目录下的所有文件和文件夹重命名为小写
 
 功能：
-1. 递归遍历指定目录
+1. 递归遍历指定目录（rename_engine.py：一次 os.scandir 遍历完成规划）
 2. 将所有文件名和文件夹名转换为小写（包括扩展名）
-3. 使用两阶段重命名避免大小写冲突：
+3. 执行前检测冲突（如 Dark-Brown.webp 和 dark-brown.webp 同时存在），有冲突时不做任何修改
+4. 使用两阶段重命名避免大小写冲突，按深度从深到浅执行：
    - 第一阶段：添加临时后缀 "-tmp-rename"
    - 第二阶段：转为小写并移除后缀
-4. 提供预览模式（不实际重命名）
+   每一步先写入日志，失败时自动回滚；中断后可用 python tools/rename_engine.py rollback {目录} 恢复
+5. 同步更新 .versions.json 等索引中的路径，重新生成文件列表时不会重新计算哈希
+6. 提供预览模式（不实际重命名）
 
 示例转换：
-- Dark-Brown.WEBP -> Dark-Brown-tmp-rename.WEBP -> dark-brown.webp
+- Dark-Brown.WEBP -> Dark-Brown.WEBP-tmp-rename -> dark-brown.webp
 - Female-White/ -> Female-White-tmp-rename/ -> female-white/
 
 用法：
@@ -24,16 +27,17 @@ python tools/static_filenames_to_lowercase.py business-headshot-ai --apply
 import sys
 from pathlib import Path
 
+from rename_engine import execute_plan, plan_renames
 
-TEMP_SUFFIX = "-tmp-rename"
+
+def to_lowercase(name: str, rel_path: str, is_dir: bool) -> str:
+    """重命名规则：文件名和文件夹名全部转小写"""
+    return name.lower()
 
 
 def rename_to_lowercase(base_path: Path, dry_run: bool = True) -> dict:
     """
-    两阶段重命名文件和文件夹为小写
-    
-    阶段1: 添加临时后缀
-    阶段2: 转为小写并移除后缀
+    重命名文件和文件夹为小写
     
     Args:
         base_path: 基础路径
@@ -50,125 +54,47 @@ def rename_to_lowercase(base_path: Path, dry_run: bool = True) -> dict:
         'errors': []
     }
     
-    # 收集所有需要重命名的项目
-    items_to_rename = []
-    
-    for item in base_path.rglob('*'):
-        # 跳过隐藏文件和文件夹
-        if item.name.startswith('.'):
-            continue
-        
-        # 跳过已经是小写的
-        lower_name = item.name.lower()
-        if lower_name == item.name:
-            continue
-        
-        items_to_rename.append(item)
+    plan = plan_renames(base_path, to_lowercase)
+    renames = plan['renames']
     
-    if not items_to_rename:
+    if not renames:
         print("  ✅ 所有文件名已经是小写，无需处理")
         return stats
     
-    # 按路径深度排序（深的先处理）
-    items_to_rename.sort(key=lambda x: len(x.parts), reverse=True)
-    
-    print(f"  📝 找到 {len(items_to_rename)} 个需要重命名的项目\n")
+    print(f"  📝 找到 {len(renames)} 个需要重命名的项目\n")
     
-    # ========== 阶段 1: 添加临时后缀 ==========
-    print("  🔄 阶段 1: 添加临时后缀...\n")
+    for item in renames:
+        item_type = "文件夹" if item['dir'] else "文件"
+        print(f"    {'[预览]' if dry_run else '•'} {item_type}: {item['path']} -> {item['name']}")
+    print()
     
-    phase1_mapping = {}  # 记录原始路径 -> 临时路径的映射
-    
-    for item in items_to_rename:
-        # 构建临时名称
-        if item.is_file():
-            # 文件：在扩展名前添加后缀
-            stem = item.stem
-            suffix = item.suffix
-            temp_name = f"{stem}{TEMP_SUFFIX}{suffix}"
-        else:
-            # 文件夹：直接添加后缀
-            temp_name = f"{item.name}{TEMP_SUFFIX}"
-        
-        temp_path = item.parent / temp_name
-        item_type = "文件" if item.is_file() else "文件夹"
-        
-        if dry_run:
-            print(f"    [预览] {item_type}: {item.name} -> {temp_name}")
-            phase1_mapping[str(item)] = (temp_path, item.name.lower(), item.is_file())
-        else:
-            try:
-                item.rename(temp_path)
-                print(f"    ✅ {item_type}: {item.name} -> {temp_name}")
-                phase1_mapping[str(item)] = (temp_path, item.name.lower(), item.is_file())
-            except Exception as e:
-                error_msg = f"阶段1错误: {item.name} -> {temp_name}: {e}"
-                stats['errors'].append(error_msg)
-                print(f"    ❌ {error_msg}")
-                
-                if item.is_file():
-                    stats['files_skipped'] += 1
-                else:
-                    stats['dirs_skipped'] += 1
+    if plan['conflicts']:
+        for target, sources in plan['conflicts']:
+            stats['errors'].append(f"冲突: {', '.join(sources)} -> {target}")
+        print("  ❌ 存在冲突，不会执行任何重命名\n")
+        if not dry_run:
+            return stats
     
-    print(f"\n  ✅ 阶段 1 完成: {len(phase1_mapping)} 个项目\n")
-    
-    # ========== 阶段 2: 转为小写并移除后缀 ==========
-    print("  🔄 阶段 2: 转为小写并移除后缀...\n")
-    
-    # 重新扫描，找到所有带临时后缀的文件
-    # 这样可以处理父目录改名后的路径变化
-    temp_items = []
-    for item in base_path.rglob(f'*{TEMP_SUFFIX}*'):
-        if item.name.startswith('.'):
-            continue
-        temp_items.append(item)
-    
-    # 按路径深度排序（深的先处理）
-    temp_items.sort(key=lambda x: len(x.parts), reverse=True)
+    if dry_run:
+        for item in renames:
+            stats['dirs_renamed' if item['dir'] else 'files_renamed'] += 1
+        return stats
     
-    for temp_item in temp_items:
-        # 计算最终的小写名称（移除临时后缀）
-        if temp_item.is_file():
-            # 文件：移除扩展名前的后缀
-            stem = temp_item.stem.replace(TEMP_SUFFIX, '')
-            suffix = temp_item.suffix
-            final_name = f"{stem}{suffix}".lower()
-        else:
-            # 文件夹：移除后缀
-            final_name = temp_item.name.replace(TEMP_SUFFIX, '').lower()
-        
-        final_path = temp_item.parent / final_name
-        item_type = "文件" if temp_item.is_file() else "文件夹"
-        
-        if dry_run:
-            print(f"    [预览] {item_type}: {temp_item.name} -> {final_name}")
-            
-            if temp_item.is_file():
-                stats['files_renamed'] += 1
-            else:
-                stats['dirs_renamed'] += 1
-        else:
-            try:
-                temp_item.rename(final_path)
-                print(f"    ✅ {item_type}: {temp_item.name} -> {final_name}")
-                
-                if temp_item.is_file():
-                    stats['files_renamed'] += 1
-                else:
-                    stats['dirs_renamed'] += 1
-            except Exception as e:
-                error_msg = f"阶段2错误: {temp_item.name} -> {final_name}: {e}"
-                stats['errors'].append(error_msg)
-                print(f"    ❌ {error_msg}")
-                print(f"    ⚠️  请手动处理: {temp_item}")
-                
-                if temp_item.is_file():
-                    stats['files_skipped'] += 1
-                else:
-                    stats['dirs_skipped'] += 1
+    result = execute_plan(plan)
+    stats['errors'].extend(result['errors'])
+    if result['rolled_back']:
+        print("  ↩️  重命名失败，已回滚\n")
+        stats['files_skipped'] = sum(1 for item in renames if not item['dir'])
+        stats['dirs_skipped'] = sum(1 for item in renames if item['dir'])
+        return stats
     
-    print(f"\n  ✅ 阶段 2 完成\n")
+    stats['files_renamed'] = result['files']
+    stats['dirs_renamed'] = result['dirs']
+    print(f"  ✅ 重命名完成（{len(plan['ops'])} 步）")
+    if result['indexes']:
+        print(f"  📇 已更新 {result['indexes']} 个索引文件（.versions.json 等）中的路径")
+        print("  💡 运行 generate-filelist.py 刷新文件列表（不会重新计算哈希，版本号不变）")
+    print()
     
     return stats
 
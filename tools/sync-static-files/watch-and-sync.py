@@ -4,9 +4,11 @@
 监视 static/ 目录的变化，自动生成文件列表并同步到 server 端
 """
 
+import os
 import sys
 import time
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
@@ -21,6 +23,9 @@ SERVER_STORE_DIR = Path('/Users/luyunfei/Desktop/________/____AI 摄影/____aips
 # 支持的图片格式
 IMAGE_EXTENSIONS = {'.webp', '.jpg', '.jpeg', '.png', '.gif'}
 
+# 启动检查时并行生成 files.txt 的最大数量
+MAX_PARALLEL_GENERATE = os.cpu_count() or 1
+
 # 防抖动：避免短时间内重复触发
 DEBOUNCE_SECONDS = 2
 last_trigger_time = {}
@@ -176,6 +181,39 @@ def check_paths():
     return True
 
 
+def generate_and_sync(product_slug: str) -> tuple:
+    """
+    生成单个产品的 files.txt 并同步到 server 端（可在线程中并行执行）
+    
+    Returns:
+        (是否成功, 错误信息, 耗时秒数)
+    """
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [sys.executable, str(FILELIST_GENERATOR), product_slug],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        
+        if result.returncode != 0:
+            return False, f"生成失败: {result.stderr}", time.perf_counter() - start
+        
+        # 同步到 server 端
+        source_file = FILELIST_OUTPUT_DIR / product_slug / 'files.txt'
+        target_dir = SERVER_STORE_DIR / product_slug
+        target_file = target_dir / 'files.txt'
+        
+        if source_file.exists():
+            target_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_file, target_file)
+    except Exception as e:
+        return False, f"错误: {e}", time.perf_counter() - start
+    
+    return True, None, time.perf_counter() - start
+
+
 def check_and_generate_missing_filelists():
     """检查并生成缺失的 files.txt"""
     print("🔍 检查 files.txt 是否存在...\n")
@@ -190,41 +228,31 @@ def check_and_generate_missing_filelists():
         print("⚠️  未找到任何产品目录\n")
         return
     
-    generated_count = 0
-    
+    missing = []
     for product_slug in products:
         files_txt = FILELIST_OUTPUT_DIR / product_slug / 'files.txt'
-        
-        if not files_txt.exists():
-            print(f"📝 {product_slug}: files.txt 不存在，正在生成...")
-            
-            try:
-                result = subprocess.run(
-                    [sys.executable, str(FILELIST_GENERATOR), product_slug],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                if result.returncode == 0:
-                    print(f"   ✅ 生成成功")
-                    generated_count += 1
-                    
-                    # 同步到 server 端
-                    source_file = FILELIST_OUTPUT_DIR / product_slug / 'files.txt'
-                    target_dir = SERVER_STORE_DIR / product_slug
-                    target_file = target_dir / 'files.txt'
-                    
-                    if source_file.exists():
-                        target_dir.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(source_file, target_file)
-                        print(f"   ✅ 已同步到 server 端")
-                else:
-                    print(f"   ❌ 生成失败: {result.stderr}")
-            except Exception as e:
-                print(f"   ❌ 错误: {e}")
-        else:
+        if files_txt.exists():
             print(f"✅ {product_slug}: files.txt 已存在")
+        else:
+            missing.append(product_slug)
+    
+    if missing:
+        print(f"\n🔄 并行生成 {len(missing)} 个缺失的 files.txt...")
+    
+    # 缺失的产品并行生成（每个产品一个生成器子进程），完成后按产品顺序输出
+    workers = max(1, min(MAX_PARALLEL_GENERATE, len(missing)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(generate_and_sync, missing))
+    
+    generated_count = 0
+    for product_slug, (ok, message, seconds) in zip(missing, outcomes):
+        print(f"📝 {product_slug}: files.txt 不存在，已重新生成")
+        if ok:
+            generated_count += 1
+            print(f"   ✅ 生成成功（{seconds:.2f}s）")
+            print(f"   ✅ 已同步到 server 端")
+        else:
+            print(f"   ❌ {message}")
     
     if generated_count > 0:
         print(f"\n🎉 已生成 {generated_count} 个缺失的 files.txt\n")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+测试 Flask（api_example.py）和 ASGI（api_asgi.py）两个版本的 API
+
+两个版本共用 api_handlers.py，同样的请求（包括重复的查询参数）应当得到同样的响应；
+未安装 Flask 时跳过 Flask 部分
+"""
+
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+import api_asgi
+from filelist_parser import FileListParser
+
+FILES = [
+    'images/backdrops/a.webp?v=1',
+    'images/home/city/1.webp?v=1',
+    'images/home/city/2.webp?v=1',
+    'images/home/city/2@320w.webp?v=2',
+    'images/home/city/3.webp?v=1',
+    'images/poses/p.webp?v=1',
+]
+
+# (方法, 路径, 查询字符串, 请求体)
+REQUESTS = [
+    ('GET', '/api/files', 'page_size=2&page_size=50&page=2&page=1', b''),
+    ('GET', '/api/files', 'cursor=&page_size=3', b''),
+    ('GET', '/api/categories', '', b''),
+    ('GET', '/api/categories/home', 'page_size=1', b''),
+    ('GET', '/api/search', 'q=city&q=poses', b''),
+    ('GET', '/api/search', 'q=', b''),
+    ('GET', '/api/directory', 'path=images/home', b''),
+    ('GET', '/api/variants', 'path=images/home/city/2.webp&width=300', b''),
+    ('GET', '/api/variants', 'path=images/none.webp', b''),
+    ('POST', '/api/batch', '', json.dumps({'paths': ['images/poses/p.webp'], 'prefixes': ['images/home/']}).encode()),
+    ('POST', '/api/batch', '', b'[1, 2]'),
+    ('GET', '/api/stats', '', b''),
+]
+
+
+def make_parser(tmp: str) -> FileListParser:
+    filelist = Path(tmp) / 'files.txt'
+    filelist.write_text(''.join(f"{line}\n" for line in FILES), encoding='utf-8')
+    return FileListParser(str(filelist))
+
+
+def call_asgi(method: str, path: str, query: str, body: bytes) -> tuple:
+    """用模拟的 scope 调用 ASGI 应用，返回 (状态码, 解析后的 JSON)"""
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [(b'host', b'localhost'), (b'accept-encoding', b'gzip')],
+        'scheme': 'http',
+    }
+    messages = []
+    
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    
+    async def send(message):
+        messages.append(message)
+    
+    asyncio.run(api_asgi.app(scope, receive, send))
+    headers = dict(messages[0]['headers'])
+    payload = b''.join(message.get('body', b'') for message in messages[1:])
+    if headers.get(b'content-encoding') == b'gzip':
+        payload = gzip.decompress(payload)
+    return messages[0]['status'], json.loads(payload)
+
+
+def call_flask(client, method: str, path: str, query: str, body: bytes) -> tuple:
+    """用 Flask 测试客户端调用，返回 (状态码, 解析后的 JSON)"""
+    response = client.open(
+        f"{path}?{query}" if query else path,
+        method=method,
+        data=body,
+        headers={'Host': 'localhost', 'Accept-Encoding': 'gzip'},
+    )
+    payload = response.get_data()
+    if response.headers.get('Content-Encoding') == 'gzip':
+        payload = gzip.decompress(payload)
+    return response.status_code, json.loads(payload)
+
+
+def test_asgi_repeated_query_params_use_first_value():
+    """ASGI 版本重复的查询参数取第一个值（与 Flask 的 request.args 一致）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        api_asgi.parser = make_parser(tmp)
+        api_asgi.response_cache.clear()
+        
+        status, data = call_asgi('GET', '/api/files', 'page_size=2&page_size=50&page=2&page=1', b'')
+        assert status == 200
+        assert [item['path'] for item in data['items']] == FILES[2:4]
+        
+        status, data = call_asgi('GET', '/api/search', 'q=poses&q=city', b'')
+        assert status == 200 and data['keyword'] == 'poses' and data['total'] == 1
+
+
+def test_flask_smoke():
+    """Flask 版本能导入，健康检查和几个端点可用"""
+    pytest.importorskip('flask')
+    import api_example
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        api_example.parser = make_parser(tmp)
+        api_example.response_cache.clear()
+        client = api_example.app.test_client()
+        
+        response = client.get('/api/health')
+        assert response.status_code == 200
+        assert response.get_json()['total_files'] == len(FILES)
+        
+        status, data = call_flask(client, 'GET', '/api/files', 'page=1&page_size=2', b'')
+        assert status == 200 and data['items'][0]['url'] == f"http://localhost/business-headshot-ai/{FILES[0]}"
+        
+        status, data = call_flask(client, 'GET', '/api/categories', '', b'')
+        assert status == 200 and data['categories'] == [{'key': 'home', 'name': '首页图片', 'count': 4}]
+        
+        status, data = call_flask(client, 'GET', '/api/search', '', b'')
+        assert status == 400 and data == {'error': 'Missing keyword'}
+
+
+def test_flask_and_asgi_return_the_same_responses():
+    """同样的请求在两个版本中得到相同的状态码和 JSON"""
+    pytest.importorskip('flask')
+    import api_example
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        api_example.parser = api_asgi.parser = make_parser(tmp)
+        api_example.response_cache.clear()
+        api_asgi.response_cache.clear()
+        client = api_example.app.test_client()
+        
+        for method, path, query, body in REQUESTS:
+            expected = call_asgi(method, path, query, body)
+            assert call_flask(client, method, path, query, body) == expected, (method, path, query)
+            # 第二次请求命中响应缓存，结果不变
+            assert call_asgi(method, path, query, body) == expected, (method, path, query)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
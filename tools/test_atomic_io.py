@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+测试带日志的 JSON 存储（filelist-generator/atomic_io.py）
+
+验证中断后从日志前滚、文件损坏时从 .bak 恢复，以及只读加载不修改磁盘
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from atomic_io import load_json_journaled, read_json_journaled, save_json_journaled
+
+OLD = {'a.webp': {'hash': 'old', 'version': '20240101_000000'}}
+NEW = {'a.webp': {'hash': 'new', 'version': '20240202_000000'}}
+
+
+def snapshot(dir_path: Path) -> dict:
+    """目录下所有文件的内容"""
+    return {path.name: path.read_bytes() for path in sorted(dir_path.iterdir())}
+
+
+def interrupted_save(path: Path):
+    """模拟保存 NEW 时在提交前中断：日志已完整写入，目标文件还是旧版本"""
+    save_json_journaled(path, OLD)
+    path.with_name(path.name + '.journal').write_text(json.dumps(NEW), encoding='utf-8')
+
+
+def corrupted_file(path: Path):
+    """模拟保存两次后目标文件损坏：.bak 是上一个版本"""
+    save_json_journaled(path, OLD)
+    save_json_journaled(path, NEW)
+    path.write_text('{"a.webp": ', encoding='utf-8')
+
+
+def test_save_keeps_previous_version_as_backup():
+    """保存后目标文件是新内容，.bak 是上一个版本，不留日志"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        save_json_journaled(path, OLD)
+        save_json_journaled(path, NEW)
+        assert json.loads(path.read_text(encoding='utf-8')) == NEW
+        assert json.loads((Path(tmp) / '.versions.json.bak').read_text(encoding='utf-8')) == OLD
+        assert not (Path(tmp) / '.versions.json.journal').exists()
+
+
+def test_load_rolls_journal_forward():
+    """持锁加载时完整的日志被提交为目标文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        interrupted_save(path)
+        assert load_json_journaled(path, {}) == NEW
+        assert json.loads(path.read_text(encoding='utf-8')) == NEW
+        assert not (Path(tmp) / '.versions.json.journal').exists()
+
+
+def test_load_discards_unreadable_journal():
+    """日志读不出来时视为无关残留，删除后加载目标文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        save_json_journaled(path, OLD)
+        journal = Path(tmp) / '.versions.json.journal'
+        journal.write_text('{"a.webp"', encoding='utf-8')
+        assert load_json_journaled(path, {}) == OLD
+        assert not journal.exists()
+
+
+def test_load_restores_corrupted_file_from_backup():
+    """持锁加载时损坏的文件被 .bak 覆盖，损坏的内容另存为 .corrupt"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        corrupted_file(path)
+        assert load_json_journaled(path, {}) == OLD
+        assert json.loads(path.read_text(encoding='utf-8')) == OLD
+        assert (Path(tmp) / '.versions.json.corrupt').read_text(encoding='utf-8') == '{"a.webp": '
+
+
+def test_load_returns_default_without_file_or_backup():
+    """文件和备份都不可用时返回 default"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        assert load_json_journaled(path, {}) == {}
+        path.write_text('not json', encoding='utf-8')
+        assert load_json_journaled(path, {}) == {}
+
+
+def test_read_only_load_sees_journal_without_writing():
+    """只读加载返回日志内容，磁盘上的文件保持不变"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        interrupted_save(path)
+        before = snapshot(Path(tmp))
+        assert read_json_journaled(path, {}) == NEW
+        assert snapshot(Path(tmp)) == before
+
+
+def test_read_only_load_uses_backup_without_writing():
+    """只读加载在文件损坏时返回 .bak 的内容，不覆盖、不另存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / '.versions.json'
+        corrupted_file(path)
+        before = snapshot(Path(tmp))
+        assert read_json_journaled(path, {}) == OLD
+        assert snapshot(Path(tmp)) == before
+        assert read_json_journaled(Path(tmp) / 'missing.json', {}) == {}
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+测试背景虚化图片的任务收集（create-backdrops-blur-image 的 collect_images / process_images）
+
+验证未整理的原图和已有的 <name>/blur-0.webp 对应同一个子文件夹时只生成一个任务，
+并行处理时不会同时写入相同的虚化图片
+"""
+
+import importlib.util
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+TOOLS_DIR = Path(__file__).parent
+BLUR_DIR = TOOLS_DIR / 'create-backdrops-blur-image'
+sys.path.insert(0, str(BLUR_DIR))
+
+
+def load_blur_tool():
+    """加载 tools/create-backdrops-blur-image/main.py"""
+    spec = importlib.util.spec_from_file_location('backdrop_blur', BLUR_DIR / 'main.py')
+    module = importlib.util.module_from_spec(spec)
+    # 进程池按模块名序列化 process_image，需要先注册到 sys.modules
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+backdrop_blur = load_blur_tool()
+
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+
+def make_layout(base: Path):
+    """foo.png（红色，未整理）和 foo/blur-0.webp（蓝色，已整理）对应同一个子文件夹"""
+    Image.new('RGB', (32, 32), RED).save(base / 'foo.png')
+    (base / 'foo').mkdir()
+    Image.new('RGB', (32, 32), BLUE).save(base / 'foo' / 'blur-0.webp', lossless=True)
+    (base / 'bar').mkdir()
+    Image.new('RGB', (32, 32), BLUE).save(base / 'bar' / 'blur-0.webp', lossless=True)
+
+
+def test_collect_prefers_loose_image_per_folder():
+    """同一个子文件夹只收集一次，优先未整理的原图"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        make_layout(base)
+        images = backdrop_blur.collect_images(base)
+        assert sorted(item.relative_to(base).as_posix() for item in images) == [
+            'bar/blur-0.webp',
+            'foo.png',
+        ]
+
+
+def test_parallel_run_builds_each_folder_once():
+    """多进程处理后 foo/blur-0.webp 来自原图，构建记录每个子文件夹一条"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        make_layout(base)
+        backdrop_blur.process_images(str(base), workers=2)
+        
+        assert not (base / 'foo.png').exists()
+        with Image.open(base / 'foo' / 'blur-0.webp') as img:
+            assert img.convert('RGB').getpixel((0, 0)) == RED
+        for level in backdrop_blur.BLUR_MAPPING:
+            assert (base / 'foo' / f'blur-{level}.webp').exists()
+        
+        manifest = json.loads((base / backdrop_blur.BUILD_MANIFEST_NAME).read_text(encoding='utf-8'))
+        assert sorted(manifest) == ['bar', 'foo']
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
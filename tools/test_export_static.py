@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+测试静态站点导出（export-static/main.py）
+
+只有图片和 SVG 导出为带哈希的文件名，HTML 中的引用随之改写；
+CSS、JS 和按固定 URL 加载的数据文件按原名导出，内容不变
+"""
+
+import hashlib
+import importlib.util
+import json
+import tempfile
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+
+
+def load_module(name: str, module_path: Path):
+    spec = importlib.util.spec_from_file_location(name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+export_static = load_module('export_static', TOOLS_DIR / 'export-static' / 'main.py')
+html_updater = load_module('update_html', TOOLS_DIR / 'update-html-img-src-with-version' / 'main.py')
+
+
+class FakeGenerator:
+    """不更新真实的 .versions.json，哈希全部在导出时计算"""
+    
+    def generate_filelist(self, product_name):
+        pass
+    
+    def read_versions(self, output_dir):
+        return {}
+    
+    def get_file_hash(self, file_path):
+        return hashlib.md5(file_path.read_bytes()).hexdigest()
+
+
+FILES = {
+    'index.html': (
+        '<link rel="stylesheet" href="./css/site.css?v=1">'
+        '<script src="./js/app.js"></script>'
+        '<img src="./images/city.webp?v=2"><img src="./icons/arrow.svg">'
+    ),
+    'css/site.css': '.hero { background: url(../images/city.webp); }',
+    'js/app.js': "fetch('first-popup/introSteps.txt');",
+    'first-popup/introSteps.txt': '3',
+    'images/city.webp': 'webp-bytes',
+    'icons/arrow.svg': '<svg></svg>',
+    'robots.txt': 'User-agent: *',
+}
+
+
+def export(tmp: str) -> Path:
+    product_dir = Path(tmp) / 'static' / 'demo'
+    for relative, content in FILES.items():
+        (product_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+        (product_dir / relative).write_text(content, encoding='utf-8')
+    export_static.export_product('demo', Path(tmp), Path(tmp) / 'build', FakeGenerator(), html_updater)
+    return Path(tmp) / 'build' / 'demo'
+
+
+def test_only_images_and_svg_are_hashed():
+    """图片和 SVG 带哈希，CSS、JS、数据文件和固定文件名按原名导出"""
+    with tempfile.TemporaryDirectory() as tmp:
+        build_dir = export(tmp)
+        city = export_static.hashed_name('images/city.webp', hashlib.md5(b'webp-bytes').hexdigest())
+        arrow = export_static.hashed_name('icons/arrow.svg', hashlib.md5(b'<svg></svg>').hexdigest())
+        
+        manifest = json.loads((build_dir / 'manifest.json').read_text(encoding='utf-8'))
+        assert manifest['assets'] == {'icons/arrow.svg': arrow, 'images/city.webp': city}
+        
+        for relative in ('css/site.css', 'js/app.js', 'first-popup/introSteps.txt', 'robots.txt'):
+            assert (build_dir / relative).read_text(encoding='utf-8') == FILES[relative]
+        assert (build_dir / city).exists() and (build_dir / arrow).exists()
+        assert not (build_dir / 'images/city.webp').exists()
+        
+        html = (build_dir / 'index.html').read_text(encoding='utf-8')
+        assert f'src="./{city}"' in html and f'src="./{arrow}"' in html
+        assert 'href="./css/site.css?v=1"' in html and 'src="./js/app.js"' in html
+
+
+def test_reexport_skips_unchanged_files():
+    """再次导出时没有变化的文件全部跳过"""
+    with tempfile.TemporaryDirectory() as tmp:
+        export(tmp)
+        stats = export_static.export_product('demo', Path(tmp), Path(tmp) / 'build', FakeGenerator(), html_updater)
+        assert stats['exported'] == 0 and stats['html_updated'] == 0 and stats['pruned'] == 0
+        assert stats['skipped'] == len(FILES) - 1
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试基于游标的分页（filelist_parser.py 的 get_page_after / encode_cursor / decode_cursor）
+
+验证翻页边界（空列表、最后一页、恰好整页）、前缀区间、版本号变化后的续页以及无效游标
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from filelist_parser import FileListParser
+
+FILES = [
+    'images/a.webp?v=1',
+    'images/b.webp?v=1',
+    'images/home/1.webp?v=1',
+    'images/home/2.webp?v=1',
+    'images/home/3.webp?v=1',
+    'images/home2/x.webp?v=1',
+    'images/z.webp?v=1',
+]
+
+
+def make_parser(tmp: str, lines: list) -> FileListParser:
+    filelist = Path(tmp) / 'files.txt'
+    filelist.write_text(''.join(f"{line}\n" for line in lines), encoding='utf-8')
+    return FileListParser(str(filelist))
+
+
+def collect_pages(parser: FileListParser, page_size: int, prefix: str = '') -> list:
+    """从头翻到最后一页，返回每页的条目"""
+    pages = []
+    cursor = None
+    while True:
+        data = parser.get_page_after(cursor, page_size, prefix)
+        pages.append(data['items'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_all_files_once():
+    """逐页翻完覆盖全部文件，不重复；最后一页不满时 next_cursor 为 None"""
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = make_parser(tmp, FILES)
+        pages = collect_pages(parser, 3)
+        assert pages == [FILES[0:3], FILES[3:6], FILES[6:7]]
+        assert parser.get_page_after(None, 3)['total'] == len(FILES)
+
+
+def test_exact_multiple_has_no_empty_last_page():
+    """文件数恰好是每页数量的整数倍时，最后一页直接返回 next_cursor=None"""
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = make_parser(tmp, FILES[:6])
+        pages = collect_pages(parser, 3)
+        assert pages == [FILES[0:3], FILES[3:6]]
+
+
+def test_empty_list_and_unmatched_prefix():
+    """空列表、没有匹配的前缀都返回空页"""
+    with tempfile.TemporaryDirectory() as tmp:
+        empty = make_parser(tmp, [])
+        assert empty.get_page_after() == {'page_size': 20, 'total': 0, 'items': [], 'next_cursor': None}
+        
+        parser = make_parser(tmp, FILES)
+        data = parser.get_page_after(None, 3, 'images/none/')
+        assert data['items'] == [] and data['total'] == 0 and data['next_cursor'] is None
+
+
+def test_prefix_range_does_not_leak_into_siblings():
+    """前缀分页只返回区间内的文件，不会翻到相邻的 images/home2/"""
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = make_parser(tmp, FILES)
+        pages = collect_pages(parser, 2, 'images/home/')
+        assert pages == [FILES[2:4], FILES[4:5]]
+        assert parser.get_page_after(None, 2, 'images/home/')['total'] == 3
+
+
+def test_cursor_from_last_item_returns_empty_page():
+    """用最后一个文件的游标请求时返回空页"""
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = make_parser(tmp, FILES)
+        cursor = FileListParser.encode_cursor(FILES[-1])
+        data = parser.get_page_after(cursor, 3)
+        assert data['items'] == [] and data['next_cursor'] is None
+
+
+def test_cursor_survives_version_change_and_insert():
+    """两次请求之间版本号变化、前面插入新文件时，从游标路径之后继续，不重复"""
+    with tempfile.TemporaryDirectory() as tmp:
+        first = make_parser(tmp, FILES).get_page_after(None, 3)
+        assert first['items'][-1] == 'images/home/1.webp?v=1'
+        
+        regenerated = sorted(
+            [line.replace('?v=1', '?v=2') for line in FILES] + ['images/0.webp?v=2']
+        )
+        data = make_parser(tmp, regenerated).get_page_after(first['next_cursor'], 3)
+        assert data['items'] == [
+            'images/home/2.webp?v=2',
+            'images/home/3.webp?v=2',
+            'images/home2/x.webp?v=2',
+        ]
+
+
+def test_unversioned_cursor():
+    """没有版本号的文件列表同样按路径定位"""
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = [line.partition('?')[0] for line in FILES]
+        parser = make_parser(tmp, lines)
+        assert collect_pages(parser, 4) == [lines[0:4], lines[4:7]]
+
+
+def test_cursor_round_trip_is_url_safe():
+    """游标为 base64url 且无填充，解码得到原条目（含非 ASCII 路径）"""
+    for entry in ['images/a.webp?v=1', 'images/头像/x.webp?v=20240101_000000', 'a']:
+        cursor = FileListParser.encode_cursor(entry)
+        assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+        assert FileListParser.decode_cursor(cursor) == entry
+
+
+def test_invalid_cursor_raises_value_error():
+    """长度非法、不是 UTF-8 的游标抛出 ValueError"""
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = make_parser(tmp, FILES)
+        for cursor in ['a', '_w']:
+            try:
+                parser.get_page_after(cursor, 3)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"游标 {cursor!r} 应当无效")
+
+
+def test_page_size_is_at_least_one():
+    """page_size 小于 1 时按 1 处理"""
+    with tempfile.TemporaryDirectory() as tmp:
+        parser = make_parser(tmp, FILES)
+        data = parser.get_page_after(None, 0)
+        assert data['page_size'] == 1 and data['items'] == FILES[:1]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试清单中图片宽高的缓存（generate-filelist.py 的 get_image_dimensions）
+
+验证只缓存读取成功的宽高：未安装 Pillow 时不写入 None，旧记录中的 None 视为没有缓存
+"""
+
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+
+def load_generate_filelist():
+    """加载 tools/filelist-generator/generate-filelist.py（文件名含 - 无法直接 import）"""
+    module_path = TOOLS_DIR / 'filelist-generator' / 'generate-filelist.py'
+    spec = importlib.util.spec_from_file_location('generate_filelist', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+generate_filelist = load_generate_filelist()
+
+
+def make_image(tmp: str) -> Path:
+    file_path = Path(tmp) / 'demo.webp'
+    Image.new('RGB', (40, 30)).save(file_path)
+    return file_path
+
+
+def test_dimensions_cached_in_entry():
+    """读取成功后写入 entry，之后直接返回缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = make_image(tmp)
+        entry = {'hash': 'x'}
+        assert generate_filelist.get_image_dimensions(file_path, entry) == (40, 30)
+        assert entry == {'hash': 'x', 'width': 40, 'height': 30}
+        
+        file_path.unlink()
+        assert generate_filelist.get_image_dimensions(file_path, entry) == (40, 30)
+
+
+def test_missing_pillow_does_not_cache_none():
+    """未安装 Pillow 时返回 (None, None) 且不写入 entry，安装后即可读到宽高"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = make_image(tmp)
+        entry = {'hash': 'x'}
+        generate_filelist.Image = None
+        try:
+            assert generate_filelist.get_image_dimensions(file_path, entry) == (None, None)
+        finally:
+            generate_filelist.Image = Image
+        assert entry == {'hash': 'x'}
+        assert generate_filelist.get_image_dimensions(file_path, entry) == (40, 30)
+
+
+def test_cached_none_is_a_miss():
+    """旧版本写入的 width/height 为 None 时重新读取"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = make_image(tmp)
+        entry = {'hash': 'x', 'width': None, 'height': None}
+        assert generate_filelist.get_image_dimensions(file_path, entry) == (40, 30)
+        assert entry['width'] == 40 and entry['height'] == 30
+
+
+def test_unreadable_file_does_not_cache():
+    """读取失败时不写入 entry"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / 'broken.webp'
+        file_path.write_bytes(b'not an image')
+        entry = {'hash': 'x', 'width': None, 'height': None}
+        assert generate_filelist.get_image_dimensions(file_path, entry) == (None, None)
+        assert entry == {'hash': 'x'}
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
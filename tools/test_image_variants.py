@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试响应式变体的归属（create-image-derivatives、FileListParser.get_variants、HTML 更新工具）
+
+变体只按主干命名（demo@640w.webp），同一目录下主干相同的原图（demo.jpg、demo.png）
+会写入同一个变体文件，三处都应当跳过这些原图
+"""
+
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR / 'filelist-generator'))
+
+from filelist_parser import FileListParser
+
+
+def load_module(name: str, relative_path: str):
+    """按文件路径加载工具脚本（目录名含 - 无法直接 import）"""
+    spec = importlib.util.spec_from_file_location(name, TOOLS_DIR / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+derivatives = load_module('image_derivatives', 'create-image-derivatives/main.py')
+update_html = load_module('update_html', 'update-html-img-src-with-version/main.py')
+
+FILES = [
+    'images/demo.jpg?v=1',
+    'images/demo.png?v=1',
+    'images/demo@640w.webp?v=2',
+    'images/solo.jpg?v=1',
+    'images/solo.v2.webp?v=1',
+    'images/solo@320w.webp?v=2',
+    'images/solo@640w.webp?v=2',
+]
+
+
+def test_collect_sources_skips_stem_collisions():
+    """demo.jpg 和 demo.png 都跳过，solo.jpg 正常收集"""
+    with tempfile.TemporaryDirectory() as tmp:
+        product_dir = Path(tmp)
+        (product_dir / 'images').mkdir()
+        for name in ['demo.jpg', 'demo.png', 'solo.jpg', 'solo@320w.webp']:
+            Image.new('RGB', (8, 8)).save(product_dir / 'images' / name)
+        
+        sources, variants = derivatives.collect_sources(product_dir, derivatives.load_filelist_generator())
+        assert [posix_path for _, posix_path in sources] == ['images/solo.jpg']
+        assert [file_path.name for file_path in variants] == ['solo@320w.webp']
+
+
+def test_parser_returns_no_variants_for_stem_collisions():
+    """主干冲突的原图没有变体，pick_variant 返回原图；solo.v2.webp 不影响 solo.jpg"""
+    with tempfile.TemporaryDirectory() as tmp:
+        filelist = Path(tmp) / 'files.txt'
+        filelist.write_text(''.join(f"{line}\n" for line in FILES), encoding='utf-8')
+        parser = FileListParser(str(filelist))
+        
+        assert parser.get_variants('images/demo.jpg') == []
+        assert parser.get_variants('images/demo.png') == []
+        assert parser.pick_variant('images/demo.png', 600) == 'images/demo.png?v=1'
+        assert parser.get_variants('images/solo.jpg') == [
+            (320, 'images/solo@320w.webp?v=2'),
+            (640, 'images/solo@640w.webp?v=2'),
+        ]
+
+
+def test_html_variant_index_skips_stem_collisions():
+    """HTML 更新工具的变体索引同样不包含主干冲突的原图"""
+    version_map = {line.split('?')[0]: '?' + line.split('?')[1] for line in FILES}
+    index = update_html.build_variant_index(version_map)
+    assert index == {
+        'images/solo': [(320, 'images/solo@320w.webp'), (640, 'images/solo@640w.webp')],
+    }
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+测试图片重新压缩（optimize-images 的 optimize_image）
+
+验证重新编码并替换原文件后，EXIF 方向标记和 ICC 颜色配置仍然保留
+"""
+
+import importlib.util
+import random
+import tempfile
+from pathlib import Path
+
+from PIL import Image, ImageCms
+
+TOOLS_DIR = Path(__file__).parent
+
+
+def load_optimize_images():
+    """加载 tools/optimize-images/main.py"""
+    module_path = TOOLS_DIR / 'optimize-images' / 'main.py'
+    spec = importlib.util.spec_from_file_location('optimize_images', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+optimize_images = load_optimize_images()
+
+OPTIONS = {
+    'apply': True,
+    'lossless_only': False,
+    'min_ssim': 0.0,
+    'min_psnr': 0.0,
+}
+
+ORIENTATION_TAG = 0x0112
+ICC_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+
+
+def make_image() -> Image.Image:
+    """带噪点的渐变图，保证重新编码后体积明显变小"""
+    rng = random.Random(0)
+    img = Image.new('RGB', (256, 192))
+    img.putdata([
+        (x, y, min(255, (x + y) // 2 + rng.randrange(8)))
+        for y in range(192) for x in range(256)
+    ])
+    return img
+
+
+def make_exif() -> bytes:
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = 6
+    return exif.tobytes()
+
+
+def round_trip(fmt: str, suffix: str, **params) -> dict:
+    """写入带元数据的图片，执行 optimize_image，返回结果和替换后的元数据"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / f"demo{suffix}"
+        make_image().save(file_path, fmt, exif=make_exif(), icc_profile=ICC_PROFILE, **params)
+        
+        result = optimize_images.optimize_image((file_path, OPTIONS))
+        with Image.open(file_path) as img:
+            img.load()
+            return {
+                'result': result,
+                'orientation': img.getexif().get(ORIENTATION_TAG),
+                'icc_profile': img.info.get('icc_profile'),
+            }
+
+
+def check_metadata_kept(outcome: dict):
+    assert outcome['result']['error'] is None
+    # 确认确实替换了原文件
+    assert outcome['result']['mode'] is not None
+    assert outcome['result']['after'] < outcome['result']['before']
+    assert outcome['orientation'] == 6
+    assert outcome['icc_profile'] == ICC_PROFILE
+
+
+def test_jpeg_keeps_orientation_and_icc():
+    """JPEG 优化熵编码后保留方向标记和 ICC 配置"""
+    check_metadata_kept(round_trip('JPEG', '.jpg', quality=95))
+
+
+def test_png_keeps_orientation_and_icc():
+    """PNG 重新压缩后保留方向标记和 ICC 配置"""
+    check_metadata_kept(round_trip('PNG', '.png', compress_level=0))
+
+
+def test_lossless_webp_keeps_orientation_and_icc():
+    """无损 WebP 重新编码后保留方向标记和 ICC 配置"""
+    check_metadata_kept(round_trip('WEBP', '.webp', lossless=True, method=0))
+
+
+def test_lossy_webp_keeps_orientation_and_icc():
+    """有损 WebP 降低质量后保留方向标记和 ICC 配置"""
+    check_metadata_kept(round_trip('WEBP', '.webp', quality=100, method=0))
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
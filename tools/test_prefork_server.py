@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试 pre-fork 服务器的 worker 管理（filelist-generator/prefork_server.py）
+
+验证 SIGHUP 时逐个替换 worker（处理中的请求正常完成、替换期间连接不被拒绝），
+以及端口被占用、worker 反复启动失败时退避重启并最终放弃
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+
+# 在子进程中运行 run_prefork：/slow 等待 1 秒后返回，其他路径立即返回 worker 的 pid
+SERVER_SCRIPT = '''
+import os, sys, time
+sys.path.insert(0, sys.argv[1])
+import prefork_server
+from wsgiref.simple_server import WSGIRequestHandler
+
+prefork_server.WORKER_BACKOFF_BASE = 0.05
+prefork_server.WORKER_MIN_UPTIME = 1.0
+
+def app(environ, start_response):
+    if environ['PATH_INFO'] == '/slow':
+        time.sleep(1)
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode()]
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def make_server(reuse_port, counter, index):
+    server_class = prefork_server.make_server_class(prefork_server.ThreadingWSGIServer, reuse_port)
+    handler_class = QuietHandler
+    if index is not None:
+        handler_class = prefork_server.make_counting_handler(handler_class, counter, index)
+    server = server_class(('127.0.0.1', int(sys.argv[2])), handler_class)
+    server.set_app(app)
+    return server
+
+sys.exit(0 if prefork_server.run_prefork(make_server, 2, stats_interval=0) else 1)
+'''
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT, str(TOOLS_DIR / 'filelist-generator'), str(port)],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+
+
+def fetch(port: int, path: str = '/') -> str:
+    with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=10) as response:
+        return response.read().decode()
+
+
+def wait_until_ready(port: int):
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            return fetch(port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def test_reload_replaces_workers_without_dropping_requests():
+    """SIGHUP 后 worker 全部换新；处理中的慢请求正常完成，替换期间的请求全部成功"""
+    port = free_port()
+    server = start_server(port)
+    try:
+        wait_until_ready(port)
+        old_pids = {fetch(port) for _ in range(20)}
+        
+        slow = {}
+        thread = threading.Thread(target=lambda: slow.setdefault('pid', fetch(port, '/slow')))
+        thread.start()
+        time.sleep(0.2)
+        server.send_signal(signal.SIGHUP)
+        
+        # 替换期间持续发送请求，不应出现连接被拒绝或被重置
+        seen = set()
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline:
+            seen.add(fetch(port))
+        thread.join()
+        
+        assert slow['pid'] in old_pids
+        assert seen - old_pids, "替换后应当由新的 worker 处理请求"
+        assert {fetch(port) for _ in range(20)}.isdisjoint(old_pids)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        output = server.communicate(timeout=30)[0]
+    assert server.returncode == 0, output
+    assert '逐个替换 worker' in output
+
+
+def test_gives_up_when_port_is_taken():
+    """端口被不带 SO_REUSEPORT 的 socket 占用时，worker 退避重启几次后放弃，主进程以 1 退出"""
+    port = free_port()
+    with socket.socket() as blocker:
+        blocker.bind(('127.0.0.1', port))
+        blocker.listen()
+        server = start_server(port)
+        try:
+            output = server.communicate(timeout=30)[0]
+        finally:
+            if server.poll() is None:
+                os.kill(server.pid, signal.SIGKILL)
+    assert server.returncode == 1, output
+    assert output.count('很快退出（第') >= 2
+    assert '不再重启' in output and '停止服务器' in output
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+测试批量重命名引擎（rename_engine.py）
+
+验证冲突检测、两阶段按深度从深到浅的执行顺序、中途失败时的自动回滚以及按日志回滚
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+sys.path.insert(0, str(TOOLS_DIR))
+
+import rename_engine
+from rename_engine import JOURNAL_NAME, TEMP_SUFFIX, execute_plan, plan_renames, rollback
+
+
+def lowercase(name: str, rel_path: str, is_dir: bool) -> str:
+    return name.lower()
+
+
+def make_tree(base: Path, files: dict):
+    """按 {相对路径: 内容} 创建文件"""
+    for rel, content in files.items():
+        path = base / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def read_tree(base: Path) -> dict:
+    """读取目录下所有文件 {相对路径: 内容}（不含隐藏文件）"""
+    return {
+        rel: (base / rel).read_text(encoding='utf-8')
+        for rel, is_dir in rename_engine.scan_tree(base)
+        if not is_dir
+    }
+
+
+def test_ops_are_two_phase_and_deep_first():
+    """阶段 1 全部改为临时名称，阶段 2 改为最终名称，每个阶段都从深到浅"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        make_tree(base, {'A/B/C.txt': 'c'})
+        plan = plan_renames(base, lowercase)
+        
+        assert [item['path'] for item in plan['renames']] == ['A/B/C.txt', 'A/B', 'A']
+        assert plan['ops'] == [
+            ('A/B/C.txt', 'A/B/C.txt' + TEMP_SUFFIX),
+            ('A/B', 'A/B' + TEMP_SUFFIX),
+            ('A', 'A' + TEMP_SUFFIX),
+            (f'A{TEMP_SUFFIX}/B{TEMP_SUFFIX}/C.txt{TEMP_SUFFIX}', f'A{TEMP_SUFFIX}/B{TEMP_SUFFIX}/c.txt'),
+            (f'A{TEMP_SUFFIX}/B{TEMP_SUFFIX}', f'A{TEMP_SUFFIX}/b'),
+            (f'A{TEMP_SUFFIX}', 'a'),
+        ]
+        assert plan['moves'] == {'A/B/C.txt': 'a/b/c.txt'}
+        
+        stats = execute_plan(plan)
+        assert stats['errors'] == [] and not stats['rolled_back']
+        assert (stats['files'], stats['dirs']) == (1, 2)
+        assert read_tree(base) == {'a/b/c.txt': 'c'}
+        assert not (base / JOURNAL_NAME).exists()
+
+
+def test_swapping_names_does_not_conflict():
+    """两个文件互换名称（02 <-> 03）经过临时名称中转，内容随之交换"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        make_tree(base, {'02.webp': 'two', '03.webp': 'three'})
+        swap = {'02.webp': '03.webp', '03.webp': '02.webp'}
+        plan = plan_renames(base, lambda name, rel, is_dir: swap.get(name))
+        
+        assert plan['conflicts'] == []
+        assert execute_plan(plan)['errors'] == []
+        assert read_tree(base) == {'02.webp': 'three', '03.webp': 'two'}
+
+
+def test_case_insensitive_collision_blocks_everything():
+    """最终路径只差大小写时报告冲突，不执行任何重命名"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        files = {'Dark-Brown.webp': 'a', 'dark-brown.webp': 'b', 'Other.webp': 'c'}
+        make_tree(base, files)
+        plan = plan_renames(base, lowercase)
+        
+        assert plan['conflicts'] == [('dark-brown.webp', ['Dark-Brown.webp', 'dark-brown.webp'])]
+        stats = execute_plan(plan)
+        assert stats['errors'] and stats['files'] == 0
+        assert read_tree(base) == files
+
+
+def test_directory_collision_blocks_merge():
+    """目录改名后与已有目录同名时报告冲突，不会把两个目录的内容合并"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        files = {'Faces/1.webp': 'a', 'faces/1.webp': 'b'}
+        make_tree(base, files)
+        plan = plan_renames(base, lowercase)
+        
+        assert plan['conflicts'] == [('faces', ['Faces', 'faces'])]
+        assert execute_plan(plan)['errors']
+        assert read_tree(base) == files
+
+
+def test_existing_temp_name_is_a_conflict():
+    """临时名称已被占用时报告冲突"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        make_tree(base, {'X': 'x', 'X' + TEMP_SUFFIX: 'keep'})
+        plan = plan_renames(base, lambda name, rel, is_dir: 'y' if name == 'X' else None)
+        assert plan['conflicts'] == [('X' + TEMP_SUFFIX, ['X'])]
+
+
+def test_invalid_new_name_raises():
+    """新名称包含 / 时拒绝规划"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        make_tree(base, {'a.webp': 'a'})
+        try:
+            plan_renames(base, lambda name, rel, is_dir: 'x/y.webp')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("应当拒绝包含 / 的新名称")
+
+
+def test_failure_midway_rolls_back():
+    """阶段 2 中途失败时，已执行的步骤逆序撤销，目录恢复原状并删除日志"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        files = {'A/B/C.txt': 'c', 'A/D.txt': 'd', 'E.txt': 'e'}
+        make_tree(base, files)
+        plan = plan_renames(base, lowercase)
+        
+        # 规划后占用 E.txt 的最终名称：阶段 1 和阶段 2 的其他步骤都已执行后，最后一步失败
+        failing = plan['ops'].index((f'E.txt{TEMP_SUFFIX}', 'e.txt'))
+        assert failing == len(plan['ops']) - 1
+        (base / 'e.txt').write_text('blocker', encoding='utf-8')
+        
+        stats = execute_plan(plan)
+        assert stats['rolled_back']
+        assert len(stats['errors']) == 1 and stats['errors'][0].startswith(f'E.txt{TEMP_SUFFIX} -> e.txt')
+        assert (stats['files'], stats['dirs']) == (0, 0)
+        
+        (base / 'e.txt').unlink()
+        assert read_tree(base) == files
+        assert not (base / JOURNAL_NAME).exists()
+
+
+def test_rollback_from_journal_after_interruption():
+    """进程在执行中途中断（日志仍在）时，rollback 按日志恢复原状"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        files = {'A/B/C.txt': 'c', 'E.txt': 'e'}
+        make_tree(base, files)
+        plan = plan_renames(base, lowercase)
+        
+        # 模拟写入日志后执行了一部分步骤就被中断
+        (base / JOURNAL_NAME).write_text(json.dumps({'ops': plan['ops']}), encoding='utf-8')
+        for src, dst in plan['ops'][:len(plan['ops']) - 2]:
+            os.rename(base / src, base / dst)
+        
+        # 日志存在时拒绝开始新的重命名
+        blocked = execute_plan(plan_renames(base, lowercase))
+        assert blocked['errors'] and not blocked['rolled_back']
+        
+        assert rollback(base) == len(plan['ops']) - 2
+        assert read_tree(base) == files
+        assert not (base / JOURNAL_NAME).exists()
+        assert rollback(base) == 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
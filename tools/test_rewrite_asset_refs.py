@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+测试 HTML 资源引用重写（update-html-img-src-with-version 的 rewrite_asset_refs）
+
+验证 src / href / srcset / 内联 CSS url() 在一次扫描中全部按版本号改写
+"""
+
+import importlib.util
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+
+
+def load_update_html():
+    """加载 tools/update-html-img-src-with-version/main.py"""
+    module_path = TOOLS_DIR / 'update-html-img-src-with-version' / 'main.py'
+    spec = importlib.util.spec_from_file_location('update_html', module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+update_html = load_update_html()
+
+VERSION_MAP = {
+    'images/a.webp': '?v=1',
+    'images/b.webp': '?v=2',
+    'images/bg.png': '?v=3',
+    'css/site.css': '',
+    'page/img/c.webp': '?v=4',
+}
+
+
+def rewrite(content: str, html_dir: str = '.', refs: dict = None) -> str:
+    resolver = update_html.make_version_resolver(VERSION_MAP, Path(html_dir), refs)
+    return update_html.rewrite_asset_refs(content, resolver)
+
+
+def test_rewrite_src_srcset_and_url_in_one_pass():
+    """src、href、srcset、url() 混合出现时全部改写"""
+    html = (
+        '<img src="./images/a.webp" srcset="./images/a.webp 1x, ./images/b.webp 2x">\n'
+        "<link rel=\"stylesheet\" href='./css/site.css'>\n"
+        '<div style="background: url(./images/bg.png)"></div>\n'
+        "<div style=\"background: url('./images/bg.png')\"></div>\n"
+    )
+    assert rewrite(html) == (
+        '<img src="./images/a.webp?v=1" srcset="./images/a.webp?v=1 1x, ./images/b.webp?v=2 2x">\n'
+        "<link rel=\"stylesheet\" href='./css/site.css'>\n"
+        '<div style="background: url(./images/bg.png?v=3)"></div>\n'
+        "<div style=\"background: url('./images/bg.png?v=3')\"></div>\n"
+    )
+
+
+def test_existing_version_is_replaced():
+    """已有的 ?v= 被替换为当前版本号，重复执行结果不变"""
+    html = '<img src="./images/a.webp?v=old">'
+    once = rewrite(html)
+    assert once == '<img src="./images/a.webp?v=1">'
+    assert rewrite(once) == once
+
+
+def test_unknown_and_absolute_refs_are_kept():
+    """未收录的资源、非 ./ 开头的引用保持原样"""
+    html = (
+        '<img src="./images/missing.webp">'
+        '<img src="https://cdn.example.com/images/a.webp">'
+        '<img srcset="/images/a.webp 1x, ./images/missing.webp 2x">'
+        '<div style="background: url(/images/bg.png)"></div>'
+    )
+    assert rewrite(html) == html
+
+
+def test_srcset_keeps_descriptors_and_partial_matches():
+    """srcset 中只改写收录的候选项，保留宽度描述符"""
+    html = '<img srcset="./images/a.webp 480w, ./images/missing.webp 960w">'
+    assert rewrite(html) == '<img srcset="./images/a.webp?v=1 480w, ./images/missing.webp 960w">'
+
+
+def test_srcset_drops_empty_candidates():
+    """srcset 末尾逗号、连续逗号产生的空候选项不保留"""
+    html = '<img srcset="./images/a.webp 1x,, ./images/b.webp 2x,">'
+    assert rewrite(html) == '<img srcset="./images/a.webp?v=1 1x, ./images/b.webp?v=2 2x">'
+
+
+def test_refs_resolved_relative_to_html_dir():
+    """引用按 HTML 所在目录解析，并记录依赖（未收录的记为 None）"""
+    refs = {}
+    html = '<img src="./img/c.webp"><img src="./img/none.webp">'
+    assert rewrite(html, 'page', refs) == '<img src="./img/c.webp?v=4"><img src="./img/none.webp">'
+    assert refs == {'page/img/c.webp': '?v=4', 'page/img/none.webp': None}
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -5,25 +5,104 @@
 1. 遍历 static 文件夹下的所有一级子文件夹
 2. 对每个子文件夹：
    - 读取 tools/filelist-generator/{子文件夹名}/files.txt
+     （存在不旧于 files.txt 的 manifest.json 时改用清单，直接按列读取版本号和图片宽高）
    - 遍历该子文件夹下的所有 HTML 文件（递归）
-   - 用 files.txt 里的 URL（带版本号）替换 HTML 中的图片 src
+   - 用 files.txt 里的 URL（带版本号）替换 HTML 中的资源引用
+     （src、href、srcset、内联 CSS url()，单次正则扫描完成）
+3. 多个产品并行处理；HTML 文件较多时使用进程池并发处理
+4. 增量处理：依赖清单 tools/filelist-generator/{子文件夹名}/.html-manifest.json
+   记录每个 HTML 的内容哈希和引用的资源版本号，只处理 HTML 自身变化
+   或引用资源版本号变化的文件
+5. 首屏优化（--enhance）：
+   - 为前 N 张图片注入 <link rel="preload">（--preload=N，默认 2）
+   - 为 <img> 补充真实的 width/height（需要 Pillow）
+   - 存在 name@{宽度}w.webp 变体时生成 srcset/sizes（按文件名主干匹配，原图可以是 jpg/png）
+   - 作者已写的 width/height、srcset/sizes 不会被覆盖；注入的属性记录在 data-enhanced 中，
+     不带 --enhance 运行时移除注入的属性和 preload 块
 
 用法：
 python tools/update-html-img-src-with-version/main.py
 python tools/update-html-img-src-with-version/main.py business-headshot-ai  # 只处理指定产品
+python tools/update-html-img-src-with-version/main.py -j 8                  # 指定并发数（多个产品时由各产品分摊）
+python tools/update-html-img-src-with-version/main.py --force               # 忽略依赖清单，全部重新处理
+python tools/update-html-img-src-with-version/main.py --enhance --preload=3 # 首屏优化
 """
 
+import gzip
+import hashlib
+import json
+import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# 一次扫描匹配所有资源引用：
+#   src="./x" / href="./x"（img、source、<link rel="preload"> 等）
+#   srcset="./a.webp 1x, ./b.webp 2x"
+#   url(./x) / url('./x')（内联 CSS）
+ASSET_REF_PATTERN = re.compile(
+    r'(?P<attr>src|href)=(?P<q>["\'])(?P<ref>\./[^"\']+)(?P=q)'
+    r'|srcset=(?P<sq>["\'])(?P<srcset>[^"\']+)(?P=sq)'
+    r'|url\((?P<uq>["\']?)(?P<url>\./[^"\')\s]+)(?P=uq)\)'
+)
+
+# HTML 文件数达到该值才启用进程池（进程启动有固定开销）
+PARALLEL_MIN_FILES = 64
+
+# files.txt 解析缓存：{路径: ((mtime_ns, size), version_map)}
+_version_map_cache = {}
+
+# ---------- 首屏优化（--enhance） ----------
+
+# 响应式变体命名：demo-1@480w.webp 是 demo-1.{webp,jpg,png} 宽 480px 的版本
+# （create-image-derivatives 统一输出 webp，按文件名主干对应原图）
+VARIANT_PATTERN = re.compile(r'^(?P<base>.+)@(?P<width>\d+)w(?P<ext>\.[A-Za-z0-9]+)$')
+
+# 变体集合在依赖清单中的伪路径后缀（变体增删时触发 HTML 重新处理）
+VARIANT_DEP_SUFFIX = '#variants'
+
+# 每个 HTML 预加载的首屏图片数（按文档顺序取前 N 张 <img>）
+PRELOAD_COUNT = 2
+
+# srcset 对应的 sizes 属性，按页面布局调整
+SRCSET_SIZES = '100vw'
+
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+IMG_SRC_PATTERN = re.compile(r'\ssrc=(["\'])(\./[^"\']+)\1')
+PRELOAD_BLOCK_PATTERN = re.compile(r'<!-- preload:begin -->.*?<!-- preload:end -->\n?', re.DOTALL)
+HEAD_TAG_PATTERN = re.compile(r'<head\b[^>]*>\n?', re.IGNORECASE)
+
+# 记录 --enhance 注入的属性，如 data-enhanced="width height"，用于重新处理或关闭时移除
+ENHANCED_ATTR = 'data-enhanced'
+
+# 图片尺寸缓存：{路径: (width, height) 或 None}
+_image_size_cache = {}
+
 
 def load_file_versions(files_txt_path: Path) -> dict:
-    """加载文件版本映射"""
+    """
+    加载文件版本映射
+
+    解析结果按 files.txt 的 (mtime, size) 缓存，同一进程内重复调用不会重新解析
+    """
     if not files_txt_path.exists():
         print(f"❌ 错误: files.txt 不存在: {files_txt_path}")
         return {}
     
+    stat = files_txt_path.stat()
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    cached = _version_map_cache.get(files_txt_path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    
     version_map = {}
     
     with open(files_txt_path, 'r', encoding='utf-8') as f:
@@ -33,77 +112,479 @@ def load_file_versions(files_txt_path: Path) -> dict:
                 continue
             
             # 解析 URL：/images-step1/demo-1.webp?v=20231217_143025
-            if '?v=' in line:
-                file_path, version = line.split('?v=')
-                # 只保留文件名部分作为 key
-                # /images-step1/demo-1.webp -> images-step1/demo-1.webp
-                file_path = file_path.lstrip('/')
-                version_map[file_path] = f"?v={version}"
-            else:
-                # 没有版本号的情况
-                file_path = line.lstrip('/')
-                version_map[file_path] = ""
+            # 只保留文件名部分作为 key：/images-step1/demo-1.webp -> images-step1/demo-1.webp
+            # 没有版本号时 version 为空字符串
+            file_path, sep, version = line.partition('?v=')
+            version_map[file_path.lstrip('/')] = f"?v={version}" if sep else ""
     
+    _version_map_cache[files_txt_path] = (cache_key, version_map)
     return version_map
 
 
+def find_manifest(files_txt_path: Path):
+    """返回可用的清单路径（manifest.json 或 .json.gz，且不旧于 files.txt），没有时返回 None"""
+    txt_mtime = files_txt_path.stat().st_mtime_ns if files_txt_path.exists() else 0
+    for name in ('manifest.json', 'manifest.json.gz'):
+        manifest_path = files_txt_path.parent / name
+        if manifest_path.exists() and manifest_path.stat().st_mtime_ns >= txt_mtime:
+            return manifest_path
+    return None
+
+
+def load_manifest_versions(manifest_path: Path) -> tuple:
+    """
+    从按列清单加载版本映射和图片宽高
+    
+    Returns:
+        (version_map, {路径: (width, height)})
+    """
+    stat = manifest_path.stat()
+    cache_key = (stat.st_mtime_ns, stat.st_size)
+    cached = _version_map_cache.get(manifest_path)
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    
+    data = manifest_path.read_bytes()
+    if manifest_path.suffix == '.gz':
+        data = gzip.decompress(data)
+    columns = json.loads(data)['columns']
+    
+    version_map = {
+        path: f"?v={version}" if version else ""
+        for path, version in zip(columns['path'], columns['version'])
+    }
+    sizes = {
+        path: (width, height)
+        for path, width, height in zip(columns['path'], columns['width'], columns['height'])
+        if width is not None
+    }
+    
+    _version_map_cache[manifest_path] = (cache_key, (version_map, sizes))
+    return version_map, sizes
+
+
+def rewrite_asset_refs(content: str, resolve) -> str:
+    """
+    单次扫描重写 HTML 中的所有资源引用
+    
+    Args:
+        content: HTML 内容
+        resolve: 回调 resolve(ref) -> 新引用或 None（None 表示保持原样），
+                 ref 为以 ./ 开头的原始引用
+    
+    Returns:
+        重写后的 HTML 内容
+    """
+    def replace_ref(match):
+        ref = match.group('ref')
+        if ref is not None:
+            new_ref = resolve(ref)
+            if new_ref is None:
+                return match.group(0)
+            quote = match.group('q')
+            return f"{match.group('attr')}={quote}{new_ref}{quote}"
+        
+        srcset = match.group('srcset')
+        if srcset is not None:
+            # srcset="./a.webp 1x, ./b.webp 2x"：逐个候选项替换 URL，保留描述符
+            changed = False
+            candidates = []
+            for candidate in srcset.split(','):
+                parts = candidate.strip().split(None, 1)
+                if not parts:
+                    # 末尾逗号或连续逗号产生的空候选项直接丢弃
+                    continue
+                if parts[0].startswith('./'):
+                    new_ref = resolve(parts[0])
+                    if new_ref is not None:
+                        parts[0] = new_ref
+                        changed = True
+                candidates.append(' '.join(parts))
+            if not changed:
+                return match.group(0)
+            quote = match.group('sq')
+            return f"srcset={quote}{', '.join(candidates)}{quote}"
+        
+        new_ref = resolve(match.group('url'))
+        if new_ref is None:
+            return match.group(0)
+        quote = match.group('uq')
+        return f"url({quote}{new_ref}{quote})"
+    
+    return ASSET_REF_PATTERN.sub(replace_ref, content)
+
+
+def make_version_resolver(version_map: dict, html_relative_dir: Path, refs: dict = None):
+    """
+    构建按 files.txt 版本号重写引用的 resolve 回调
+    
+    Args:
+        refs: 可选，记录引用到的资源 {完整路径: 版本号}，未收录的资源记为 None
+    """
+    # HTML 所在目录（相对产品目录），如 first-popup/female-white-young-standard
+    dir_prefix = html_relative_dir.as_posix()
+    
+    def resolve(ref: str):
+        # 移除 ./ 前缀和已有的版本号
+        clean_path = ref[2:].split('?v=')[0]
+        
+        # 构建完整路径：HTML 所在目录 + 相对路径
+        full_path = clean_path if dir_prefix == '.' else f"{dir_prefix}/{clean_path}"
+        
+        # 没有找到版本号，保持原样
+        version = version_map.get(full_path)
+        if refs is not None:
+            refs[full_path] = version
+        if version is None:
+            return None
+        return f"./{clean_path}{version}"
+    
+    return resolve
+
+
 def update_html_file(html_path: Path, version_map: dict, product_dir: Path) -> bool:
-    """更新单个 HTML 文件中的图片 src"""
+    """更新单个 HTML 文件中的资源引用（src / href / srcset / CSS url()）"""
     if not html_path.exists():
         print(f"❌ HTML 文件不存在: {html_path}")
         return False
     
+    return sync_html_file(html_path, version_map, product_dir)[0]
+
+
+def sync_html_file(html_path: Path, version_map: dict, product_dir: Path, enhance: dict = None) -> tuple:
+    """
+    更新单个 HTML 文件并生成其依赖清单条目
+    
+    Args:
+        enhance: 首屏优化选项 {'variants', 'preload_count'}，None 表示只更新版本号
+    
+    Returns:
+        (是否更新, 清单条目 {'hash', 'mtime_ns', 'size', 'assets'})
+    """
     # 计算 HTML 文件相对于产品目录的路径
-    # 例如: first-popup/female/White/young/slim/
+    # 例如: first-popup/female-white-young-standard/
     html_relative_dir = html_path.parent.relative_to(product_dir)
     
     # 读取 HTML 内容
     content = html_path.read_text(encoding='utf-8')
-    original_content = content
     
-    # 匹配 src="./xxx" 或 src='./xxx'
-    # 使用正则表达式查找所有图片 src
-    def replace_src(match):
-        quote = match.group(1)  # 引号类型（" 或 '）
-        src_path = match.group(2)  # 原始路径
+    refs = {}
+    new_content = rewrite_asset_refs(content, make_version_resolver(version_map, html_relative_dir, refs))
+    if enhance:
+        new_content = enhance_html(new_content, html_relative_dir, version_map, product_dir, enhance, refs)
+    else:
+        # 关闭首屏优化时移除上次注入的内容
+        new_content = strip_enhancements(new_content)
+    
+    # 检查是否有变化
+    updated = new_content != content
+    if updated:
+        html_path.write_text(new_content, encoding='utf-8')
+    
+    stat = html_path.stat()
+    entry = {
+        'hash': hashlib.md5(new_content.encode('utf-8')).hexdigest(),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'assets': refs,
+        'enhance': enhance_signature(enhance),
+    }
+    return updated, entry
+
+
+def enhance_signature(enhance: dict):
+    """依赖清单中记录的首屏优化选项（选项变化时重新处理 HTML），未启用时为 None"""
+    if not enhance:
+        return None
+    return {'preload_count': enhance['preload_count'], 'srcset_sizes': SRCSET_SIZES}
+
+
+# ==================== 首屏优化（--enhance） ====================
+
+def get_image_size(image_path: Path):
+    """读取图片真实尺寸，返回 (width, height)；未安装 Pillow 或读取失败时返回 None"""
+    if Image is None:
+        return None
+    
+    if image_path not in _image_size_cache:
+        try:
+            # 只解析文件头，不解码像素
+            with Image.open(image_path) as img:
+                _image_size_cache[image_path] = img.size
+        except (OSError, ValueError):
+            _image_size_cache[image_path] = None
+    
+    return _image_size_cache[image_path]
+
+
+def variant_key(file_path: str) -> str:
+    """变体索引的键：去掉扩展名的路径（与 FileListParser.get_variants 一样按主干匹配）"""
+    dir_part, _, name = file_path.rpartition('/')
+    stem = name.rpartition('.')[0] or name
+    return f"{dir_part}/{stem}" if dir_part else stem
+
+
+def build_variant_index(version_map: dict) -> dict:
+    """
+    从版本映射中找出响应式变体
+    
+    变体总是保存为 webp，原图可能是 jpg/png，因此按去掉扩展名的路径归组；
+    同一目录下主干相同的原图（demo.jpg 和 demo.png）无法区分变体归属，不生成索引
+    
+    Returns:
+        {原图路径（不含扩展名）: [(宽度, 变体路径), ...]}，按宽度升序
+    """
+    index = {}
+    stem_counts = {}
+    for file_path in version_map:
+        dir_part, _, name = file_path.rpartition('/')
+        match = VARIANT_PATTERN.match(name)
+        if not match:
+            key = variant_key(file_path)
+            stem_counts[key] = stem_counts.get(key, 0) + 1
+            continue
+        original = f"{dir_part}/{match['base']}" if dir_part else match['base']
+        index.setdefault(original, []).append((int(match['width']), file_path))
+    
+    for original in [key for key in index if stem_counts.get(key, 0) > 1]:
+        del index[original]
+    
+    for variants in index.values():
+        variants.sort()
+    
+    return index
+
+
+def add_variant_deps(version_map: dict, variant_index: dict) -> dict:
+    """在版本映射中加入变体集合的伪路径，使依赖清单能感知变体的增删和更新"""
+    dep_map = dict(version_map)
+    for original, variants in variant_index.items():
+        dep_map[f"{original}{VARIANT_DEP_SUFFIX}"] = ','.join(
+            f"{width}:{version_map.get(path, '')}" for width, path in variants
+        )
+    return dep_map
+
+
+def _attr_pattern(name: str):
+    return re.compile(r'\s' + re.escape(name) + r'=(["\'])(.*?)\1', re.IGNORECASE)
+
+
+def _has_attr(tag: str, name: str) -> bool:
+    return _attr_pattern(name).search(tag) is not None
+
+
+def _set_attr(tag: str, name: str, value) -> str:
+    """追加标签属性；属性已存在（作者设置的）时保持原样"""
+    if _has_attr(tag, name):
+        return tag
+    end = -2 if tag.endswith('/>') else -1
+    return tag[:end].rstrip() + f' {name}="{value}"' + tag[end:]
+
+
+def _strip_injected_attrs(tag: str) -> str:
+    """移除 data-enhanced 记录的注入属性及其自身"""
+    marker = _attr_pattern(ENHANCED_ATTR).search(tag)
+    if not marker:
+        return tag
+    for name in marker.group(2).split() + [ENHANCED_ATTR]:
+        tag = _attr_pattern(name).sub('', tag, count=1)
+    return tag
+
+
+def strip_enhancements(content: str) -> str:
+    """移除 --enhance 注入的 preload 块和 <img> 属性"""
+    if '<!-- preload:begin -->' in content:
+        content = PRELOAD_BLOCK_PATTERN.sub('', content)
+    if ENHANCED_ATTR in content:
+        content = IMG_TAG_PATTERN.sub(lambda m: _strip_injected_attrs(m.group(0)), content)
+    return content
+
+
+def enhance_html(content: str, html_relative_dir: Path, version_map: dict, product_dir: Path,
+                 enhance: dict, refs: dict) -> str:
+    """
+    首屏优化：
+    1. 为 <img> 补充真实的 width/height，避免布局偏移
+    2. 存在 name@{w}w.webp 变体时生成 srcset/sizes
+    3. 为前 N 张图片注入 <link rel="preload">
+    
+    作者已写的属性不覆盖（width/height 任一存在即都不补）；注入的属性记录在 data-enhanced 中，
+    每次处理先移除上次注入的内容再重新生成
+    
+    需在版本号替换之后调用，src 已带版本号
+    """
+    dir_prefix = html_relative_dir.as_posix()
+    variant_index = enhance['variants']
+    preload_links = []
+    
+    def enhance_img(match):
+        tag = _strip_injected_attrs(match.group(0))
+        src_match = IMG_SRC_PATTERN.search(tag)
+        if not src_match:
+            return tag
         
-        # 移除 ./ 前缀和已有的版本号
-        clean_path = src_path.lstrip('./')
-        if '?v=' in clean_path:
-            clean_path = clean_path.split('?v=')[0]
+        src = src_match.group(2)
+        clean_path = src[2:].split('?v=')[0]
+        full_path = clean_path if dir_prefix == '.' else f"{dir_prefix}/{clean_path}"
+        injected = []
         
-        # 构建完整路径：HTML 所在目录 + 相对路径
-        # 例如: first-popup/female/White/young/slim/ + images-step1/demo-1.webp
-        full_path = (html_relative_dir / clean_path).as_posix()
+        size = enhance.get('sizes', {}).get(full_path) or get_image_size(product_dir / full_path)
+        if size and not _has_attr(tag, 'width') and not _has_attr(tag, 'height'):
+            tag = _set_attr(tag, 'width', size[0])
+            tag = _set_attr(tag, 'height', size[1])
+            injected += ['width', 'height']
+        
+        dep_key = f"{variant_key(full_path)}{VARIANT_DEP_SUFFIX}"
+        refs[dep_key] = version_map.get(dep_key)
+        
+        srcset = None
+        variants = variant_index.get(variant_key(full_path))
+        if variants and not _has_attr(tag, 'srcset'):
+            # 变体与原图在同一目录
+            rel_dir = clean_path.rpartition('/')[0]
+            candidates = []
+            for width, variant_path in variants:
+                name = variant_path.rpartition('/')[2]
+                rel_path = f"{rel_dir}/{name}" if rel_dir else name
+                candidates.append(f"./{rel_path}{version_map.get(variant_path, '')} {width}w")
+            if size and all(width < size[0] for width, _ in variants):
+                candidates.append(f"{src} {size[0]}w")
+            srcset = ', '.join(candidates)
+            tag = _set_attr(tag, 'srcset', srcset)
+            injected.append('srcset')
+            if not _has_attr(tag, 'sizes'):
+                tag = _set_attr(tag, 'sizes', SRCSET_SIZES)
+                injected.append('sizes')
+        
+        if injected:
+            tag = _set_attr(tag, ENHANCED_ATTR, ' '.join(injected))
+        
+        if len(preload_links) < enhance['preload_count']:
+            link = f'<link rel="preload" as="image" href="{src}"'
+            if srcset:
+                link += f' imagesrcset="{srcset}" imagesizes="{SRCSET_SIZES}"'
+            preload_links.append(link + '>')
         
-        # 查找对应的版本号
-        if full_path in version_map:
-            version = version_map[full_path]
-            new_src = f"./{clean_path}{version}"
-            return f'src={quote}{new_src}{quote}'
+        return tag
+    
+    content = PRELOAD_BLOCK_PATTERN.sub('', content)
+    content = IMG_TAG_PATTERN.sub(enhance_img, content)
+    
+    if preload_links:
+        block = '<!-- preload:begin -->\n' + '\n'.join(preload_links) + '\n<!-- preload:end -->\n'
+        head_match = HEAD_TAG_PATTERN.search(content)
+        if head_match:
+            content = content[:head_match.end()] + block + content[head_match.end():]
         else:
-            # 没有找到版本号，保持原样
-            return match.group(0)
+            content = block + content
+    
+    return content
+
+
+# ==================== 依赖清单（增量处理） ====================
+
+def load_html_manifest(manifest_path: Path) -> dict:
+    """加载 HTML 依赖清单：{HTML 相对路径: 清单条目}"""
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    return {}
+
+
+def save_html_manifest(manifest_path: Path, manifest: dict):
+    """保存 HTML 依赖清单（先写临时文件再替换）"""
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_html_up_to_date(html_path: Path, entry: dict, version_map: dict, enhance: dict = None) -> bool:
+    """
+    判断 HTML 是否无需重新处理
     
-    # 替换所有 src 属性
-    pattern = r'src=(["\'])(\./[^"\']+)\1'
-    content = re.sub(pattern, replace_src, content)
+    条件：
+    1. HTML 内容未变化（mtime/size 相同，或内容哈希相同）
+    2. 引用到的每个资源版本号都与上次处理时相同
+    3. 首屏优化选项与上次相同
     
-    # 检查是否有变化
-    if content != original_content:
-        html_path.write_text(content, encoding='utf-8')
+    只是 touch（内容哈希相同）时就地刷新条目的 mtime_ns/size，下次不必再读取和计算哈希
+    """
+    if entry.get('enhance') != enhance:
+        return False
+    
+    for asset_path, version in entry.get('assets', {}).items():
+        if version_map.get(asset_path) != version:
+            return False
+    
+    try:
+        stat = html_path.stat()
+    except OSError:
+        return False
+    
+    if stat.st_mtime_ns == entry.get('mtime_ns') and stat.st_size == entry.get('size'):
         return True
     
-    return False
+    if hashlib.md5(html_path.read_bytes()).hexdigest() != entry.get('hash'):
+        return False
+    
+    entry['mtime_ns'] = stat.st_mtime_ns
+    entry['size'] = stat.st_size
+    return True
+
+
+# ==================== 并发处理 ====================
+
+_worker_state = {}
+
+
+def _init_worker(version_map: dict, product_dir: Path, enhance: dict):
+    """进程池初始化：每个 worker 只接收一次版本映射"""
+    _worker_state['version_map'] = version_map
+    _worker_state['product_dir'] = product_dir
+    _worker_state['enhance'] = enhance
+
+
+def _sync_html_in_worker(html_path: Path) -> tuple:
+    return sync_html_file(
+        html_path, _worker_state['version_map'], _worker_state['product_dir'], _worker_state['enhance']
+    )
+
+
+def sync_html_files(html_files: list, version_map: dict, product_dir: Path, workers: int = 1,
+                    enhance: dict = None) -> list:
+    """批量更新 HTML 文件，文件数较多时分发到进程池；返回 [(是否更新, 清单条目), ...]"""
+    if workers <= 1 or len(html_files) < PARALLEL_MIN_FILES:
+        return [sync_html_file(html_file, version_map, product_dir, enhance) for html_file in html_files]
+    
+    chunksize = max(1, len(html_files) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(version_map, product_dir, enhance)
+    ) as executor:
+        return list(executor.map(_sync_html_in_worker, html_files, chunksize=chunksize))
 
 
-def process_product(product_name: str, base_dir: Path) -> dict:
-    """处理单个产品目录"""
+def process_product(product_name: str, base_dir: Path, workers: int = 1, force: bool = False,
+                    enhance: bool = False, preload_count: int = PRELOAD_COUNT) -> dict:
+    """
+    处理单个产品目录
+    
+    依赖清单记录每个 HTML 的内容哈希及其引用的资源版本号，
+    HTML 自身和引用资源都未变化时跳过处理（force=True 时全部重新处理）
+    
+    enhance=True 时额外注入 preload、width/height 和 srcset/sizes
+    """
     result = {
         'product': product_name,
         'html_files': 0,
         'updated_files': 0,
         'skipped_files': 0,
+        'unchanged_files': 0,
         'error': None
     }
     
@@ -111,8 +592,10 @@ def process_product(product_name: str, base_dir: Path) -> dict:
     files_txt = base_dir / 'tools' / 'filelist-generator' / product_name / 'files.txt'
     product_dir = base_dir / 'static' / product_name
     
+    manifest_file = find_manifest(files_txt)
+    
     # 检查 files.txt 是否存在
-    if not files_txt.exists():
+    if manifest_file is None and not files_txt.exists():
         result['error'] = f"files.txt 不存在"
         return result
     
@@ -121,13 +604,23 @@ def process_product(product_name: str, base_dir: Path) -> dict:
         result['error'] = f"产品目录不存在"
         return result
     
-    # 加载版本映射
-    version_map = load_file_versions(files_txt)
+    # 加载版本映射（优先使用清单，清单中已有图片宽高）
+    image_sizes = {}
+    if manifest_file is not None:
+        version_map, image_sizes = load_manifest_versions(manifest_file)
+    else:
+        version_map = load_file_versions(files_txt)
     
     if not version_map:
         result['error'] = f"未找到版本信息"
         return result
     
+    enhance_options = None
+    if enhance:
+        variant_index = build_variant_index(version_map)
+        version_map = add_variant_deps(version_map, variant_index)
+        enhance_options = {'variants': variant_index, 'preload_count': preload_count, 'sizes': image_sizes}
+    
     # 递归查找所有 HTML 文件
     html_files = list(product_dir.rglob('*.html'))
     
@@ -137,23 +630,83 @@ def process_product(product_name: str, base_dir: Path) -> dict:
     
     result['html_files'] = len(html_files)
     
-    # 更新每个 HTML 文件
+    # 依赖清单与 files.txt 放在一起
+    manifest_path = files_txt.parent / '.html-manifest.json'
+    manifest = {} if force else load_html_manifest(manifest_path)
+    new_manifest = {}
+    
+    # 筛选需要处理的 HTML 文件
+    pending = []
     for html_file in html_files:
-        if update_html_file(html_file, version_map, product_dir):
+        rel_path = html_file.relative_to(product_dir).as_posix()
+        # 复制条目：is_html_up_to_date 可能刷新 mtime_ns/size，新旧清单比较时才能发现变化
+        entry = dict(manifest[rel_path]) if rel_path in manifest else None
+        if entry and is_html_up_to_date(html_file, entry, version_map, enhance_signature(enhance_options)):
+            new_manifest[rel_path] = entry
+            result['unchanged_files'] += 1
+        else:
+            pending.append(html_file)
+    
+    # 更新每个 HTML 文件
+    for html_file, (updated, entry) in zip(pending, sync_html_files(pending, version_map, product_dir, workers, enhance_options)):
+        new_manifest[html_file.relative_to(product_dir).as_posix()] = entry
+        if updated:
             result['updated_files'] += 1
         else:
             result['skipped_files'] += 1
     
+    # 已删除的 HTML 不会出现在新清单中
+    if new_manifest != manifest:
+        save_html_manifest(manifest_path, new_manifest)
+    
     return result
 
 
+def parse_args(argv: list) -> dict:
+    """解析命令行参数"""
+    options = {
+        'product': None,
+        'workers': os.cpu_count() or 1,
+        'force': False,
+        'enhance': False,
+        'preload_count': PRELOAD_COUNT,
+    }
+    
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-j', '--workers') and i + 1 < len(argv):
+            options['workers'] = max(1, int(argv[i + 1]))
+            i += 2
+            continue
+        if arg == '--force':
+            options['force'] = True
+        elif arg == '--enhance':
+            options['enhance'] = True
+        elif arg.startswith('--preload='):
+            options['preload_count'] = max(0, int(arg.split('=', 1)[1]))
+        elif arg.startswith('--workers='):
+            options['workers'] = max(1, int(arg.split('=', 1)[1]))
+        elif options['product'] is None:
+            options['product'] = arg
+        i += 1
+    
+    return options
+
+
 def main():
     """主函数"""
+    options = parse_args(sys.argv[1:])
+    
     print("=" * 60)
     print("🔄 更新 HTML 文件图片 src 版本号")
     print("=" * 60)
     print()
     
+    if options['enhance'] and Image is None:
+        print("⚠️  未安装 Pillow，不会生成 width/height（pip3 install Pillow）")
+        print()
+    
     # 路径配置
     base_dir = Path(__file__).parent.parent.parent
     static_dir = base_dir / 'static'
@@ -164,9 +717,9 @@ def main():
         return
     
     # 获取要处理的产品列表
-    if len(sys.argv) > 1:
+    if options['product']:
         # 处理指定的产品
-        products = [sys.argv[1]]
+        products = [options['product']]
         print(f"📦 处理指定产品: {products[0]}")
     else:
         # 处理所有产品
@@ -183,30 +736,48 @@ def main():
     
     print()
     
-    # 处理每个产品
-    results = []
+    # 多个产品并行处理（线程只做调度，HTML 处理在各产品的进程池中进行），
+    # 并发数在产品之间分摊
+    product_workers = max(1, min(options['workers'], len(products)))
+    html_workers = max(1, options['workers'] // product_workers)
+    
+    def run_product(product_name: str) -> dict:
+        start = time.perf_counter()
+        result = process_product(
+            product_name, base_dir, html_workers, options['force'],
+            options['enhance'], options['preload_count']
+        )
+        result['seconds'] = time.perf_counter() - start
+        return result
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=product_workers) as executor:
+        results = list(executor.map(run_product, products))
+    elapsed = time.perf_counter() - start
+    
     total_html = 0
     total_updated = 0
     total_skipped = 0
+    total_unchanged = 0
     
-    for product_name in products:
+    for result in results:
         print(f"{'='*60}")
-        print(f"📁 处理产品: {product_name}")
+        print(f"📁 处理产品: {result['product']}")
         print(f"{'='*60}")
         
-        result = process_product(product_name, base_dir)
-        results.append(result)
-        
         if result['error']:
             print(f"⚠️  {result['error']}")
         else:
             print(f"✅ HTML 文件: {result['html_files']} 个")
             print(f"   更新: {result['updated_files']} 个")
             print(f"   跳过: {result['skipped_files']} 个")
+            print(f"   未变化: {result['unchanged_files']} 个")
+            print(f"   耗时: {result['seconds']:.2f}s")
             
             total_html += result['html_files']
             total_updated += result['updated_files']
             total_skipped += result['skipped_files']
+            total_unchanged += result['unchanged_files']
         
         print()
     
@@ -224,6 +795,8 @@ def main():
     print(f"📝 HTML 文件总计: {total_html} 个")
     print(f"🔄 更新: {total_updated} 个")
     print(f"⏭️  跳过: {total_skipped} 个")
+    print(f"💤 未变化: {total_unchanged} 个")
+    print(f"⏱️  总耗时: {elapsed:.2f}s")
     
     # 显示错误详情
     if error_count > 0: